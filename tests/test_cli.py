@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Kiểm thử chế độ batch của todo_cli: mỗi dòng lỗi chỉ bị bỏ qua, không làm
+dừng cả batch.
+
+Chạy: python -m pytest -q
+"""
+
+import io, json, os, sys, unittest
+from contextlib import redirect_stderr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_cli import Context, run_batch  # noqa: E402
+from todo_core import Store  # noqa: E402
+
+
+class BatchTest(unittest.TestCase):
+
+    def run_lines(self, *lines):
+        self.store = Store(os.devnull)
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stderr(err):
+            errors = run_batch(Context(self.store, out=out), lines)
+        return errors, out.getvalue().splitlines(), err.getvalue().splitlines()
+
+    def test_bad_json_params_are_rejected_per_line(self):
+        errors, out, err = self.run_lines(
+            '{"cmd": "add", "text": "a"}',
+            '{"cmd": "add"}',                          # Thiếu tham số bắt buộc
+            '{"cmd": "add", "txt": "b"}',              # Tham số lạ
+            '{"cmd": "list", "limit": "x"}',
+            '{"cmd": "list", "limit": true}',
+            '{"cmd": "done", "ids": [1]}',
+            '{"cmd": "list", "as_json": "yes"}',
+            '{"cmd": "add", "text": "c", "priority": 2}',
+        )
+        self.assertEqual(errors, 6)
+        self.assertEqual([e.split(":")[0] for e in err],
+                         ["dòng 2", "dòng 3", "dòng 4", "dòng 5", "dòng 6", "dòng 7"])
+        self.assertEqual([t.text for t in self.store.items], ["a", "c"])
+
+    def test_numeric_strings_are_coerced(self):
+        errors, out, err = self.run_lines(
+            "add a", "add b", "add c",
+            '{"cmd": "list", "limit": "2"}',
+        )
+        self.assertEqual(errors, 0, err)
+        self.assertEqual(len(out), 3 + 2)
+
+    def test_repeated_ids_count_once(self):
+        errors, out, err = self.run_lines("add a", "add b")
+        a, b = (t.id for t in self.store.items)
+        ctx = Context(self.store, out=io.StringIO())
+        with redirect_stderr(io.StringIO()) as err:
+            errors = run_batch(ctx, [f"done {a} {a}", f"rm {b} {b}", f"rm {a} {a[:6]}"])
+        self.assertEqual(errors, 0, err.getvalue())
+        self.assertEqual(self.store.items, [])
+
+    def test_export_since_is_parsed(self):
+        self.store = Store(os.devnull)
+        # Như dữ liệu nhập từ ngoài: updated_at không theo dạng now_iso()
+        for tid, stamp in (("a", "2025-01-02 09:30"), ("b", "2025-01-02T10:00:00")):
+            self.store.add({"id": tid, "text": tid})
+            self.store.update(tid, updated_at=stamp)
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stderr(err):
+            errors = run_batch(Context(self.store, out=out), [
+                "export --since 2025-01-02T09:45",
+                '{"cmd": "export", "since": "2025-01-02 09:30"}',
+                "export --since hôm-qua",
+                '{"cmd": "export", "since": "2025-13-01"}',
+            ])
+        self.assertEqual(errors, 2)
+        self.assertEqual([e.split(":")[0] for e in err.getvalue().splitlines()], ["dòng 3", "dòng 4"])
+        self.assertEqual([json.loads(x)["id"] for x in out.getvalue().splitlines()], ["b", "a", "b"])
+
+    def test_unknown_id_raises_value_error(self):
+        errors, out, err = self.run_lines("add a")
+        with self.assertRaises(ValueError):
+            self.store.remove("không-có")
+        self.assertEqual([t.text for t in self.store.items], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Kiểm thử các lớp phía giao diện (todo.py) không cần màn hình: chạy với
+nền tảng Qt "offscreen", chỉ dùng vòng lặp sự kiện, không mở cửa sổ nào.
+
+Chạy: python -m pytest -q
+"""
+
+import os, shutil, sys, tempfile, threading, time, unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from PyQt5 import QtCore
+except ImportError:  # Máy không cài PyQt5: chỉ bỏ qua phần giao diện
+    raise unittest.SkipTest("cần PyQt5")
+
+import todo  # noqa: E402
+from todo_core import Store, Task  # noqa: E402
+
+
+def setUpModule():
+    global app
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait_until(cond, timeout=5.0):
+    """Chạy vòng lặp sự kiện cho tới khi cond() đúng (hoặc hết giờ)."""
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return cond()
+
+
+class GuiTestCase(unittest.TestCase):
+    """Mỗi bài kiểm thử dùng một thư mục tạm riêng."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "todos.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open(self):
+        store = Store(self.path, journal=True)
+        store.load()
+        return store
+
+
+class BackgroundSaverTest(GuiTestCase):
+
+    def test_coalesced_saves_reach_disk_in_order(self):
+        store = self.open()
+        saver = todo.BackgroundSaver(store, delay_ms=0)
+        for i in range(50):
+            store.add({"id": f"t{i}", "text": f"việc {i}"})
+            if i % 5 == 0:
+                app.processEvents()  # Để timer chạy: nhiều lần ghi nối tiếp nhau ở luồng nền
+            if i % 7 == 0:
+                saver.wait()         # Đọc _futures trong lúc luồng nền đang sửa nó
+        store.update("t3", done=True)
+        saver.shutdown()
+
+        self.assertEqual(saver._futures, set())
+        s2 = self.open()
+        self.assertEqual([t.id for t in s2.items], [f"t{i}" for i in range(50)])
+        self.assertTrue(s2.get("t3").done)
+
+    def test_failure_is_reported_on_gui_thread(self):
+        self.path = os.path.join(self.dir, "mất", "todos.json")  # Thư mục không tồn tại
+        store = Store(self.path)
+        saver = todo.BackgroundSaver(store, delay_ms=0)
+        errors = []
+        saver.failed.connect(lambda msg: errors.append((msg, threading.current_thread())))
+        store.add({"text": "a"})
+        self.assertTrue(wait_until(lambda: errors))
+        saver.shutdown()
+        self.assertIs(errors[0][1], threading.main_thread())
+        self.assertTrue(errors[0][0])
+
+
+class StoreLoaderTest(GuiTestCase):
+
+    def load(self, store):
+        results = []
+        loader = todo.StoreLoader(store)
+        loader.loaded.connect(lambda error: results.append((error, threading.current_thread())))
+        loader.start()
+        loader.wait(5)
+        self.assertTrue(wait_until(lambda: results))
+        self.assertIs(results[0][1], threading.main_thread())
+        return results[0][0]
+
+    def test_preview_then_full_load(self):
+        s = self.open()
+        s.extend({"id": f"t{i}", "text": f"việc {i}"} for i in range(3))
+        s.save()
+        s.update("t0", text="đã sửa")  # Chỉ nằm trong nhật ký
+        s.save()
+
+        store = Store(self.path, journal=True)
+        preview = store.peek(todo.FIRST_PAGE_SIZE)
+        self.assertEqual([t.text for t in preview], ["việc 0", "việc 1", "việc 2"])
+        cache, now = todo.RenderCache(), todo.datetime.now()
+        before = cache.get(preview[1], now)
+        self.assertIsNone(self.load(store))
+        self.assertEqual([t.text for t in store.items], ["đã sửa", "việc 1", "việc 2"])
+        # Như Main._on_store_loaded: mục tính từ bản xem trước không được dùng lại
+        cache.clear()
+        after = cache.get(store.get("t1"), now)
+        self.assertIsNot(after, before)
+        self.assertNotEqual(after.key, before.key)
+        # Chỉ mục được dựng ở luồng nền cùng lúc tải
+        self.assertEqual(store.filtered_ids("da sua"), ["t0"])
+
+    def test_error_is_reported_not_raised(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{hỏng")
+        store = Store(self.path)
+        self.assertEqual(store.peek(todo.FIRST_PAGE_SIZE), [])
+        self.assertIn("todos.json", self.load(store))
+        self.assertEqual(store.items, [])
+
+
+class TaskListModelTest(GuiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = Store(self.path)
+        self.store.extend({"id": f"t{i:03}", "text": f"việc {i}"} for i in range(200))
+        self.model = todo.TaskListModel(self.store, todo.RenderCache())
+        self.signals = []
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.signals.append(("remove", first)))
+        self.model.modelReset.connect(lambda: self.signals.append(("reset",)))
+
+    def rows(self):
+        return [self.model.task_id(r) for r in range(self.model.rowCount())]
+
+    def test_remove_few_rows_one_by_one(self):
+        self.model.set_rows([t.id for t in self.store.items[:10]])
+        self.signals.clear()
+        for tid in ("t007", "t002", "t150"):  # t150 không có trong danh sách
+            self.store.remove(tid)
+        self.model.remove_ids(["t007", "t002", "t150"])
+        self.assertEqual(self.signals, [("remove", 7), ("remove", 2)])
+        self.assertEqual(self.rows(), ["t000", "t001", "t003", "t004", "t005", "t006", "t008", "t009"])
+
+    def test_remove_many_rows_resets_once(self):
+        self.model.set_rows([t.id for t in self.store.items])
+        self.signals.clear()
+        gone = [f"t{i:03}" for i in range(0, 200, 2)]
+        self.model.remove_ids(gone)
+        self.assertEqual(self.signals, [("reset",)])
+        self.assertEqual(self.rows(), [f"t{i:03}" for i in range(1, 200, 2)])
+
+    def test_preview_rows_are_kept_until_set_rows(self):
+        preview = [Task("xem trước", id="p1")]
+        self.model.show_preview(preview)
+        self.model.remove_ids(["p1"])
+        self.model.drop_missing()  # p1 không thuộc Store nhưng vẫn đang xem trước
+        self.assertEqual(self.rows(), ["p1"])
+        self.assertEqual(self.model.data(self.model.index(0)), "xem trước")
+        self.model.set_rows(["t000"])
+        self.assertEqual(self.rows(), ["t000"])
+
+    def test_drop_missing_after_reload(self):
+        self.model.set_rows(["t000", "t001", "t002"])
+        self.store.remove("t001")
+        self.model.drop_missing()
+        self.assertEqual(self.rows(), ["t000", "t002"])
+        self.assertEqual(self.model.data(self.model.index(1)), "việc 2")
+
+
+class ProgressiveFillTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fill = todo.ProgressiveFill(slice_ms=0)  # Mỗi lượt đúng một lô
+        self.chunks, self.finished, self.closed = [], [], []
+        self.fill.chunk.connect(self.chunks.append)
+        self.fill.finished.connect(lambda: self.finished.append(True))
+
+    def batches(self, name, count):
+        try:
+            for i in range(count):
+                yield [f"{name}{i}"]
+        finally:
+            self.closed.append(name)
+
+    def test_runs_to_the_end(self):
+        self.fill.start(self.batches("a", 5))
+        self.assertEqual(self.chunks, [["a0"]])  # Lượt đầu chạy ngay trong start()
+        self.assertTrue(wait_until(lambda: self.finished))
+        self.assertEqual(len(self.chunks), 5)
+        self.assertFalse(self.fill.is_running())
+
+    def test_cancel_closes_generator(self):
+        self.fill.start(self.batches("a", 1000))
+        app.processEvents()
+        self.fill.cancel()
+        self.assertEqual(self.closed, ["a"])
+        seen = len(self.chunks)
+        wait_until(lambda: False, timeout=0.05)
+        self.assertEqual(len(self.chunks), seen)
+        self.assertEqual(self.finished, [])
+
+    def test_restart_replaces_running_fill(self):
+        self.fill.start(self.batches("a", 1000))
+        self.fill.start(self.batches("b", 3))
+        self.assertEqual(self.closed, ["a"])
+        self.assertTrue(wait_until(lambda: self.finished))
+        self.assertEqual(self.chunks, [["a0"], ["b0"], ["b1"], ["b2"]])
+
+    def test_cancel_from_chunk_handler(self):
+        # Như Main._on_store_change huỷ lần lọc khi Store đổi giữa chừng
+        self.fill.chunk.connect(lambda batch: batch == ["a2"] and self.fill.cancel())
+        self.fill.slice_ms = 1000
+        self.fill.start(self.batches("a", 1000))
+        self.assertEqual(self.chunks, [["a0"], ["a1"], ["a2"]])
+        self.assertEqual(self.closed, ["a"])
+        self.assertFalse(self.fill.is_running())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Kiểm thử nhập dữ liệu (todo_io): bản ghi lỗi chỉ bị bỏ qua kèm số dòng.
+
+Chạy: python -m pytest -q
+"""
+
+import csv, io, json, os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_core import Store  # noqa: E402
+from todo_io import import_tasks, normalize  # noqa: E402
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_fast_path_matches_migrate(self):
+        migrate = Store(os.devnull).migrate
+        records = [
+            {"id": "a", "text": "Học bài", "priority": "cao", "done": "1",
+             "due_dt": "2030-01-02 09:00", "created_at": "2025-01-01T00:00:00"},
+            {"id": "b", "text": "x", "created_at": "2025-01-01T00:00:00",
+             "done_at": "2025-02-01T00:00:00", "done": True, "tag": "lạ"},
+            {"id": "c", "text": "y", "created_at": "2025-01-01T00:00:00",
+             "updated_at": "2025-03-01T00:00:00", "note": "ghi chú", "notified": "no"},
+        ]
+        for raw in records:
+            fast = normalize(migrate, raw)
+            # Bản ghi kiểu cũ luôn đi qua migrate()
+            slow = normalize(migrate, dict(raw, due=None))
+            self.assertEqual(fast.to_dict(), slow.to_dict())
+        self.assertEqual(normalize(migrate, records[1]).extra, {"tag": "lạ"})
+
+    def test_missing_created_at_uses_given_stamp(self):
+        task = normalize(Store(os.devnull).migrate, {"text": "a"}, created_at="2025-05-05T05:05:05")
+        self.assertEqual(task.created_at, "2025-05-05T05:05:05")
+        self.assertEqual(task.updated_at, "2025-05-05T05:05:05")
+
+    def test_wrong_field_types_are_rejected(self):
+        store = Store(os.devnull)
+        lines = [
+            {"text": "a", "note": 5},
+            {"text": "a", "id": 7},
+            {"text": "a", "created_at": 123},
+            {"text": "a", "created_at": "hôm qua"},
+            {"text": "a", "done_at": ["2025-01-01"]},
+            {"text": "a", "done_at": "2025-13-01"},
+            {"text": "a", "updated_at": 0},
+            {"text": "a", "updated_at": "mới sửa"},
+            {"text": "hợp lệ", "note": None, "created_at": "2025-01-01T08:00:00",
+             "done_at": None, "updated_at": "2025-01-02 09:30"},
+        ]
+        text = "".join(json.dumps(x, ensure_ascii=False) + "\n" for x in lines)
+        result = import_tasks(store, io.StringIO(text), "jsonl")
+        self.assertEqual([r.pos for r in result.rejects], list(range(1, 9)))
+        self.assertEqual([r.reason.split(" ")[0] for r in result.rejects],
+                         ["note", "id", "created_at", "created_at", "done_at", "done_at",
+                          "updated_at", "updated_at"])
+        self.assertEqual([t.text for t in store.items], ["hợp lệ"])
+
+
+class CsvImportTest(unittest.TestCase):
+
+    def import_csv(self, text):
+        self.store = Store(os.devnull)
+        return import_tasks(self.store, io.StringIO(text), "csv")
+
+    def test_malformed_rows_are_rejected(self):
+        limit = csv.field_size_limit()
+        csv.field_size_limit(100)
+        try:
+            result = self.import_csv(
+                "text,priority\n"
+                "a,1\n"
+                + "x" * 200 + ",1\n"         # Ô vượt giới hạn của module csv
+                "b,,thừa\n"
+                ",2\n"                       # Thiếu nội dung
+                "c,2\n")
+        finally:
+            csv.field_size_limit(limit)
+        self.assertEqual([t.text for t in self.store.items], ["a", "c"])
+        self.assertEqual(result.added, 2)
+        self.assertEqual([r.pos for r in result.rejects], [3, 4, 5])
+
+    def test_broken_header_adds_nothing(self):
+        limit = csv.field_size_limit()
+        csv.field_size_limit(10)
+        try:
+            with self.assertRaises(ValueError):
+                self.import_csv("text" + "x" * 20 + "\na\n")
+        finally:
+            csv.field_size_limit(limit)
+        self.assertEqual(self.store.items, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+Kiểm thử phần lưu trữ của Store (todo_core): nhật ký, gộp nhật ký và
+nâng cấp dữ liệu định dạng cũ.
+
+Chạy: python -m pytest -q
+"""
+
+import json, os, shutil, sqlite3, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_core import SCHEMA_VERSION, SqliteStore, Store, migrate_json_to_sqlite  # noqa: E402
+
+
+class StoreTestCase(unittest.TestCase):
+    """Mỗi bài kiểm thử dùng một thư mục tạm riêng."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "todos.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open(self, **kwargs):
+        kwargs.setdefault("journal", True)
+        store = Store(self.path, **kwargs)
+        store.load()
+        return store
+
+    def texts(self, store):
+        return [t.text for t in store.items]
+
+
+class JournalTest(StoreTestCase):
+
+    def test_changes_are_appended_then_replayed(self):
+        s = self.open()
+        s.add({"text": "a"})
+        s.save()                       # Chưa có file chính: ghi snapshot
+        s.add({"text": "b"})
+        s.update(s.items[0].id, done=True)
+        s.save()                       # Chỉ ghi thêm vào nhật ký
+        with open(s.journal_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        s2 = self.open()
+        self.assertEqual(self.texts(s2), ["a", "b"])
+        self.assertTrue(s2.items[0].done)
+
+    def test_torn_last_line_is_dropped_and_later_edits_survive(self):
+        s = self.open()
+        s.add({"text": "a"})
+        s.save()
+        s.add({"text": "b"})
+        s.save()
+        # Mất điện giữa lúc ghi: dòng cuối bị cắt ngang
+        with open(s.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"op": "add", "item": {"text": "c"')
+
+        s2 = self.open()
+        self.assertEqual(self.texts(s2), ["a", "b"])
+        s2.add({"text": "d"})
+        s2.save()                      # Phải ghi lại file chính, không ghi sau dòng hỏng
+
+        s3 = self.open()
+        self.assertEqual(self.texts(s3), ["a", "b", "d"])
+        s3.add({"text": "e"})
+        s3.save()
+        self.assertEqual(self.texts(self.open()), ["a", "b", "d", "e"])
+
+    def test_garbage_line_forces_snapshot(self):
+        s = self.open()
+        s.add({"text": "a"})
+        s.save()
+        with open(s.journal_path, "ab") as f:
+            f.write(b"\xff\xfe garbage\n")
+
+        s2 = self.open()
+        self.assertEqual(self.texts(s2), ["a"])
+        s2.save()
+        self.assertFalse(os.path.exists(s2.journal_path))
+        self.assertEqual(self.texts(self.open()), ["a"])
+
+    def test_compaction_after_threshold(self):
+        s = self.open(compact_threshold=3)
+        s.add({"text": "t0"})
+        s.save()
+        for i in range(1, 4):
+            s.add({"text": f"t{i}"})
+            s.save()
+        self.assertTrue(os.path.exists(s.journal_path))
+        s.add({"text": "t4"})
+        s.save()                       # Vượt ngưỡng: gộp vào file chính
+        self.assertFalse(os.path.exists(s.journal_path))
+
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        self.assertEqual(raw["schema"], SCHEMA_VERSION)
+        self.assertEqual([it["text"] for it in raw["items"]], [f"t{i}" for i in range(5)])
+        self.assertEqual(self.texts(self.open(compact_threshold=3)), [f"t{i}" for i in range(5)])
+
+    def test_compact_removes_journal(self):
+        s = self.open()
+        s.add({"text": "a"})
+        s.save()
+        s.add({"text": "b"})
+        s.save()
+        s.compact()
+        self.assertFalse(os.path.exists(s.journal_path))
+        self.assertEqual(self.texts(self.open()), ["a", "b"])
+
+
+class FilterTest(StoreTestCase):
+
+    def test_store_changes_between_batches(self):
+        for key in ("default", "priority", "created_at", "due_dt"):
+            s = Store(os.path.join(self.dir, f"{key}.json"))
+            for i in range(10):
+                s.add({"text": f"việc {i}", "priority": i % 3 + 1})
+            gen = s.iter_filtered_ids("việc", "all", "all", key, chunk=3)
+            seen = list(next(gen))
+            # Xoá bớt giữa chừng: lần lọc không được lỗi vì vị trí đã đổi
+            for t in list(s.items)[:6]:
+                s.remove(t.id)
+            for batch in gen:
+                seen.extend(batch)
+            self.assertEqual(len(seen), 10)
+            self.assertEqual(len(set(seen)), 10)
+
+
+class DueIndexTest(StoreTestCase):
+
+    def test_same_due_is_ordered_by_id(self):
+        s = Store(self.path)
+        for tid in ("c", "a", "d", "b"):
+            s.add({"id": tid, "text": tid, "due_dt": "2030-01-01 09:00"})
+        s.add({"id": "z", "text": "z", "due_dt": "2029-12-31 09:00"})
+        self.assertEqual([t.id for t in s.due_index.between(None, None)], ["z", "a", "b", "c", "d"])
+
+        s.update("b", due_dt="2031-01-01 09:00")
+        s.remove("c")
+        s.extend([{"id": "0", "text": "0", "due_dt": "2030-01-01 09:00"}])
+        self.assertEqual([t.id for t in s.due_index.between(None, None)], ["z", "0", "a", "d", "b"])
+
+
+class ExtendTest(StoreTestCase):
+
+    def test_indexes_catch_up_after_extend(self):
+        s = Store(self.path)
+        s.add({"id": "a", "text": "cũ", "due_dt": "2030-01-01 09:00"})
+        s.extend([{"id": f"n{i}", "text": f"mới {i}", "due_dt": f"2030-01-0{i + 1} 08:00",
+                   "done": i == 2} for i in range(3)])
+        # Sửa/xoá trước khi chỉ mục được dựng cho lô vừa thêm
+        s.update("n1", text="đổi tên")
+        s.remove("n0")
+        self.assertEqual([t.id for t in s.due_index.between(None, None)], ["a", "n1", "n2"])
+        self.assertEqual([t.id for t in s.open_due_index.between(None, None)], ["a", "n1"])
+        self.assertEqual(s.filtered_ids("doi ten"), ["n1"])
+        self.assertEqual(s.filtered_ids("moi"), ["n2"])
+        self.assertEqual((s.stats.total, s.stats.done), (3, 1))
+        self.assertEqual(len(s.deadlines), 2)
+
+
+class SearchTest(StoreTestCase):
+
+    def test_query_without_words_matches_substring(self):
+        s = Store(self.path)
+        for text, note in [("Mua sữa", None), ("Sửa lỗi C++", None), ("Gọi điện", "!! gấp")]:
+            s.add({"text": text, "note": note})
+        self.assertEqual(s.filtered_ids(""), [t.id for t in s.items])
+        self.assertEqual(s.filtered_ids("   "), [t.id for t in s.items])
+        self.assertEqual(s.filtered_ids("++"), [s.items[1].id])
+        self.assertEqual(s.filtered_ids("!!"), [s.items[2].id])
+        self.assertEqual(s.filtered_ids("-"), [])
+        self.assertEqual(s.filtered_ids("sua"), [s.items[0].id, s.items[1].id])
+
+
+class UpdatedAtTest(StoreTestCase):
+
+    def test_updated_at_survives_reload(self):
+        s = self.open()
+        old = s.add({"text": "cũ", "created_at": "2020-01-01T00:00:00"})
+        s.save()
+        # Gán lại như dữ liệu của một phiên trước
+        s.update(old.id, updated_at="2020-01-01T00:00:00")
+        new = s.add({"text": "mới"})
+        s.update(new.id, note="ghi chú")
+        s.save()
+
+        s2 = self.open()
+        self.assertEqual(s2.get(old.id).updated_at, "2020-01-01T00:00:00")
+        self.assertIsNotNone(s2.get(new.id).updated_at)
+        self.assertEqual([t.text for t in s2.changed_since(since="2021-01-01")], ["mới"])
+
+        # Sửa không đổi giá trị thì không tính là thay đổi
+        s2.update(old.id, text="cũ")
+        self.assertEqual(s2.get(old.id).updated_at, "2020-01-01T00:00:00")
+        s2.update(old.id, done=True)
+        self.assertGreater(s2.get(old.id).updated_at, "2021")
+
+    def test_notified_batch_is_one_change_without_stamp(self):
+        db = os.path.join(self.dir, "todos.db")
+        for reopen in (self.open, lambda: SqliteStore(db)):
+            s = reopen()
+            s.load()
+            for x in "abc":
+                s.add({"id": x, "text": x, "due_dt": "2030-01-01 08:00"})
+            for t in s.items:
+                s.update(t.id, updated_at="2020-01-01T00:00:00")
+            s.save()
+            events = []
+            s.subscribe(events.append)
+            changed = s.update_many(["a", "b", "a"], notified=True)
+            self.assertEqual([t.id for t in changed], ["a", "b"])
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0].ids, ("a", "b"))
+            self.assertEqual(events[0].changes, {"notified": (False, True)})
+            self.assertEqual(s.update_many(["a"], notified=True), [])
+            with self.assertRaises(ValueError):
+                s.update_many(["c", "không-có"], notified=True)
+            self.assertFalse(s.get("c").notified)
+            s.save()
+
+            s2 = reopen()
+            s2.load()
+            self.assertEqual([t.notified for t in s2.items], [True, True, False])
+            self.assertEqual({t.updated_at for t in s2.items}, {"2020-01-01T00:00:00"})
+
+    def test_schema_3_gets_updated_at(self):
+        item = {"id": "a", "text": "a", "done": True, "priority": 1, "due_dt": None,
+                "created_at": "2025-01-01T08:00:00", "done_at": "2025-01-02T09:00:00",
+                "note": None, "notified": False}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"schema": 3, "items": [item]}, f)
+
+        s = self.open()
+        self.assertEqual(s.items[0].updated_at, "2025-01-02T09:00:00")
+        s.save()
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        self.assertEqual(raw["schema"], SCHEMA_VERSION)
+        self.assertEqual(raw["items"][0]["updated_at"], "2025-01-02T09:00:00")
+
+    def test_sqlite_persists_updated_at(self):
+        db = os.path.join(self.dir, "todos.db")
+        s = SqliteStore(db)
+        s.load()
+        t = s.add({"text": "a"})
+        s.update(t.id, updated_at="2020-05-05T05:05:05")
+        s.save()
+        s2 = SqliteStore(db)
+        s2.load()
+        self.assertEqual(s2.items[0].updated_at, "2020-05-05T05:05:05")
+
+    def test_sqlite_adds_missing_column(self):
+        db = os.path.join(self.dir, "todos.db")
+        con = sqlite3.connect(db)
+        con.execute("CREATE TABLE tasks (rid INTEGER PRIMARY KEY, pos REAL NOT NULL,"
+                    " text TEXT NOT NULL, done INTEGER NOT NULL, priority INTEGER NOT NULL,"
+                    " due_dt TEXT, created_at TEXT, done_at TEXT, note TEXT,"
+                    " notified INTEGER NOT NULL, extra TEXT, tid TEXT)")
+        con.execute("INSERT INTO tasks VALUES (1, 1.0, 'a', 0, 1, NULL,"
+                    " '2024-03-03T03:03:03', NULL, NULL, 0, NULL, 'x')")
+        con.commit()
+        con.close()
+
+        s = SqliteStore(db)
+        s.load()
+        self.assertEqual(s.items[0].updated_at, "2024-03-03T03:03:03")
+        s.update("x", note="n")
+        s.save()
+        s2 = SqliteStore(db)
+        s2.load()
+        self.assertEqual(s2.items[0].note, "n")
+        self.assertGreater(s2.items[0].updated_at, "2024-03-03T03:03:03")
+
+
+class SqliteMigrationTest(StoreTestCase):
+
+    def test_migration_keeps_order_and_updated_at(self):
+        s = self.open()
+        for tid in ("b", "a", "c"):
+            s.add({"id": tid, "text": tid, "due_dt": "2030-01-01 09:00" if tid == "a" else None})
+        s.update("a", updated_at="2020-01-01T00:00:00")
+        s.update("c", note="ghi chú", extra_field=1)
+        s.save()
+
+        db = os.path.join(self.dir, "todos.db")
+        self.assertEqual(migrate_json_to_sqlite(self.path, db), 3)
+        d = SqliteStore(db)
+        d.load()
+        self.assertEqual([t.to_dict() for t in d.items], [t.to_dict() for t in self.open().items])
+        self.assertEqual(d.get("a").updated_at, "2020-01-01T00:00:00")
+        self.assertEqual([t.id for t in d.changed_since(since="2021-01-01")], ["b", "c"])
+
+        # Sửa tiếp sau khi chuyển vẫn ghi đúng dòng
+        d.insert(1, {"id": "x", "text": "x"})
+        d.remove("b")
+        d.save()
+        d2 = SqliteStore(db)
+        d2.load()
+        self.assertEqual([t.id for t in d2.items], ["x", "a", "c"])
+
+
+class LegacyUpgradeTest(StoreTestCase):
+
+    def test_legacy_tasks_json_is_read_when_no_data_file(self):
+        legacy = os.path.join(self.dir, "tasks.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([{"text": "cũ", "date": "2025-11-15", "done": True}, "chuỗi trần"], f)
+
+        s = self.open(legacy_path=legacy)
+        self.assertEqual(self.texts(s), ["cũ", "chuỗi trần"])
+        self.assertEqual(s.items[0].due_dt, "2025-11-15 23:59")
+        self.assertTrue(s.items[0].done)
+        self.assertTrue(all(t.id for t in s.items))
+
+        s.save()
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        self.assertEqual(raw["schema"], SCHEMA_VERSION)
+        self.assertNotIn("date", raw["items"][0])
+
+    def test_schema_1_list_is_upgraded(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"text": "a", "due": "2025-01-02"}, {"text": "b", "due_dt": "2025-01-03 08:00"}], f)
+
+        s = self.open()
+        self.assertEqual([t.due_dt for t in s.items], ["2025-01-02 23:59", "2025-01-03 08:00"])
+        ids = [t.id for t in s.items]
+        s.save()
+        self.assertEqual([t.id for t in self.open().items], ids)
+
+    def test_schema_2_gets_ids(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"schema": 2, "items": [Store.migrate(None, {"text": "a"})]}, f)
+
+        s = self.open()
+        self.assertEqual(self.texts(s), ["a"])
+        self.assertTrue(s.items[0].id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,29 +10,28 @@
 """
 
 # Import các thư viện cần thiết
-import json, os, shutil, sys
+import os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime, date, timedelta
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 
-# ============================================================================
-# CÁC HẰNG SỐ CẤU HÌNH
-# ============================================================================
-
-# Đường dẫn thư mục chứa file chương trình
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Phần dữ liệu (không phụ thuộc PyQt5) nằm trong todo_core.py
+from todo_core import (
+    D_FMT, WEEKDAY_VN, StoreError, Task,
+    now_iso, open_store, parse_dt, start_of_week,
+)
 
-# Đường dẫn file JSON lưu trữ dữ liệu công việc
-DATA_FILE = os.path.join(BASE_DIR, "todos.json")
+# Giao diện dòng lệnh (python todo.py <lệnh> ...) nằm trong todo_cli.py
+import todo_cli
 
-# Định dạng ngày giờ: 2025-11-15 14:30
-DT_FMT = "%Y-%m-%d %H:%M"
+# Nhập công việc hàng loạt từ CSV/JSONL/JSON
+import todo_io
 
-# Định dạng ngày: 2025-11-15
-D_FMT  = "%Y-%m-%d"
-
-# Mảng tên thứ trong tuần (tiếng Việt)
-WEEKDAY_VN = ["Th 2","Th 3","Th 4","Th 5","Th 6","Th 7","CN"]
+# ============================================================================
+# CÁC HẰNG SỐ CẤU HÌNH GIAO DIỆN
+# ============================================================================
+# (Cấu hình dữ liệu như DATA_FILE, STORE_ENGINE, USE_JOURNAL nằm trong todo_core.py)
 
 # Định dạng ngày cho QDateEdit của PyQt5
 QT_D_FMT = "yyyy-MM-dd"
@@ -40,6 +39,23 @@ QT_D_FMT = "yyyy-MM-dd"
 # Định dạng ngày giờ cho QDateTimeEdit của PyQt5
 QT_DT_FMT = "yyyy-MM-dd HH:mm"
 
+# Khoảng thời gian gộp các lần lưu liên tiếp thành một lần ghi (ms)
+SAVE_DEBOUNCE_MS = 400
+
+# Thời gian chờ sau lần gõ phím cuối cùng trước khi tìm kiếm (ms)
+SEARCH_DEBOUNCE_MS = 200
+
+# Đổ danh sách dài theo từng lát: mỗi lát chạy tối đa FILL_SLICE_MS rồi
+# nhường cho giao diện; FILL_CHUNK là số công việc xét giữa hai lần xem giờ
+FILL_SLICE_MS = 12
+FILL_CHUNK = 500
+LIST_REMOVE_RESET = 64    # Xoá nhiều dòng hơn số này thì dựng lại cả model
+
+# Khi khởi động, FIRST_PAGE_SIZE công việc đầu tiên được đọc nhanh (Store.peek)
+# và hiển thị ngay, trong lúc toàn bộ dữ liệu được tải ở luồng nền.
+# Mục tiêu: cửa sổ vẽ xong lần đầu trong 150 ms với file 100.000 công việc.
+FIRST_PAGE_SIZE = 50
+
 # ============================================================================
 # CSS STYLESHEET - ĐỊNH DẠNG GIAO DIỆN
 # ============================================================================
@@ -75,9 +91,6 @@ QLabel#cardSubtitle {
     color: #647094;
     font-size: 13px;
 }
-QLabel#cardSubtitle[done="true"] {
-    color: #9aa3b9;
-}
 QLabel#statsLabel {
     font-size: 16px;
     font-weight: 600;
@@ -125,20 +138,11 @@ QComboBox, QDateEdit, QLineEdit {
 QLineEdit:focus, QComboBox:focus, QDateEdit:focus {
     border-color: #4c6ef5;
 }
-QListWidget#taskList {
+QListView#taskList {
     border: none;
     background-color: transparent;
 }
-QListWidget#taskList::item {
-    margin: 6px 10px;
-    border-radius: 12px;
-    padding: 12px 14px;
-}
-QListWidget#taskList::item:selected {
-    background-color: rgba(76, 110, 245, 0.16);
-    color: #1f2d3d;
-}
-QTableWidget {
+QTableView {
     border: none;
     background-color: transparent;
     gridline-color: #e1e7fb;
@@ -162,39 +166,6 @@ QScrollBar::handle {
 QScrollBar::handle:hover {
     background: rgba(76, 110, 245, 0.5);
 }
-QFrame#taskCard {
-    background: #f9faff;
-    border: 2px solid transparent;
-    border-radius: 16px;
-    padding: 14px 16px;
-}
-QFrame#taskCard[selected="true"] {
-    border-color: #4c6ef5;
-    box-shadow: 0 6px 18px rgba(76, 110, 245, 0.18);
-}
-QFrame#taskCard[done="true"] {
-    background: #eef2ff;
-}
-QLabel#taskTitle {
-    font-size: 15px;
-    font-weight: 600;
-    color: #1f2d3d;
-}
-QLabel#taskTitle[done="true"] {
-    color: #7a839b;
-    text-decoration: line-through;
-}
-QLabel#badge {
-    font-size: 24px;
-    min-width: 36px;
-    color: #4c6ef5;
-}
-QLabel#badge[done="true"] {
-    color: #2b8a3e;
-}
-QLabel#badge[overdue="true"] {
-    color: #e03131;
-}
 QLabel#chip {
     border-radius: 999px;
     padding: 4px 14px;
@@ -249,69 +220,40 @@ QProgressBar::chunk {
 }
 """
 
-# ============================================================================
-# CÁC HÀM TIỆN ÍCH (UTILITY FUNCTIONS)
-# ============================================================================
-
-def now_iso():
-    """
-    Lấy thời gian hiện tại và trả về dạng chuỗi ISO 8601.
-
-    Returns:
-        str: Chuỗi thời gian dạng "2025-11-15T14:30:00"
-
-    Ví dụ: "2025-11-15T14:30:00"
-    """
-    return datetime.now().isoformat(timespec="seconds")
-
-
-def start_of_week(d: date) -> date:
-    """
-    Tìm ngày đầu tuần (Thứ Hai) của một ngày bất kỳ.
-
-    Args:
-        d (date): Ngày cần tìm đầu tuần
-
-    Returns:
-        date: Ngày thứ Hai của tuần đó
-
-    Ví dụ: Nếu d = 15/11/2025 (Thứ Sáu) → trả về 11/11/2025 (Thứ Hai)
-    """
-    return d - timedelta(days=d.weekday())
-
-
-def end_of_week(d: date) -> date:
-    """
-    Tìm ngày cuối tuần (Chủ Nhật) của một ngày bất kỳ.
-
-    Args:
-        d (date): Ngày cần tìm cuối tuần
-
-    Returns:
-        date: Ngày Chủ Nhật của tuần đó
-
-    Ví dụ: Nếu d = 15/11/2025 (Thứ Sáu) → trả về 17/11/2025 (Chủ Nhật)
-    """
-    return start_of_week(d) + timedelta(days=6)
+# Màu (nền, chữ) của các chip trên thẻ công việc do TaskCardDelegate tự vẽ,
+# giống với QLabel#chip[variant=...] trong APP_STYLESHEET
+CHIP_COLORS = {
+    "status-done": ("#d3f9d8", "#2b8a3e"),
+    "status-todo": ("#fff3bf", "#d9480f"),
+    "priority-high": ("#ffe3e3", "#e03131"),
+    "priority-normal": ("#dee2ff", "#3b5bdb"),
+    "priority-low": ("#e6fcf5", "#0ca678"),
+    "due": ("#dbe4ff", "#3b5bdb"),
+    "overdue": ("#ffe3e3", "#c92a2a"),
+}
 
+# Chiều cao mỗi dòng trong danh sách công việc (px). Mọi dòng cao bằng
+# nhau để QListView không phải đo từng dòng khi cuộn hay làm mới.
+CARD_ROW_HEIGHT = 124
 
-def parse_dt(s):
-    """
-    Chuyển đổi chuỗi thành đối tượng datetime.
+# Bộ nhớ tối đa (MB) cho ảnh các thẻ công việc đã vẽ sẵn (QPixmapCache).
+# Mỗi thẻ chỉ được vẽ lại khi công việc đổi, khi được chọn/bỏ chọn hoặc
+# khi danh sách đổi kích thước; 0 = tắt, luôn vẽ trực tiếp.
+CARD_PIXMAP_CACHE_MB = 64
 
-    Args:
-        s (str): Chuỗi ngày giờ dạng "2025-11-15 14:30"
-
-    Returns:
-        datetime hoặc None: Đối tượng datetime nếu hợp lệ, None nếu lỗi
+# Số bản ghi lỗi tối đa được liệt kê sau khi nhập file (Main.import_file)
+IMPORT_REJECTS_SHOWN = 10
 
-    Ví dụ: "2025-11-15 14:30" → datetime(2025, 11, 15, 14, 30)
-    """
-    try:
-        return datetime.strptime(s, DT_FMT) if s else None
-    except Exception:
-        return None
+# Các loại file trong hộp thoại xuất (Main.export_file) → định dạng
+EXPORT_FILTERS = {
+    "CSV (*.csv)": "csv",
+    "JSON Lines (*.jsonl)": "jsonl",
+    "iCalendar (*.ics)": "ics",
+}
 
+# ============================================================================
+# CÁC HÀM TIỆN ÍCH (UTILITY FUNCTIONS)
+# ============================================================================
 
 def qdatetime_from_str(s):
     """
@@ -361,109 +303,141 @@ def format_qdatetime(dt: QtCore.QDateTime) -> str:
         return ""
     return dt.toString(QT_DT_FMT)
 
-
 # ============================================================================
-# LỚP STORE - QUẢN LÝ DỮ LIỆU (DATA STORAGE)
+# LỚP BACKGROUNDSAVER - LƯU DỮ LIỆU Ở LUỒNG NỀN
 # ============================================================================
 
-class Store:
+class BackgroundSaver(QtCore.QObject):
     """
-    Lớp quản lý việc đọc/ghi dữ liệu công việc vào file JSON.
+    Lưu dữ liệu của Store ở luồng nền để giao diện không bị đứng khi ghi đĩa.
+
+    Mỗi thay đổi của Store (nhận qua Store.subscribe) gọi schedule(); các
+    lần gọi liên tiếp trong khoảng delay_ms được gộp thành một lần ghi duy
+    nhất. Việc chụp dữ liệu (Store.prepare_save) chạy trên
+    luồng giao diện, còn việc ghi file chạy trên một luồng nền duy nhất nên
+    các lần ghi luôn theo đúng thứ tự.
 
-    Attributes:
-        path (str): Đường dẫn đến file JSON lưu trữ
-        items (list): Danh sách các công việc (mỗi công việc là một dict)
+    Signals:
+        failed (str): Phát ra khi ghi lỗi (được chuyển về luồng giao diện)
     """
 
-    def __init__(self, path):
-        """
-        Khởi tạo Store với đường dẫn file.
+    failed = QtCore.pyqtSignal(str)
 
+    def __init__(self, store, *, delay_ms=SAVE_DEBOUNCE_MS, parent=None):
+        """
         Args:
-            path (str): Đường dẫn đến file JSON
+            store (Store): Store cần lưu
+            delay_ms (int): Khoảng thời gian gộp các lần lưu (ms)
+            parent: QObject cha
         """
-        self.path = path
-        self.items = []
+        super().__init__(parent)
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="todo-save")
+        self._futures = set()
+        self._lock = threading.Lock()  # _on_done sửa _futures trên luồng nền
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._submit)
+
+        # Mọi thay đổi dữ liệu đều tự động được lên lịch lưu
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, event):
+        if event.kind != "reset":  # Vừa tải lại từ đĩa: không có gì mới để lưu
+            self.schedule()
+
+    def schedule(self):
+        """Yêu cầu lưu; lần ghi thực sự diễn ra sau tối đa delay_ms."""
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _submit(self):
+        """Chụp dữ liệu hiện tại và giao việc ghi cho luồng nền."""
+        job = self.store.prepare_save()
+        future = self._executor.submit(job)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        """Chạy trên luồng nền khi một lần ghi kết thúc."""
+        with self._lock:
+            self._futures.discard(future)
+        err = future.exception()
+        if err is not None:
+            self.failed.emit(str(err))
+
+    def wait(self, timeout=None):
+        """Chờ các lần ghi đang chạy ở luồng nền hoàn tất (dùng khi kiểm thử)."""
+        with self._lock:
+            futures = list(self._futures)
+        wait_futures(futures, timeout=timeout)
+
+    def flush(self):
+        """Ghi ngay các thay đổi đang chờ và đợi ghi xong (dùng khi đóng app)."""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._submit()
+        self.wait()
+
+    def shutdown(self):
+        """Ghi nốt dữ liệu và dừng luồng nền."""
+        self.flush()
+        self._executor.shutdown(wait=True)
 
-    def migrate(self, it):
-        """
-        Chuyển đổi và chuẩn hóa dữ liệu công việc.
 
-        Hàm này đảm bảo mọi công việc có đầy đủ các trường cần thiết,
-        và chuyển đổi dữ liệu cũ sang định dạng mới (nếu cần).
+# ============================================================================
+# LỚP STORELOADER - TẢI DỮ LIỆU Ở LUỒNG NỀN
+# ============================================================================
 
-        Args:
-            it: Dữ liệu công việc (có thể là dict hoặc string)
+class StoreLoader(QtCore.QObject):
+    """
+    Chạy Store.load() ở luồng nền để cửa sổ hiện ra ngay khi khởi động.
 
-        Returns:
-            dict: Công việc đã được chuẩn hóa với đầy đủ các trường:
-                - text (str): Nội dung công việc
-                - done (bool): Trạng thái hoàn thành
-                - priority (int): Mức ưu tiên (0=thấp, 1=thường, 2=cao)
-                - due_dt (str): Hạn chót dạng "2025-11-15 14:30"
-                - created_at (str): Thời gian tạo dạng ISO
-                - done_at (str): Thời gian hoàn thành
-                - note (str): Ghi chú
-                - notified (bool): Đã thông báo chưa
-        """
-        # Chuyển thành dict nếu chưa phải
-        it = dict(it) if isinstance(it, dict) else {"text": str(it)}
-
-        # Đảm bảo có đầy đủ các trường
-        it.setdefault("text", "")
-        it.setdefault("done", False)
-        it.setdefault("priority", 1)  # 0=thấp, 1=thường, 2=cao
-
-        # Nâng cấp từ định dạng cũ (due) sang định dạng mới (due_dt)
-        if "due_dt" not in it:
-            due = it.get("due")  # Định dạng cũ chỉ có ngày
-            it["due_dt"] = f"{due} 23:59" if due else None
-        it.pop("due", None)  # Xóa trường cũ
-
-        it.setdefault("created_at", now_iso())
-        it.setdefault("done_at", None)
-        it.setdefault("note", None)
-        it.setdefault("notified", False)  # Đã gửi thông báo chưa
-        return it
-
-    def load(self):
-        """
-        Tải dữ liệu từ file JSON vào bộ nhớ.
-
-        Nếu file không tồn tại hoặc bị lỗi, sẽ khởi tạo danh sách rỗng
-        và hiện thông báo lỗi cho người dùng.
-        """
-        if not os.path.exists(self.path):
-            self.items = []
-            return
+    Việc đọc file, nâng cấp phiên bản, áp dụng nhật ký và dựng chỉ mục
+    đều chạy trên luồng nền. Trong lúc đó luồng giao diện không được đụng
+    tới Store. Sự kiện "reset" cuối load() cũng phát ra trên luồng nền:
+    cửa sổ chỉ subscribe() sau khi tải xong, còn BackgroundSaver (đã
+    subscribe từ trước) bỏ qua sự kiện "reset" nên không gọi gì tới Qt.
 
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            # Chuẩn hóa từng công việc
-            self.items = [self.migrate(x) for x in (raw if isinstance(raw, list) else [])]
-        except Exception as e:
-            self.items = []
-            QtWidgets.QMessageBox.warning(None, "Lỗi đọc dữ liệu",
-                                          f"Không thể đọc tệp {os.path.basename(self.path)}:\n{e}")
+    Signals:
+        loaded (object): Phát ra khi tải xong (được chuyển về luồng giao
+            diện), kèm thông báo lỗi (str) hoặc None
+    """
 
-    def save(self):
-        """
-        Lưu dữ liệu từ bộ nhớ vào file JSON.
+    loaded = QtCore.pyqtSignal(object)
 
-        Trước khi lưu, sẽ tạo bản sao lưu (.bak) của file hiện tại.
-        Nếu có lỗi, sẽ hiển thị thông báo lỗi.
+    def __init__(self, store, parent=None):
+        """
+        Args:
+            store (Store): Store cần tải
+            parent: QObject cha
         """
+        super().__init__(parent)
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="todo-load")
+        self._future = None
+
+    def start(self):
+        """Bắt đầu tải ở luồng nền."""
+        self._future = self._executor.submit(self._run)
+        self._executor.shutdown(wait=False)  # Luồng nền tự kết thúc sau khi tải xong
+
+    def _run(self):
+        """Chạy trên luồng nền."""
         try:
-            # Tạo bản backup trước khi ghi đè
-            if os.path.exists(self.path):
-                shutil.copyfile(self.path, self.path + ".bak")
+            self.store.load()
+            error = None
+        except Exception as e:  # StoreError, hoặc lỗi bất ngờ khi dựng chỉ mục
+            error = str(e)
+        self.loaded.emit(error)
 
-            # Ghi dữ liệu vào file JSON với indent đẹp
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self.items, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(None, "Lỗi lưu", str(e))
+    def wait(self, timeout=None):
+        """Chờ luồng nền tải xong (dùng khi đóng app hoặc kiểm thử)."""
+        if self._future is not None:
+            wait_futures([self._future], timeout=timeout)
 
 
 # ============================================================================
@@ -488,7 +462,7 @@ class TaskDialog(QtWidgets.QDialog):
         Args:
             parent: Widget cha
             title (str): Tiêu đề của hộp thoại
-            task (dict): Dữ liệu công việc để chỉnh sửa (None nếu thêm mới)
+            task (Task): Dữ liệu công việc để chỉnh sửa (None nếu thêm mới)
         """
         super().__init__(parent)
         self.setWindowTitle(title)
@@ -554,21 +528,21 @@ class TaskDialog(QtWidgets.QDialog):
 
         # Nếu có dữ liệu task (chế độ chỉnh sửa), điền vào form
         if task:
-            self.text_edit.setText(task.get("text", ""))
+            self.text_edit.setText(task.text)
 
             # Chọn mức ưu tiên
-            target_idx = self.priority_combo.findData(int(task.get("priority", 1)))
+            target_idx = self.priority_combo.findData(int(task.priority))
             if target_idx != -1:
                 self.priority_combo.setCurrentIndex(target_idx)
 
             # Điền hạn chót nếu có
-            due = task.get("due_dt")
+            due = task.due_dt
             if due:
                 self.due_checkbox.setChecked(True)
                 self.due_edit.setDateTime(qdatetime_from_str(due))
 
             # Điền ghi chú nếu có
-            note = task.get("note")
+            note = task.note
             if note:
                 self.note_edit.setPlainText(note)
 
@@ -627,6 +601,587 @@ class TaskDialog(QtWidgets.QDialog):
         }
 
 
+# ============================================================================
+# BỘ NHỚ ĐỆM DỮ LIỆU HIỂN THỊ
+# ============================================================================
+
+class TaskDisplay:
+    """
+    Các chuỗi hiển thị của một công việc, tính sẵn một lần.
+
+    Gồm mọi thứ thẻ công việc (Tab 1) và các bảng (Tab 2, 3, 4) cần vẽ:
+    chip, tooltip, ghi chú một dòng, giờ/ngày/thứ của hạn chót, chữ ưu
+    tiên và trạng thái. Nhờ vậy mỗi lần vẽ lại không phải gọi strftime()
+    hay ghép chuỗi nữa.
+    """
+
+    __slots__ = ("key", "rev", "overdue", "text", "priority", "status", "chips", "note",
+                 "tooltip", "time", "date", "weekday", "due_full")
+
+    def __init__(self, task, overdue, generation=0):
+        """
+        Args:
+            task (Task): Công việc cần hiển thị
+            overdue (bool): Công việc đang quá hạn hay không
+            generation (int): Thế hệ của RenderCache (xem RenderCache.clear)
+        """
+        # Khóa duy nhất cho nội dung này, dùng cho ảnh thẻ vẽ sẵn
+        self.key = f"{task.id}:{task.rev}:{generation}:{int(overdue)}"
+        self.rev = task.rev
+        self.overdue = overdue
+        self.text = task.text
+
+        priority = int(task.priority)
+        self.priority = PRIORITY_VN.get(priority, "Thường")
+        if task.done:
+            self.status = "Đã xong"
+        else:
+            self.status = "Quá hạn" if overdue else "Chưa xong"
+
+        due = task.due
+        if due:
+            self.time = due.strftime("%H:%M")
+            self.date = due.strftime(D_FMT)
+            self.weekday = WEEKDAY_VN[due.weekday()]
+            self.due_full = due.strftime("%d/%m/%Y %H:%M")
+            short_due = due.strftime("%d/%m %H:%M")
+        else:
+            self.time = self.date = self.weekday = self.due_full = ""
+            short_due = None
+
+        # Các chip: ưu tiên, trạng thái, hạn chót, ngày tạo
+        chips = [
+            ({2: "Ưu tiên cao", 1: "Ưu tiên thường", 0: "Ưu tiên thấp"}.get(priority, "Ưu tiên"),
+             {2: "priority-high", 1: "priority-normal", 0: "priority-low"}.get(priority, "priority-normal")),
+            ("Đã hoàn thành" if task.done else "Đang thực hiện",
+             "status-done" if task.done else "status-todo"),
+        ]
+        if short_due:
+            chips.append((f"Hạn: {short_due}", "overdue" if overdue else "due"))
+        elif task.due_dt:
+            chips.append((f"Hạn: {task.due_dt}", "due"))
+        if task.created_at:
+            chips.append((f"Tạo: {task.created_at.split('T')[0]}", "priority-normal"))
+        self.chips = tuple(chips)
+
+        self.note = task.note.replace("\n", " ") if task.note else None
+
+        tooltip_lines = [f"Ưu tiên: {self.priority}", f"Hạn chót: {short_due or 'Không hạn'}"]
+        if overdue:
+            tooltip_lines.append("Trạng thái: Quá hạn")
+        if task.note:
+            tooltip_lines.append(f"Ghi chú: {task.note}")
+        self.tooltip = "\n".join(tooltip_lines)
+
+
+class RenderCache:
+    """
+    Bộ nhớ đệm TaskDisplay theo mã công việc, dùng chung cho danh sách và
+    các bảng.
+
+    Một mục được coi là cũ khi công việc đã bị sửa (Task.rev khác) hoặc khi
+    trạng thái quá hạn đổi (đồng hồ vừa vượt qua hạn chót) - lúc đó mục
+    được tính lại ngay khi cần vẽ.
+    """
+
+    def __init__(self):
+        self._entries = {}   # Task.id → TaskDisplay
+        self.generation = 0  # Tăng mỗi lần clear(), để khóa cũ không bị dùng lại
+
+    def get(self, task, now):
+        """
+        Lấy dữ liệu hiển thị của task, tính lại nếu mục cũ đã lỗi thời.
+
+        Args:
+            task (Task): Công việc cần hiển thị
+            now (datetime): Mốc thời gian để xét quá hạn
+
+        Returns:
+            TaskDisplay: Dữ liệu hiển thị của task
+        """
+        overdue = bool(task.due and task.due < now and not task.done)
+        entry = self._entries.get(task.id)
+        if entry is None or entry.rev != task.rev or entry.overdue != overdue:
+            entry = TaskDisplay(task, overdue, self.generation)
+            self._entries[task.id] = entry
+        return entry
+
+    def discard(self, task_id):
+        """Bỏ mục của một công việc (ví dụ khi công việc bị xóa)."""
+        self._entries.pop(task_id, None)
+
+    def clear(self):
+        """Bỏ toàn bộ các mục (ví dụ khi dữ liệu được nạp lại)."""
+        self._entries.clear()
+        self.generation += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ============================================================================
+# DANH SÁCH CÔNG VIỆC DẠNG MODEL/VIEW
+# ============================================================================
+
+# Các role riêng để delegate lấy dữ liệu từ model
+TASK_ROLE = QtCore.Qt.UserRole + 1      # Đối tượng Task
+OVERDUE_ROLE = QtCore.Qt.UserRole + 2   # Task đã quá hạn chưa (bool)
+DISPLAY_ROLE = QtCore.Qt.UserRole + 3   # Dữ liệu hiển thị tính sẵn (TaskDisplay)
+
+
+class TaskListModel(QtCore.QAbstractListModel):
+    """
+    Model cho danh sách công việc ở Tab 1.
+
+    Model không tạo widget nào: mỗi dòng chỉ là mã (Task.id) của công
+    việc, tra ra Task qua store.by_id. Việc vẽ thẻ công việc do
+    TaskCardDelegate đảm nhận, và Qt chỉ vẽ những dòng đang hiển thị trên
+    màn hình.
+    """
+
+    def __init__(self, store, render_cache, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.render_cache = render_cache
+        self._rows = []              # Mã công việc của từng dòng
+        self._source = None          # Danh sách đã truyền vào set_rows() lần trước
+        self._row_of = None          # Mã công việc → số dòng, tạo khi cần
+        self._preview = None         # Mã → Task khi đang xem trước (xem show_preview)
+        self.now = datetime.now()    # Mốc thời gian để xét quá hạn
+
+    def show_preview(self, tasks):
+        """
+        Hiển thị tạm các công việc chưa nằm trong Store (lúc Store còn đang
+        tải ở luồng nền). Lần set_rows() tiếp theo sẽ thay thế chúng.
+        """
+        self.now = datetime.now()
+        self.beginResetModel()
+        self._preview = {t.id: t for t in tasks}
+        self._source = None
+        self._rows = list(self._preview)
+        self._row_of = None
+        self.endResetModel()
+
+    def set_rows(self, ids):
+        """
+        Thay toàn bộ danh sách dòng (sau khi lọc/sắp xếp).
+
+        Nếu ids vẫn là đúng danh sách lần trước (kết quả lấy từ bộ nhớ đệm
+        của Store) thì giữ nguyên các dòng, không mất lựa chọn hiện tại.
+        """
+        self.now = datetime.now()
+        if ids is self._source:
+            return
+        self.beginResetModel()
+        self._preview = None
+        self._source = ids
+        self._rows = list(ids)
+        self._row_of = None
+        self.endResetModel()
+
+    def append_rows(self, ids):
+        """Thêm các dòng vào cuối (dùng khi đổ danh sách dần từng phần)."""
+        if not ids:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(ids) - 1)
+        self._rows.extend(ids)
+        self._row_of = None
+        self.endInsertRows()
+
+    def update_task(self, task_id):
+        """Báo cho danh sách vẽ lại dòng của công việc task_id (nếu đang hiển thị)."""
+        if self._row_of is None:
+            self._row_of = {tid: r for r, tid in enumerate(self._rows)}
+        row = self._row_of.get(task_id)
+        if row is not None:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+    def remove_ids(self, ids):
+        """
+        Bỏ ngay các dòng của những công việc đã bị xoá khỏi Store.
+
+        Dùng cả khi Tab 1 đang ẩn (chưa được lọc lại), để danh sách không
+        giữ mã của công việc không còn tồn tại. Xoá ít dòng thì báo từng
+        dòng để giữ lựa chọn hiện tại; xoá nhiều thì dựng lại cả model.
+        """
+        if self._preview is not None:
+            return
+        if self._row_of is None:
+            self._row_of = {tid: r for r, tid in enumerate(self._rows)}
+        rows = sorted({self._row_of[tid] for tid in ids if tid in self._row_of}, reverse=True)
+        if not rows:
+            return
+        self._source = None
+        if len(rows) > LIST_REMOVE_RESET:
+            gone = set(ids)
+            self.beginResetModel()
+            self._rows = [tid for tid in self._rows if tid not in gone]
+            self._row_of = None
+            self.endResetModel()
+            return
+        for row in rows:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+        self._row_of = None
+
+    def drop_missing(self):
+        """Bỏ các dòng có mã không còn trong Store (ví dụ sau khi tải lại)."""
+        by_id = self.store.by_id
+        self.remove_ids([tid for tid in self._rows if tid not in by_id])
+
+    def task_id(self, row):
+        """Đổi số thứ tự dòng thành mã công việc (None nếu sai)."""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tid = self._rows[index.row()]
+        it = (self.store.by_id if self._preview is None else self._preview)[tid]
+
+        if role == TASK_ROLE:
+            return it
+        if role == QtCore.Qt.UserRole:
+            return tid
+        if role == QtCore.Qt.DisplayRole:
+            return it.text
+        if role == DISPLAY_ROLE:
+            return self.render_cache.get(it, self.now)
+        if role == OVERDUE_ROLE:
+            return self.render_cache.get(it, self.now).overdue
+        if role == QtCore.Qt.ToolTipRole:
+            return self.render_cache.get(it, self.now).tooltip
+        return None
+
+
+class ProgressiveFill(QtCore.QObject):
+    """
+    Chạy dần một generator trên vòng lặp sự kiện của Qt.
+
+    Mỗi lượt lấy các lô kết quả từ generator trong tối đa slice_ms rồi
+    nhường lại cho giao diện; QTimer với khoảng 0 ms gọi lượt tiếp theo khi
+    không còn sự kiện nào chờ xử lý. Lượt đầu tiên chạy ngay trong start()
+    để màn hình đầu tiên có dữ liệu lập tức.
+
+    Signals:
+        chunk (object): Một lô kết quả (list)
+        finished (): Generator đã chạy hết
+    """
+
+    chunk = QtCore.pyqtSignal(object)
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, *, slice_ms=FILL_SLICE_MS, parent=None):
+        super().__init__(parent)
+        self.slice_ms = slice_ms
+        self._gen = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+    def start(self, gen):
+        """Huỷ lần chạy trước (nếu có) và bắt đầu chạy gen."""
+        self.cancel()
+        self._gen = gen
+        self._step()
+        if self._gen is gen:
+            self._timer.start()
+
+    def cancel(self):
+        """Dừng giữa chừng (ví dụ khi người dùng đổi bộ lọc)."""
+        self._timer.stop()
+        if self._gen is not None:
+            self._gen.close()
+            self._gen = None
+
+    def finish(self):
+        """Chạy nốt phần còn lại ngay lập tức (khi cần đủ mọi dòng)."""
+        while self._gen is not None:
+            self._step(budget=None)
+
+    def is_running(self):
+        return self._gen is not None
+
+    def _step(self, budget=-1):
+        gen = self._gen
+        if gen is None:
+            return
+        if budget == -1:
+            budget = self.slice_ms / 1000
+        deadline = None if budget is None else time.perf_counter() + budget
+        try:
+            while True:
+                batch = next(gen)
+                if batch:
+                    self.chunk.emit(batch)
+                if self._gen is not gen:
+                    return  # Bị huỷ trong lúc xử lý lô vừa rồi
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+        except StopIteration:
+            self._timer.stop()
+            self._gen = None
+            self.finished.emit()
+
+
+class TaskCardDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Vẽ thẻ công việc (huy hiệu, tiêu đề, các chip, ghi chú) bằng QPainter.
+
+    Màu sắc, cỡ chữ và bo góc được đặt ngay trong _paint_card (thẻ không
+    phải widget nên APP_STYLESHEET không áp dụng); vì không tạo widget nên
+    chi phí chỉ phụ thuộc vào số dòng đang hiển thị.
+
+    Nếu CARD_PIXMAP_CACHE_MB > 0, mỗi thẻ được vẽ một lần vào QPixmap và
+    giữ trong QPixmapCache theo khóa (mã + phiên bản công việc, được chọn,
+    kích thước, font, bảng màu); các lần vẽ sau (cuộn, di chuột) chỉ còn
+    là chép ảnh.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        limit_kb = CARD_PIXMAP_CACHE_MB * 1024
+        if limit_kb > QtGui.QPixmapCache.cacheLimit():
+            QtGui.QPixmapCache.setCacheLimit(limit_kb)
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(0, CARD_ROW_HEIGHT)
+
+    def _font(self, base, px, *, bold=False, weight=None):
+        f = QtGui.QFont(base)
+        f.setPixelSize(px)
+        if weight is not None:
+            f.setWeight(weight)
+        else:
+            f.setBold(bold)
+        return f
+
+    def _draw_chip(self, painter, x, y, text, variant, max_right):
+        """Vẽ một chip bo tròn; trả về toạ độ x kết thúc (hoặc None nếu hết chỗ)."""
+        bg, fg = CHIP_COLORS.get(variant, ("#e7ecff", "#42527a"))
+        fm = painter.fontMetrics()
+        w = fm.horizontalAdvance(text) + 20
+        h = fm.height() + 6
+        if x + w > max_right:
+            return None
+        rect = QtCore.QRectF(x, y, w, h)
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor(bg))
+        painter.drawRoundedRect(rect, h / 2, h / 2)
+        painter.setPen(QtGui.QColor(fg))
+        painter.drawText(rect, QtCore.Qt.AlignCenter, text)
+        return x + w
+
+    def paint(self, painter, option, index):
+        it = index.data(TASK_ROLE)
+        if it is None:
+            return
+        disp = index.data(DISPLAY_ROLE)
+        selected = bool(option.state & QtWidgets.QStyle.State_Selected)
+
+        if CARD_PIXMAP_CACHE_MB <= 0:
+            self._paint_card(painter, QtCore.QRectF(option.rect), option.font, it, disp, selected)
+            return
+
+        size = option.rect.size()
+        ratio = painter.device().devicePixelRatioF()
+        key = (f"todo-card:{disp.key}:{int(selected)}:{size.width()}x{size.height()}@{ratio}:"
+               f"{option.font.key()}:{option.palette.cacheKey()}")
+        pixmap = QtGui.QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = QtGui.QPixmap(size * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(QtCore.Qt.transparent)
+            card_painter = QtGui.QPainter(pixmap)
+            self._paint_card(card_painter, QtCore.QRectF(0, 0, size.width(), size.height()),
+                             option.font, it, disp, selected)
+            card_painter.end()
+            QtGui.QPixmapCache.insert(key, pixmap)
+        painter.drawPixmap(option.rect.topLeft(), pixmap)
+
+    def _paint_card(self, painter, rect, base_font, it, disp, selected):
+        """Vẽ toàn bộ thẻ của công việc it vào vùng rect."""
+        overdue = disp.overdue
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+
+        # Khung thẻ: nền nhạt hơn khi chưa xong, viền xanh khi được chọn
+        card = rect.adjusted(10, 4, -10, -4)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#4c6ef5"), 2) if selected else QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor("#eef2ff" if it.done else "#f9faff"))
+        painter.drawRoundedRect(card.adjusted(1, 1, -1, -1), 16, 16)
+
+        inner = card.adjusted(16, 14, -16, -14)
+
+        # Huy hiệu: đỏ khi quá hạn, xanh lá khi đã xong
+        badge_color = "#e03131" if overdue else ("#2b8a3e" if it.done else "#4c6ef5")
+        painter.setFont(self._font(base_font, 24))
+        painter.setPen(QtGui.QColor(badge_color))
+        painter.drawText(QtCore.QRectF(inner.left(), inner.top(), 36, 36),
+                         QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, "✔" if it.done else "⏳")
+
+        x = inner.left() + 36 + 14
+        right = inner.right()
+        y = inner.top()
+
+        # Tiêu đề: gạch ngang và nhạt màu khi đã xong
+        title_font = self._font(base_font, 15, bold=True)
+        title_font.setStrikeOut(bool(it.done))
+        painter.setFont(title_font)
+        painter.setPen(QtGui.QColor("#7a839b" if it.done else "#1f2d3d"))
+        fm = painter.fontMetrics()
+        painter.drawText(QtCore.QRectF(x, y, right - x, fm.height()),
+                         QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+                         fm.elidedText(it.text, QtCore.Qt.ElideRight, int(right - x)))
+        y += fm.height() + 8
+
+        # Các chip: ưu tiên, trạng thái, hạn chót, ngày tạo
+        painter.setFont(self._font(base_font, 12, weight=QtGui.QFont.Medium))
+        chip_h = painter.fontMetrics().height() + 6
+        cx = x
+        for text, variant in disp.chips:
+            end = self._draw_chip(painter, cx, y, text, variant, right)
+            if end is None:
+                break
+            cx = end + 8
+        y += chip_h + 8
+
+        # Ghi chú: cùng màu/cỡ chữ với QLabel#cardSubtitle, nhạt hơn khi đã xong
+        if disp.note:
+            painter.setFont(self._font(base_font, 13))
+            painter.setPen(QtGui.QColor("#9aa3b9" if it.done else "#647094"))
+            fm = painter.fontMetrics()
+            painter.drawText(QtCore.QRectF(x, y, right - x, fm.height()),
+                             QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+                             fm.elidedText(disp.note, QtCore.Qt.ElideRight, int(right - x)))
+
+        painter.restore()
+
+
+# ============================================================================
+# BẢNG CÔNG VIỆC DẠNG MODEL/VIEW (TAB NGÀY, TUẦN, QUÁ HẠN)
+# ============================================================================
+
+# Tên mức ưu tiên hiển thị trong bảng
+PRIORITY_VN = {0: "Thấp", 1: "Thường", 2: "Cao"}
+
+# Màu chữ cột trạng thái
+OVERDUE_COLOR = "#e03131"   # Đỏ
+DONE_COLOR = "#2b8a3e"      # Xanh lá
+
+# Chiều cao mỗi dòng trong bảng (px)
+TABLE_ROW_HEIGHT = 36
+
+
+class TaskTableModel(QtCore.QAbstractTableModel):
+    """
+    Model dùng chung cho các bảng ở Tab 2, 3, 4.
+
+    Mỗi bảng được mô tả bằng danh sách cột (tiêu đề, hàm lấy giá trị, loại);
+    hàm lấy giá trị nhận TaskDisplay của công việc (xem RenderCache):
+    - "content": cột nội dung, căn trái, tooltip là ghi chú
+    - "status": cột trạng thái, tô màu đỏ (quá hạn) hoặc xanh (đã xong)
+    - "alert": luôn tô màu đỏ (ví dụ cột hạn chót ở tab Quá hạn)
+    - None: cột thường, căn giữa
+
+    Chuỗi của từng ô được tính sẵn một lần cho mỗi công việc trong
+    RenderCache, không tạo QTableWidgetItem nào.
+    """
+
+    def __init__(self, columns, render_cache, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.render_cache = render_cache
+        self._tasks = []
+        self._rows_by_task = None   # id(task) → số dòng, tạo khi cần
+        self.now = datetime.now()
+
+    def set_tasks(self, tasks, now=None):
+        """Thay toàn bộ các dòng của bảng."""
+        self.beginResetModel()
+        self._tasks = list(tasks)
+        self._rows_by_task = None
+        self.now = now or datetime.now()
+        self.endResetModel()
+
+    def update_task(self, task):
+        """Báo cho bảng vẽ lại đúng một dòng của task (nếu task có trong bảng)."""
+        if self._rows_by_task is None:
+            self._rows_by_task = {id(t): r for r, t in enumerate(self._tasks)}
+        row = self._rows_by_task.get(id(task))
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.columns[section][0]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        it = self._tasks[index.row()]
+        _, value, kind = self.columns[index.column()]
+
+        if role == QtCore.Qt.DisplayRole:
+            disp = self.render_cache.get(it, self.now)
+            return disp.status if kind == "status" else value(disp)
+        if role == QtCore.Qt.TextAlignmentRole:
+            if kind == "content":
+                return int(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
+            return int(QtCore.Qt.AlignCenter)
+        if role == QtCore.Qt.ForegroundRole:
+            if kind == "alert" or (kind == "status" and self.render_cache.get(it, self.now).overdue):
+                return QtGui.QColor(OVERDUE_COLOR)
+            if kind == "status" and it.done:
+                return QtGui.QColor(DONE_COLOR)
+            return None
+        if role == QtCore.Qt.ToolTipRole and kind == "content":
+            return it.note or None
+        return None
+
+
+# Cột của bảng Tab 2 (Trong ngày)
+DAY_COLUMNS = (
+    ("GIỜ", lambda d: d.time, None),
+    ("NỘI DUNG", lambda d: d.text, "content"),
+    ("ƯU TIÊN", lambda d: d.priority, None),
+    ("TRẠNG THÁI", None, "status"),
+)
+
+# Cột của bảng Tab 3 (Trong tuần)
+WEEK_COLUMNS = (
+    ("THỨ", lambda d: d.weekday, None),
+    ("NGÀY", lambda d: d.date, None),
+    ("GIỜ", lambda d: d.time, None),
+    ("NỘI DUNG", lambda d: d.text, "content"),
+    ("ƯU TIÊN", lambda d: d.priority, None),
+    ("TRẠNG THÁI", None, "status"),
+)
+
+# Cột của bảng Tab 4 (Quá hạn): hạn chót và trạng thái luôn màu đỏ
+OVERDUE_COLUMNS = (
+    ("HẠN CHÓT", lambda d: d.due_full, "alert"),
+    ("NỘI DUNG", lambda d: d.text, "content"),
+    ("ƯU TIÊN", lambda d: d.priority, None),
+    ("TRẠNG THÁI", None, "status"),
+)
+
+
 # ============================================================================
 # LỚP MAIN - CỬA SỔ CHÍNH CỦA ỨNG DỤNG
 # ============================================================================
@@ -653,40 +1208,67 @@ class Main(QtWidgets.QMainWindow):
         # Áp dụng theme CSS
         self._apply_theme()
 
-        # Khởi tạo Store để quản lý dữ liệu
-        self.store = Store(DATA_FILE)
-        self.store.load()
+        # Khởi tạo Store để quản lý dữ liệu. Dữ liệu được tải ở luồng nền
+        # (xem _on_store_loaded); tới lúc đó giao diện không đụng tới Store
+        try:
+            self.store = open_store()
+        except StoreError as e:  # Chuyển todos.json sang SQLite bị lỗi
+            QtWidgets.QMessageBox.critical(self, "Lỗi đọc dữ liệu", str(e))
+            raise
+        self._loading = True
         self._undo = None  # Lưu trạng thái để hoàn tác
 
+        # Lưu dữ liệu ở luồng nền, gộp nhiều thay đổi thành một lần ghi
+        self.saver = BackgroundSaver(self.store, parent=self)
+        self.saver.failed.connect(
+            lambda msg: QtWidgets.QMessageBox.critical(self, "Lỗi lưu", msg)
+        )
+
         # Danh sách thông báo trong app (hiển thị ở chuông)
         self.app_notifications = []
 
+        # Chuỗi hiển thị tính sẵn của từng công việc, dùng chung cho mọi tab
+        self.render_cache = RenderCache()
+
         # Tạo TabWidget chứa 4 tab
         tabs = QtWidgets.QTabWidget()
         self.setCentralWidget(tabs)
+        self.tabs = tabs
 
         # Tab 1: Danh sách tất cả công việc
         self.tab_list = QtWidgets.QWidget()
         tabs.addTab(self.tab_list, "Danh sách")
         self._build_tab_list()
 
-        # Tab 2: Công việc trong ngày
+        # Tab 2, 3, 4: chỉ dựng giao diện khi người dùng mở tab lần đầu
+        # (model của các bảng thì có sẵn để nhận cập nhật từ Store)
+        self.day_model = TaskTableModel(DAY_COLUMNS, self.render_cache, self)
+        self.week_model = TaskTableModel(WEEK_COLUMNS, self.render_cache, self)
+        self.overdue_model = TaskTableModel(OVERDUE_COLUMNS, self.render_cache, self)
+
         self.tab_day = QtWidgets.QWidget()
         tabs.addTab(self.tab_day, "Trong ngày")
-        self._build_tab_day()
-
-        # Tab 3: Công việc trong tuần
         self.tab_week = QtWidgets.QWidget()
         tabs.addTab(self.tab_week, "Trong tuần")
-        self._build_tab_week()
-
-        # Tab 4: Công việc quá hạn
         self.tab_overdue = QtWidgets.QWidget()
         tabs.addTab(self.tab_overdue, "Quá hạn")
-        self._build_tab_overdue()
+        self._tab_builders = {
+            self.tab_day: self._build_tab_day,
+            self.tab_week: self._build_tab_week,
+            self.tab_overdue: self._build_tab_overdue,
+        }
 
-        # Làm mới tất cả các tab
-        self.refresh_all()
+        # Mỗi tab chỉ được làm mới khi đang hiển thị: khi dữ liệu đổi, các
+        # tab đang ẩn chỉ bị đánh dấu "cần làm mới" và được làm mới lúc
+        # người dùng chuyển sang
+        self._tab_refreshers = {
+            self.tab_list: self.refresh_list,
+            self.tab_day: self.refresh_day,
+            self.tab_week: self.refresh_week,
+            self.tab_overdue: self.refresh_overdue,
+        }
+        self._dirty_tabs = set(self._tab_refreshers)
+        tabs.currentChanged.connect(self._refresh_current_tab)
 
         # ===== THIẾT LẬP HỆ THỐNG THÔNG BÁO =====
 
@@ -700,15 +1282,56 @@ class Main(QtWidgets.QMainWindow):
             self.tray_icon.setToolTip("Todo List")
             self.tray_icon.show()
 
-        # Thiết lập Timer để kiểm tra công việc đến hạn mỗi phút
+        # Timer một lần, hẹn đúng lúc công việc gần nhất đến hạn (không
+        # cần quét định kỳ). Dùng PreciseTimer để không bị báo sớm/muộn.
         self.check_timer = QtCore.QTimer(self)
+        self.check_timer.setSingleShot(True)
+        self.check_timer.setTimerType(QtCore.Qt.PreciseTimer)
         self.check_timer.timeout.connect(self.check_due_tasks)
-        self.check_timer.start(60000)  # 60,000 ms = 1 phút
 
-        # Kiểm tra ngay lần đầu khi khởi động
-        self.check_due_tasks()
         # ==========================================
 
+        # Hiện ngay trang đầu của danh sách, phần còn lại tải ở luồng nền
+        self.list_model.show_preview(self.store.peek(FIRST_PAGE_SIZE))
+        self._set_loading(True)
+        self.loader = StoreLoader(self.store, parent=self)
+        self.loader.loaded.connect(self._on_store_loaded)
+        self.loader.start()
+
+    def _on_store_loaded(self, error):
+        """
+        Chạy trên luồng giao diện khi StoreLoader tải xong dữ liệu.
+
+        Args:
+            error (str): Thông báo lỗi nếu không đọc được dữ liệu (hoặc None)
+        """
+        if error:
+            QtWidgets.QMessageBox.warning(self, "Lỗi đọc dữ liệu", error)
+
+        # Dữ liệu tính sẵn trong lúc xem trước không còn đúng với Store vừa tải
+        self.render_cache.clear()
+        self.store.view_cache_clear()
+
+        # Nhận thông báo thay đổi từ Store để chỉ cập nhật phần bị ảnh hưởng
+        self.store.subscribe(self._on_store_change)
+        self._set_loading(False)
+
+        # Làm mới tất cả các tab
+        self.refresh_all()
+
+        # Kiểm tra ngay lần đầu khi khởi động (và hẹn lần kế tiếp)
+        self.check_due_tasks()
+
+    def _set_loading(self, loading):
+        """Khoá/mở các nút và ô nhập làm thay đổi dữ liệu trong lúc đang tải."""
+        self._loading = loading
+        for w in self._edit_widgets:
+            w.setEnabled(not loading)
+        if loading:
+            self.stats_label.setText("Đang tải dữ liệu…")
+            self.header_progress.setFormat("Đang tải…")
+        self._update_list_placeholder()
+
     # ========================================================================
     # CÁC HÀM HỖ TRỢ GIAO DIỆN (STYLING HELPERS)
     # ========================================================================
@@ -765,18 +1388,36 @@ class Main(QtWidgets.QMainWindow):
         lbl.setMargin(0)
         return lbl
 
-    def _refresh_widget_style(self, widget):
+    def _refresh_widget_style(self, widget, **props):
         """
         Làm mới style của widget và các widget con.
 
         Hàm này cần thiết khi thay đổi property động (ví dụ: done=True/False)
         để Qt áp dụng lại stylesheet.
 
+        Nếu truyền props (tên property → giá trị), hàm chỉ gán những property
+        có giá trị khác hiện tại và chỉ làm mới đúng widget đó (không đụng tới
+        widget con); không có gì thay đổi thì không làm gì cả.
+
         Args:
             widget: Widget cần làm mới style
+            **props: Các property động cần gán
+
+        Returns:
+            bool: True nếu style đã được làm mới
         """
         if not widget:
-            return
+            return False
+        if props:
+            changed = [k for k, v in props.items() if widget.property(k) != v]
+            if not changed:
+                return False
+            for k in changed:
+                widget.setProperty(k, props[k])
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+            return True
+
         style = widget.style()
         if style:
             style.unpolish(widget)  # Gỡ style cũ
@@ -788,102 +1429,16 @@ class Main(QtWidgets.QMainWindow):
             if c_style:
                 c_style.unpolish(child)
                 c_style.polish(child)
-
-    def _make_task_widget(self, it, *, dt=None, overdue=False):
-        card = QtWidgets.QFrame()
-        card.setObjectName("taskCard")
-        card.setProperty("done", it.get("done", False))
-        card.setProperty("selected", False)
-
-        layout = QtWidgets.QHBoxLayout(card)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(14)
-
-        badge = QtWidgets.QLabel("✔" if it.get("done") else "⏳")
-        badge.setObjectName("badge")
-        badge.setProperty("done", it.get("done"))
-        badge.setProperty("overdue", overdue)
-        layout.addWidget(badge, 0, QtCore.Qt.AlignTop)
-
-        body = QtWidgets.QVBoxLayout()
-        body.setSpacing(8)
-        body.setContentsMargins(0, 0, 0, 0)
-
-        title = QtWidgets.QLabel(it.get("text", ""))
-        title.setObjectName("taskTitle")
-        title.setProperty("done", it.get("done"))
-        title.setWordWrap(True)
-        body.addWidget(title)
-
-        chips = QtWidgets.QHBoxLayout()
-        chips.setSpacing(8)
-
-        priority = int(it.get("priority", 1))
-        pr_variant = {2: "priority-high", 1: "priority-normal", 0: "priority-low"}.get(priority, "priority-normal")
-        pr_text = {2: "Ưu tiên cao", 1: "Ưu tiên thường", 0: "Ưu tiên thấp"}.get(priority, "Ưu tiên")
-        chips.addWidget(self._make_chip(pr_text, pr_variant, compact=True))
-
-        status_variant = "status-done" if it.get("done") else "status-todo"
-        status_text = "Đã hoàn thành" if it.get("done") else "Đang thực hiện"
-        chips.addWidget(self._make_chip(status_text, status_variant, compact=True))
-
-        if dt:
-            # === SỬA DÒNG NÀY ===
-            due_variant = "overdue" if overdue else "due"
-            # ===================
-            due_label = dt.strftime("Hạn: %d/%m %H:%M")
-            chips.addWidget(self._make_chip(due_label, due_variant, compact=True))
-        elif it.get("due_dt"):
-            chips.addWidget(self._make_chip(f"Hạn: {it['due_dt']}", "due", compact=True))
-
-        created = it.get("created_at")
-        if created:
-            created_date = created.split('T')[0] if 'T' in created else created
-            chips.addWidget(self._make_chip(f"Tạo: {created_date}", "priority-normal", compact=True))
-
-        chips.addStretch()
-        body.addLayout(chips)
-
-        note = it.get("note")
-        if note:
-            note_lbl = QtWidgets.QLabel(note)
-            note_lbl.setObjectName("cardSubtitle")
-            note_lbl.setWordWrap(True)
-            note_lbl.setProperty("done", it.get("done"))
-            body.addWidget(note_lbl)
-
-        layout.addLayout(body, 1)
-
-        self._refresh_widget_style(card)
-        return card
-
-    def _sync_task_selection(self):
-        for i in range(self.list.count()):
-            item = self.list.item(i)
-            widget = self.list.itemWidget(item)
-            if widget:
-                widget.setProperty("selected", item.isSelected())
-                self._refresh_widget_style(widget)
+        return True
 
     def _update_statistics(self):
-        total = len(self.store.items)
-        done = sum(1 for x in self.store.items if x.get("done"))
-        todo = total - done
+        # Store đếm sẵn theo từng thay đổi; chỉ cần chuyển các việc vừa
+        # qua hạn sang nhóm quá hạn rồi đọc các con số
+        stats = self.store.stats
+        stats.advance(datetime.now())
+        total, done, todo = stats.total, stats.done, stats.todo
         pct = int(done * 100 / total) if total else 0
-
-        # === LOGIC MỚI ĐỂ ĐẾM QUÁ HẠN ===
-        now = datetime.now()
-        overdue_count = 0
-        for it in self.store.items:
-            # Chỉ đếm việc "chưa xong"
-            if it.get("done"):
-                continue
-            
-            dt = parse_dt(it.get("due_dt"))
-            # Nếu có hạn chót VÀ hạn chót đã trôi qua
-            if bool(dt and dt < now):
-                overdue_count += 1
-        # ==================================
+        overdue_count = stats.overdue
 
         if hasattr(self, "stats_label"):
             self.stats_label.setText(f"{done}/{total} việc đã hoàn thành ({pct}%)" if total else "Chưa có việc nào")
@@ -902,9 +1457,13 @@ class Main(QtWidgets.QMainWindow):
         # === CẬP NHẬT CHO CHIP MỚI ===
         if hasattr(self, "stat_overdue_chip"):
             self.stat_overdue_chip.setText(f"Quá hạn: {overdue_count}")
+            self.stat_overdue_chip.setToolTip(", ".join(
+                f"{PRIORITY_VN.get(p, p)}: {n}"
+                for p, n in sorted(stats.overdue_by_priority.items(), reverse=True) if n
+            ))
             # Tự động ẩn nhãn đi nếu không có việc nào quá hạn
             self.stat_overdue_chip.setVisible(overdue_count > 0)
-            self._refresh_widget_style(self.stat_overdue_chip)
+            self._refresh_widget_style(self.stat_overdue_chip, variant="priority-high")
         # ============================
 
         if hasattr(self, "stats_label"):
@@ -1025,7 +1584,13 @@ class Main(QtWidgets.QMainWindow):
         self.q = QtWidgets.QLineEdit()
         self.q.setPlaceholderText("Nhập từ khoá...")
         self.q.setClearButtonEnabled(True)
-        self.q.textChanged.connect(self.refresh_all)
+        # Chỉ tìm kiếm khi người dùng ngừng gõ một lúc, và chỉ làm mới
+        # tab Danh sách (các tab khác không phụ thuộc từ khoá)
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.refresh_list)
+        self.q.textChanged.connect(self.search_timer.start)
         filter_layout.addWidget(self.q, 1, 0)
 
         lbl_sort = QtWidgets.QLabel("Sắp xếp")
@@ -1036,7 +1601,7 @@ class Main(QtWidgets.QMainWindow):
         self.sort.addItem("Hạn chót", "due_dt")
         self.sort.addItem("Ưu tiên", "priority")
         self.sort.addItem("Ngày tạo", "created_at")
-        self.sort.currentIndexChanged.connect(self.refresh_all)
+        self.sort.currentIndexChanged.connect(self.refresh_list)
         filter_layout.addWidget(self.sort, 1, 1)
 
         lbl_range = QtWidgets.QLabel("Phạm vi")
@@ -1046,7 +1611,7 @@ class Main(QtWidgets.QMainWindow):
         self.range.addItem("Tất cả", "all")
         self.range.addItem("Hôm nay", "today")
         self.range.addItem("Trong tuần", "week")
-        self.range.currentIndexChanged.connect(self.refresh_all)
+        self.range.currentIndexChanged.connect(self.refresh_list)
         filter_layout.addWidget(self.range, 1, 2)
 
         status_lbl = QtWidgets.QLabel("Trạng thái")
@@ -1060,7 +1625,7 @@ class Main(QtWidgets.QMainWindow):
         rbDone = QtWidgets.QRadioButton("Đã xong")
         rbAll.setChecked(True)
         for i, rb in enumerate([rbAll, rbTodo, rbDone]):
-            rb.toggled.connect(self.refresh_all)
+            rb.toggled.connect(self.refresh_list)
             self.filter.addButton(rb, i)
             radio_row.addWidget(rb)
         radio_row.addStretch()
@@ -1099,20 +1664,35 @@ class Main(QtWidgets.QMainWindow):
         chips_row.addWidget(self.stat_overdue_chip) # Thêm chip mới vào layout
         
         chips_row.addStretch()
+
+        # Số việc đang hiển thị (có dấu "…" khi danh sách còn đang được đổ dần)
+        self.list_count_label = QtWidgets.QLabel("")
+        self.list_count_label.setObjectName("cardSubtitle")
+        chips_row.addWidget(self.list_count_label)
         list_layout.addLayout(chips_row)
         # =================================
 
-        self.list = QtWidgets.QListWidget()
+        # Danh sách dạng model/view: chỉ những thẻ đang hiển thị mới được vẽ
+        self.list_model = TaskListModel(self.store, self.render_cache, self)
+        self.list = QtWidgets.QListView()
         self.list.setObjectName("taskList")
-        # ... (code list widget giữ nguyên) ...
+        self.list.setModel(self.list_model)
+        self.list.setItemDelegate(TaskCardDelegate(self.list))
         self.list.setAlternatingRowColors(False)
         self.list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
-        self.list.setSpacing(10)
-        self.list.setWordWrap(True)
+        self.list.setSpacing(2)
         self.list.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
-        self.list.setUniformItemSizes(False)
-        self.list.itemSelectionChanged.connect(self._sync_task_selection)
-        self.list.itemDoubleClicked.connect(lambda *_: self.edit_item())
+        self.list.setUniformItemSizes(True)
+        # Bố cục các dòng cũng được tính dần từng đợt thay vì một lần cho cả danh sách
+        self.list.setLayoutMode(QtWidgets.QListView.Batched)
+        self.list.setBatchSize(2000)
+        self.list.doubleClicked.connect(lambda *_: self.edit_item())
+
+        # Danh sách dài được lọc và đổ vào model dần từng lát
+        self._list_fill = ProgressiveFill(parent=self)
+        self._list_fill.chunk.connect(self._on_list_chunk)
+        self._list_fill.finished.connect(self._on_list_filled)
+        self._fill_view = None   # (khóa, phiên bản, danh sách mã) của lần lọc đang chạy
 
 
         self.list_stack = QtWidgets.QStackedLayout()
@@ -1154,6 +1734,16 @@ class Main(QtWidgets.QMainWindow):
         btnUndo.setProperty("secondary", True)
         btnUndo.clicked.connect(self.undo)
 
+        btnImport = QtWidgets.QPushButton("Nhập…")
+        btnImport.setIcon(style.standardIcon(QtWidgets.QStyle.SP_DialogOpenButton))
+        btnImport.setProperty("secondary", True)
+        btnImport.clicked.connect(self.import_file)
+
+        btnExport = QtWidgets.QPushButton("Xuất…")
+        btnExport.setIcon(style.standardIcon(QtWidgets.QStyle.SP_DialogSaveButton))
+        btnExport.setProperty("secondary", True)
+        btnExport.clicked.connect(self.export_file)
+
         btnUp = QtWidgets.QPushButton("Lên")
         btnUp.setIcon(style.standardIcon(QtWidgets.QStyle.SP_ArrowUp))
         btnUp.setProperty("secondary", True)
@@ -1170,6 +1760,8 @@ class Main(QtWidgets.QMainWindow):
         actions_bar.addWidget(btnEdit)
         actions_bar.addWidget(btnDel)
         actions_bar.addWidget(btnUndo)
+        actions_bar.addWidget(btnImport)
+        actions_bar.addWidget(btnExport)
         actions_bar.addStretch()
         actions_bar.addWidget(btnUp)
         actions_bar.addWidget(btnDown)
@@ -1177,6 +1769,10 @@ class Main(QtWidgets.QMainWindow):
 
         L.addWidget(list_card, 1)
 
+        # Các phần bị khoá trong lúc dữ liệu còn đang tải (xem _set_loading)
+        self._edit_widgets = [input_card, filter_card, btnDone, btnEdit, btnDel, btnUndo, btnImport,
+                              btnExport, btnUp, btnDown]
+
         # Shortcuts
         QtWidgets.QShortcut(QtGui.QKeySequence("Delete"), self, self.delete_item)
         QtWidgets.QShortcut(QtGui.QKeySequence("Space"), self, self.toggle_done)
@@ -1215,12 +1811,13 @@ class Main(QtWidgets.QMainWindow):
         head.addWidget(self.day_count_label)
         card_layout.addLayout(head)
 
-        self.day_tbl = QtWidgets.QTableWidget(0, 4)
-        self.day_tbl.setHorizontalHeaderLabels(["GIỜ","NỘI DUNG","ƯU TIÊN","TRẠNG THÁI"])
+        self.day_tbl = QtWidgets.QTableView()
+        self.day_tbl.setModel(self.day_model)
         self.day_tbl.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
         self.day_tbl.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.day_tbl.setAlternatingRowColors(True)
         self.day_tbl.verticalHeader().setVisible(False)
+        self.day_tbl.verticalHeader().setDefaultSectionSize(TABLE_ROW_HEIGHT)
         header = self.day_tbl.horizontalHeader()
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeToContents)
         header.setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
@@ -1264,12 +1861,13 @@ class Main(QtWidgets.QMainWindow):
         head.addWidget(self.week_count_label)
         card_layout.addLayout(head)
 
-        self.week_tbl = QtWidgets.QTableWidget(0, 6)
-        self.week_tbl.setHorizontalHeaderLabels(["THỨ","NGÀY","GIỜ","NỘI DUNG","ƯU TIÊN","TRẠNG THÁI"])
+        self.week_tbl = QtWidgets.QTableView()
+        self.week_tbl.setModel(self.week_model)
         self.week_tbl.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
         self.week_tbl.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.week_tbl.setAlternatingRowColors(True)
         self.week_tbl.verticalHeader().setVisible(False)
+        self.week_tbl.verticalHeader().setDefaultSectionSize(TABLE_ROW_HEIGHT)
         header = self.week_tbl.horizontalHeader()
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeToContents)
         header.setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeToContents)
@@ -1308,13 +1906,14 @@ class Main(QtWidgets.QMainWindow):
         card_layout.addLayout(head)
 
         # Bảng (Table) hiển thị công việc
-        self.overdue_tbl = QtWidgets.QTableWidget(0, 4) # 0 hàng, 4 cột
-        self.overdue_tbl.setHorizontalHeaderLabels(["HẠN CHÓT","NỘI DUNG","ƯU TIÊN","TRẠNG THÁI"])
+        self.overdue_tbl = QtWidgets.QTableView()
+        self.overdue_tbl.setModel(self.overdue_model)
         
         self.overdue_tbl.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
         self.overdue_tbl.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.overdue_tbl.setAlternatingRowColors(True)
         self.overdue_tbl.verticalHeader().setVisible(False)
+        self.overdue_tbl.verticalHeader().setDefaultSectionSize(TABLE_ROW_HEIGHT)
         
         header = self.overdue_tbl.horizontalHeader()
         # Chế độ co giãn cột
@@ -1351,7 +1950,7 @@ class Main(QtWidgets.QMainWindow):
         dialog = TaskDialog(
             self,
             title="Thêm công việc",
-            task={"text": text, "priority": base_priority}
+            task=Task(text, priority=base_priority)
         )
 
         # Nếu có nội dung sẵn, bôi đen để dễ sửa
@@ -1364,55 +1963,49 @@ class Main(QtWidgets.QMainWindow):
 
         # Lấy dữ liệu từ dialog và thêm vào store
         data = dialog.get_data()
-        self.store.items.append({
-            "text": data["text"],
-            "done": False,
-            "priority": data["priority"],
-            "due_dt": data.get("due_dt"),
-            "note": data.get("note"),
-            "created_at": now_iso(),
-            "done_at": None
-        })
-
-        # Xóa ô nhập và làm mới giao diện
+        self.store.add(Task(
+            data["text"],
+            priority=data["priority"],
+            due_dt=data.get("due_dt"),
+            note=data.get("note"),
+            created_at=now_iso(),
+        ))
+
+        # Xóa ô nhập (giao diện được cập nhật qua _on_store_change)
         self.inp.clear()
-        self.refresh_all()
-        self.store.save()
 
-    def _current_index(self):
+    def _current_id(self):
         """
-        Lấy chỉ số (index) thực của công việc đang chọn trong danh sách đã lọc.
+        Lấy mã (Task.id) của công việc đang chọn trong danh sách đã lọc.
 
         Returns:
-            int hoặc None: Index trong self.store.items, hoặc None nếu không chọn gì
+            str hoặc None: Mã công việc, hoặc None nếu không chọn gì
 
-        Lưu ý: Vì danh sách có thể bị lọc, nên index hiển thị khác với index thật.
+        Lưu ý: Mỗi dòng của model mang sẵn mã công việc, nên không phụ thuộc
+        vào bộ lọc/sắp xếp hay vị trí của công việc trong store.items.
         """
-        row = self.list.currentRow()
-        if row < 0:
+        row = self.list.currentIndex().row()
+        if row < 0 or self._loading:
             return None
-
-        # Lấy mapping từ danh sách đã lọc sang index thật
-        mapping = self._filtered_indices()
-        if 0 <= row < len(mapping):
-            return mapping[row]
-        return None
+        tid = self.list_model.task_id(row)
+        # Dòng có thể chưa kịp bỏ khi công việc vừa bị xoá
+        return tid if tid in self.store.by_id else None
 
     def edit_item(self):
         """
         Chỉnh sửa công việc đang được chọn.
 
         Quy trình:
-        1. Lấy index của công việc đang chọn
+        1. Lấy mã của công việc đang chọn
         2. Hiển thị dialog với dữ liệu hiện tại
         3. Cập nhật dữ liệu và lưu file
         4. Làm mới giao diện
         """
-        idx = self._current_index()
-        if idx is None:
+        tid = self._current_id()
+        if tid is None:
             return
 
-        it = self.store.items[idx]
+        it = self.store.get(tid)
 
         # Mở dialog sửa công việc
         dialog = TaskDialog(self, title="Cập nhật công việc", task=it)
@@ -1422,14 +2015,14 @@ class Main(QtWidgets.QMainWindow):
 
         # Cập nhật dữ liệu
         data = dialog.get_data()
-        it["text"] = data["text"]
-        it["priority"] = data["priority"]
-        it["due_dt"] = data.get("due_dt")
-        it["note"] = data.get("note")
-        it["notified"] = False  # Reset để có thể thông báo lại
-
-        self.refresh_all()
-        self.store.save()
+        self.store.update(
+            tid,
+            text=data["text"],
+            priority=data["priority"],
+            due_dt=data.get("due_dt"),
+            note=data.get("note"),
+            notified=False,  # Reset để có thể thông báo lại
+        )
 
     def delete_item(self):
         """
@@ -1441,8 +2034,8 @@ class Main(QtWidgets.QMainWindow):
         3. Xóa khỏi store và lưu file
         4. Làm mới giao diện
         """
-        idx = self._current_index()
-        if idx is None:
+        tid = self._current_id()
+        if tid is None:
             return
 
         # Xác nhận xóa
@@ -1451,14 +2044,11 @@ class Main(QtWidgets.QMainWindow):
         ) != QtWidgets.QMessageBox.Yes:
             return
 
-        # Lưu để có thể hoàn tác
-        self._undo = ("del", idx, dict(self.store.items[idx]))
-
-        # Xóa khỏi danh sách
-        del self.store.items[idx]
-
-        self.refresh_all()
-        self.store.save()
+        # Ghi nhớ vị trí và việc đứng ngay trước (để hoàn tác đúng chỗ kể
+        # cả khi danh sách đã thay đổi), rồi xóa khỏi danh sách
+        idx = self.store.index_of(tid)
+        prev_id = self.store.items[idx - 1].id if idx > 0 else None
+        self._undo = ("del", idx, (prev_id, self.store.remove(tid)))
 
     def undo(self):
         """
@@ -1472,13 +2062,73 @@ class Main(QtWidgets.QMainWindow):
         kind, idx, payload = self._undo
 
         if kind == "del":
-            # Chèn lại vào vị trí cũ (hoặc cuối nếu vượt quá)
-            idx = min(idx, len(self.store.items))
-            self.store.items.insert(idx, payload)
+            # Chèn lại ngay sau việc đứng trước nó; nếu việc đó cũng đã bị
+            # xoá thì chèn vào vị trí cũ (hoặc cuối nếu vượt quá)
+            prev_id, task = payload
+            if prev_id is None:
+                idx = 0
+            elif prev_id in self.store.by_id:
+                idx = self.store.index_of(prev_id) + 1
+            self.store.insert(idx, task)
 
         self._undo = None
-        self.refresh_all()
-        self.store.save()
+
+    def import_file(self):
+        """
+        Nhập hàng loạt công việc từ file CSV, JSONL hoặc JSON (xem todo_io).
+
+        Mọi việc hợp lệ được thêm bằng một lần Store.extend(), nên giao
+        diện chỉ làm mới một lần và BackgroundSaver chỉ ghi một lần. Các
+        bản ghi lỗi được liệt kê (tối đa IMPORT_REJECTS_SHOWN dòng).
+        """
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Nhập công việc", "",
+            "Dữ liệu công việc (*.csv *.jsonl *.ndjson *.json);;Tất cả (*)")
+        if not path:
+            return
+
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            result = todo_io.import_tasks(self.store, path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.warning(self, "Lỗi nhập dữ liệu", f"Không thể nhập {path}:\n{e}")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+        msg = f"Đã nhập {result.added} công việc."
+        if result.rejected:
+            shown = "\n".join(str(r) for r in result.rejects[:IMPORT_REJECTS_SHOWN])
+            more = result.rejected - min(result.rejected, IMPORT_REJECTS_SHOWN)
+            msg += f"\nBỏ qua {result.rejected} bản ghi lỗi (vị trí: lý do):\n{shown}"
+            if more:
+                msg += f"\n… và {more} bản ghi khác"
+        QtWidgets.QMessageBox.information(self, "Nhập công việc", msg)
+
+    def export_file(self):
+        """
+        Xuất các công việc đang hiển thị ở Tab 1 (theo bộ lọc, tìm kiếm và
+        sắp xếp hiện tại) ra CSV, JSONL hoặc iCalendar (xem todo_io).
+
+        Định dạng theo đuôi file; nếu không có đuôi thì theo loại file
+        được chọn trong hộp thoại.
+        """
+        path, selected = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Xuất công việc", "", ";;".join(EXPORT_FILTERS))
+        if not path:
+            return
+        ext = os.path.splitext(path)[1].lower()
+        fmt = todo_io.EXPORT_FORMAT_BY_EXT.get(ext) or EXPORT_FILTERS.get(selected, "jsonl")
+
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            count = todo_io.export_tasks(todo_io.select_tasks(self.store, *self._list_view()[2]), path, fmt)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Lỗi xuất dữ liệu", f"Không thể ghi {path}:\n{e}")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        QtWidgets.QMessageBox.information(self, "Xuất công việc", f"Đã xuất {count} công việc ra {path}.")
 
     def toggle_done(self):
         """
@@ -1493,111 +2143,97 @@ class Main(QtWidgets.QMainWindow):
         - done_at = None
         - notified = False (để có thể thông báo lại)
         """
-        idx = self._current_index()
-        if idx is None:
+        tid = self._current_id()
+        if tid is None:
             return
 
-        it = self.store.items[idx]
-        it["done"] = not it["done"]
-        it["done_at"] = now_iso() if it["done"] else None
+        done = not self.store.get(tid).done
+        fields = {"done": done, "done_at": now_iso() if done else None}
 
         # Reset trạng thái thông báo nếu đánh dấu chưa xong
-        if not it["done"]:
-            it["notified"] = False
+        if not done:
+            fields["notified"] = False
 
-        self.refresh_all()
-        self.store.save()
+        self.store.update(tid, **fields)
 
     # ---------------- Filter + Sort ----------------
-    def _is_today(self, it):
-        dt = parse_dt(it.get("due_dt"))
-        return bool(dt and dt.date() == date.today())
-
-    def _is_in_week(self, it, anchor=None):
-        dt = parse_dt(it.get("due_dt"))
-        if not dt:
-            return False
-        a = anchor or date.today()
-        return start_of_week(a) <= dt.date() <= end_of_week(a)
+    def _list_view(self):
+        """
+        Trạng thái hiển thị hiện tại của Tab 1.
 
-    def _filtered_indices(self):
-        q = self.q.text().lower()
+        Returns:
+            tuple: (khóa bộ nhớ đệm, các trường mà kết quả phụ thuộc vào,
+            tham số cho _iter_filtered_ids)
+        """
+        q = " ".join(self.q.text().split())
         mode = ["all", "todo", "done"][self.filter.checkedId()]
         rng = self.range.currentData() or "all"
-        idxs = []
-        for i, it in enumerate(self.store.items):
-            if mode == "todo" and it["done"]:
-                continue
-            if mode == "done" and not it["done"]:
-                continue
-            if rng == "today" and not self._is_today(it):
-                continue
-            if rng == "week" and not self._is_in_week(it):
-                continue
-            if q and q not in it["text"].lower():
-                continue
-            idxs.append(i)
         key = self.sort.currentData() or "default"
-        if key == "due_dt":
-            idxs.sort(key=lambda i: (self.store.items[i]["due_dt"] is None,
-                                     self.store.items[i]["due_dt"] or "9999-12-31 23:59"))
-        elif key == "priority":
-            idxs.sort(key=lambda i: -int(self.store.items[i].get("priority", 1)))
-        elif key == "created_at":
-            idxs.sort(key=lambda i: self.store.items[i].get("created_at", ""), reverse=True)
-        return idxs
+
+        fields = self.store.filter_fields(q, mode, rng, key)
+        return ("list", q, mode, rng, key, date.today()), fields, (q, mode, rng, key)
+
+    def _iter_filtered_ids(self, q, mode, rng, key):
+        """Sinh dần mã các công việc cần hiển thị, mỗi lô FILL_CHUNK ứng viên (xem Store.iter_filtered_ids)."""
+        return self.store.iter_filtered_ids(q, mode, rng, key, chunk=FILL_CHUNK)
 
     def refresh_list(self):
-        self.list.blockSignals(True)
-        try:
-            self.list.clear()
-            now = datetime.now()  # <-- Dòng này đúng
-            
-            filtered = self._filtered_indices()
-            for idx in filtered:
-                it = self.store.items[idx]
-                dt = parse_dt(it.get("due_dt")) if it.get("due_dt") else None
-                
-                # === SỬA DÒNG NÀY ===
-                overdue = bool(dt and dt < now and not it.get("done")) # So sánh với 'now'
-                # ===================
-
-                item = QtWidgets.QListWidgetItem()
-                item.setData(QtCore.Qt.UserRole, idx)
-                pr = int(it.get("priority", 1))
-                pr_txt = {0: "Thấp", 1: "Thường", 2: "Cao"}.get(pr, "Thường")
-                due_txt = dt.strftime("%d/%m %H:%M") if dt else "Không hạn"
-                tooltip_lines = [f"Ưu tiên: {pr_txt}", f"Hạn chót: {due_txt}"]
-                
-                # === SỬA DÒNG NÀY (bỏ 'not it.get("done")') ===
-                if overdue: # Biến overdue đã bao gồm logic "chưa xong"
-                # ============================================
-                    tooltip_lines.append("Trạng thái: Quá hạn")
-                
-                note = it.get("note")
-                if note:
-                    tooltip_lines.append(f"Ghi chú: {note}")
-                
-                item.setToolTip("\n".join(tooltip_lines))
-                widget = self._make_task_widget(it, dt=dt, overdue=overdue)
-                size = widget.sizeHint()
-                # Bạn đã tăng size lên 120, rất tốt!
-                item.setSizeHint(QtCore.QSize(0, max(size.height(), 120))) 
-                self.list.addItem(item)
-                self.list.setItemWidget(item, widget)
-        finally:
-            self.list.blockSignals(False)
-        self._sync_task_selection()
+        """
+        Làm mới danh sách ở Tab 1.
+
+        Nếu Store còn giữ kết quả lọc cho trạng thái hiện tại thì hiển thị
+        ngay; nếu không thì lọc và đổ dần vào danh sách qua ProgressiveFill
+        (lần lọc đang chạy bị huỷ nếu bộ lọc đã đổi).
+        """
+        view_key, fields, args = self._list_view()
+        rev = self.store.revision_of(fields)
+        fill = self._fill_view
+        if fill is None or fill[:2] != (view_key, rev):
+            ids = self.store.view_cache_get(view_key, rev)
+            if ids is not None:
+                self._list_fill.cancel()
+                self._fill_view = None
+                self.list_model.set_rows(ids)
+            else:
+                ids = []
+                self._fill_view = (view_key, rev, ids)
+                self.list_model.set_rows(ids)
+                self._list_fill.start(self._iter_filtered_ids(*args))
         self._update_statistics()
         self._update_list_placeholder()
 
+    def _cancel_list_fill(self):
+        """Dừng lần lọc đang chạy và đánh dấu Tab 1 cần làm mới."""
+        self._list_fill.cancel()
+        self._fill_view = None
+        self._dirty_tabs.add(self.tab_list)
+
+    def _on_list_chunk(self, batch):
+        self._fill_view[2].extend(batch)
+        self.list_model.append_rows(batch)
+        self._update_list_placeholder()
+
+    def _on_list_filled(self):
+        view_key, rev, ids = self._fill_view
+        self._fill_view = None
+        self.store.view_cache_put(view_key, rev, ids)
+        self._update_list_placeholder()
+
     def _update_list_placeholder(self):
         if not hasattr(self, "list_stack"):
             return
-        if self.list.count():
+        rows = self.list_model.rowCount()
+        filling = self._fill_view is not None
+        # Đang đổ dần: hiện số dòng đã có kèm dấu "…"
+        self.list_count_label.setText(f"{rows} việc…" if filling else f"{rows} việc")
+        if rows:
             self.list_stack.setCurrentIndex(0)
         else:
-            if self.store.items:
+            if self._loading:
+                self.list_placeholder.setText("Đang tải dữ liệu…")
+            elif filling:
+                self.list_placeholder.setText("Đang lọc danh sách…")
+            elif self.store.items:
                 self.list_placeholder.setText("Không tìm thấy công việc phù hợp với bộ lọc hiện tại.")
             else:
                 self.list_placeholder.setText("Chưa có công việc nào. Hãy thêm việc mới để bắt đầu!")
@@ -1618,26 +2254,30 @@ class Main(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.information(self, "Không thể di chuyển",
                 "Tắt lọc/tìm/sắp xếp/phạm vi để di chuyển thứ tự.")
             return
-        idx = self._current_index()
-        if idx is None or idx <= 0:
+        tid = self._current_id()
+        if tid is None:
             return
-        self.store.items[idx - 1], self.store.items[idx] = self.store.items[idx], self.store.items[idx - 1]
-        self.refresh_list()
-        self.list.setCurrentRow(idx - 1)
-        self.store.save()
+        idx = self.store.index_of(tid)
+        if idx <= 0:
+            return
+        self.store.swap(idx - 1, idx)
+        self._list_fill.finish()  # Cần đủ dòng để chọn lại đúng công việc
+        self.list.setCurrentIndex(self.list_model.index(idx - 1))
 
     def move_down(self):
         if not self._can_move_linear():
             QtWidgets.QMessageBox.information(self, "Không thể di chuyển",
                 "Tắt lọc/tìm/sắp xếp/phạm vi để di chuyển thứ tự.")
             return
-        idx = self._current_index()
-        if idx is None or idx >= len(self.store.items) - 1:
+        tid = self._current_id()
+        if tid is None:
+            return
+        idx = self.store.index_of(tid)
+        if idx >= len(self.store.items) - 1:
             return
-        self.store.items[idx + 1], self.store.items[idx] = self.store.items[idx], self.store.items[idx + 1]
-        self.refresh_list()
-        self.list.setCurrentRow(idx + 1)
-        self.store.save()
+        self.store.swap(idx, idx + 1)
+        self._list_fill.finish()  # Cần đủ dòng để chọn lại đúng công việc
+        self.list.setCurrentIndex(self.list_model.index(idx + 1))
 
     # ---------------- Day view ----------------
     def _set_day_today(self):
@@ -1645,176 +2285,116 @@ class Main(QtWidgets.QMainWindow):
 
     def refresh_day(self):
         d = self.day_sel.date().toPyDate()
-        now = datetime.now() # Lấy thời gian hiện tại
-        
-        rows = []
-        for it in self.store.items:
-            dt = parse_dt(it.get("due_dt"))
-            if dt and dt.date() == d:
-                # Kiểm tra xem có quá hạn không
-                is_overdue = (dt < now and not it.get("done"))
-                rows.append((dt, it, is_overdue)) # Truyền trạng thái quá hạn
-                
-        rows.sort(key=lambda x: x[0])
-        self.day_tbl.setRowCount(0)
-        
-        for dt, it, is_overdue in rows: # Lấy is_overdue
-            r = self.day_tbl.rowCount()
-            self.day_tbl.insertRow(r)
-            
-            # === LOGIC TRẠNG THÁI MỚI ===
-            status_text = "Đã xong"
-            if not it.get("done"):
-                status_text = "Quá hạn" if is_overdue else "Chưa xong"
-            # ============================
-
-            vals = [dt.strftime("%H:%M"), it["text"],
-                    {0: "Thấp", 1: "Thường", 2: "Cao"}.get(int(it.get("priority", 1)), "Thường"),
-                    status_text] # Dùng status_text mới
-            
-            for c, v in enumerate(vals):
-                item = QtWidgets.QTableWidgetItem(v)
-                if c == 1:
-                    item.setTextAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
-                    note = it.get("note")
-                    if note:
-                        item.setToolTip(note)
-                else:
-                    item.setTextAlignment(QtCore.Qt.AlignCenter)
-                
-                # === THÊM MÀU SẮC CHO TRẠNG THÁI ===
-                if is_overdue and c == 3: # Cột Trạng thái (index 3)
-                    item.setForeground(QtGui.QBrush(QtGui.QColor("#e03131"))) # Màu đỏ
-                elif it.get("done") and c == 3:
-                    item.setForeground(QtGui.QBrush(QtGui.QColor("#2b8a3e"))) # Màu xanh lá
-                # =================================
-                
-                self.day_tbl.setItem(r, c, item)
-                
-        self.day_tbl.resizeRowsToContents()
-        self.day_count_label.setText(f"{len(rows)} việc" if rows else "Không có việc")
+
+        # Chỉ mục hạn chót trả về sẵn các việc trong ngày, đã sắp theo giờ
+        tasks = self.store.due_on(d)
+        self.day_model.set_tasks(tasks)
+        self.day_count_label.setText(f"{len(tasks)} việc" if tasks else "Không có việc")
     # ---------------- Week view ----------------
     def _set_week_this(self):
         self.week_anchor.setDate(QtCore.QDate.currentDate())
 
     def refresh_week(self):
         anchor = self.week_anchor.date().toPyDate()
-        monday, sunday = start_of_week(anchor), end_of_week(anchor)
-        now = datetime.now() # Lấy thời gian hiện tại
-        
-        rows = []
-        for it in self.store.items:
-            dt = parse_dt(it.get("due_dt"))
-            if dt and monday <= dt.date() <= sunday:
-                # Kiểm tra xem có quá hạn không
-                is_overdue = (dt < now and not it.get("done"))
-                rows.append((dt, it, is_overdue)) # Truyền trạng thái quá hạn
-                
-        rows.sort(key=lambda x: (x[0].date(), x[0].time()))
-        self.week_tbl.setRowCount(0)
-        
-        for dt, it, is_overdue in rows: # Lấy is_overdue
-            r = self.week_tbl.rowCount()
-            self.week_tbl.insertRow(r)
-            
-            # === LOGIC TRẠNG THÁI MỚI ===
-            status_text = "Đã xong"
-            if not it.get("done"):
-                status_text = "Quá hạn" if is_overdue else "Chưa xong"
-            # ============================
-
-            vals = [WEEKDAY_VN[dt.weekday()], dt.strftime(D_FMT), dt.strftime("%H:%M"),
-                    it["text"], {0: "Thấp", 1: "Thường", 2: "Cao"}.get(int(it.get("priority", 1)), "Thường"),
-                    status_text] # Dùng status_text mới
-            
-            for c, v in enumerate(vals):
-                item = QtWidgets.QTableWidgetItem(v)
-                if c in (3,):
-                    item.setTextAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
-                    note = it.get("note")
-                    if note:
-                        item.setToolTip(note)
-                else:
-                    item.setTextAlignment(QtCore.Qt.AlignCenter)
-                
-                # === THÊM MÀU SẮC CHO TRẠNG THÁI ===
-                if is_overdue and c == 5: # Cột Trạng thái (index 5)
-                    item.setForeground(QtGui.QBrush(QtGui.QColor("#e03131"))) # Màu đỏ
-                elif it.get("done") and c == 5:
-                    item.setForeground(QtGui.QBrush(QtGui.QColor("#2b8a3e"))) # Màu xanh lá
-                # =================================
-                
-                self.week_tbl.setItem(r, c, item)
-                
-        self.week_tbl.resizeRowsToContents()
-        self.week_count_label.setText(f"{len(rows)} việc" if rows else "Không có việc")
+        monday = start_of_week(anchor)
+
+        # Các việc có hạn từ 00:00 thứ Hai tới hết Chủ Nhật, đã sắp theo hạn chót
+        start = datetime(monday.year, monday.month, monday.day)
+        tasks = self.store.due_between(start, start + timedelta(days=7))
+        self.week_model.set_tasks(tasks)
+        self.week_count_label.setText(f"{len(tasks)} việc" if tasks else "Không có việc")
     # ---------------- Overdue view ----------------
     def refresh_overdue(self):
-        """Làm mới QTableWidget ở Tab 4 (Quá hạn)."""
+        """Làm mới bảng ở Tab 4 (Quá hạn)."""
         now = datetime.now() # Lấy thời gian hiện tại
-        
-        rows = [] # Danh sách các hàng (row)
-        
-        # Lọc các công việc
-        for it in self.store.items:
-            # Bỏ qua nếu việc đã xong
-            if it.get("done"):
-                continue
-                
-            dt = parse_dt(it.get("due_dt"))
-            
-            # Đây chính là logic tìm việc quá hạn:
-            # (Có hạn chót) VÀ (hạn chót < bây giờ)
-            if dt and dt < now:
-                # Lưu lại (datetime, item, is_overdue=True)
-                rows.append((dt, it, True))
-                
-        # Sắp xếp theo hạn chót (cũ nhất, quá hạn lâu nhất lên đầu)
-        rows.sort(key=lambda x: x[0])
-        self.overdue_tbl.setRowCount(0) # Xoá bảng cũ
-        
-        # Thêm lại dữ liệu vào bảng
-        for dt, it, is_overdue in rows:
-            r = self.overdue_tbl.rowCount()
-            self.overdue_tbl.insertRow(r)
-            
-            # Giá trị cho 4 cột: ["HẠN CHÓT","NỘI DUNG","ƯU TIÊN","TRẠNG THÁI"]
-            vals = [
-                dt.strftime("%d/%m/%Y %H:%M"), # Hiển thị đầy đủ ngày giờ
-                it["text"],
-                {0: "Thấp", 1: "Thường", 2: "Cao"}.get(int(it.get("priority", 1)), "Thường"),
-                "Quá hạn" # Trạng thái luôn là "Quá hạn"
-            ]
-            
-            for c, v in enumerate(vals):
-                item = QtWidgets.QTableWidgetItem(v)
-                
-                # Căn lề
-                if c == 1: # Cột Nội dung
-                    item.setTextAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
-                    note = it.get("note")
-                    if note:
-                        item.setToolTip(note) # Thêm tooltip ghi chú
-                else:
-                    item.setTextAlignment(QtCore.Qt.AlignCenter)
-                
-                # Thêm màu đỏ cho cột HẠN CHÓT (c=0) và TRẠNG THÁI (c=3)
-                if c == 0 or c == 3:
-                    item.setForeground(QtGui.QBrush(QtGui.QColor("#e03131"))) # Màu đỏ
-                
-                self.overdue_tbl.setItem(r, c, item)
-                
-        self.overdue_tbl.resizeRowsToContents() # Tự động điều chỉnh chiều cao hàng
-        
+
+        # Việc quá hạn = (chưa xong) VÀ (hạn chót < bây giờ).
+        # Chỉ mục các việc chưa xong trả về sẵn theo hạn chót
+        # (cũ nhất, quá hạn lâu nhất lên đầu)
+        tasks = self.store.overdue(now)
+        self.overdue_model.set_tasks(tasks, now)
+
         # Cập nhật nhãn đếm
-        self.overdue_count_label.setText(f"{len(rows)} việc" if rows else "Không có việc")
+        self.overdue_count_label.setText(f"{len(tasks)} việc" if tasks else "Không có việc")
 
 
     def refresh_all(self):
-        self.refresh_list()
-        self.refresh_day()
-        self.refresh_week()
-        self.refresh_overdue() # <-- THÊM DÒNG NÀY
+        """
+        Làm mới sau khi dữ liệu thay đổi.
+
+        Chỉ tab đang hiển thị được làm mới ngay; các tab khác được đánh dấu
+        và làm mới khi người dùng chuyển sang. Thống kê ở đầu cửa sổ luôn
+        được cập nhật.
+        """
+        self._invalidate(*self._tab_refreshers)
+        self._update_statistics()
+
+    def _on_store_change(self, event):
+        """
+        Cập nhật giao diện theo một thay đổi của Store (xem StoreEvent).
+
+        - Sửa trường: vẽ lại đúng dòng của công việc; tab nào có thể thêm/bớt
+          dòng (ví dụ đổi hạn chót) thì đánh dấu cần làm mới
+        - Thêm/xoá: danh sách luôn đổi; các bảng chỉ đổi khi việc có hạn chót
+        - Đổi thứ tự: chỉ danh sách đổi
+        Thống kê luôn được cập nhật, giờ thông báo được hẹn lại khi cần.
+        """
+        kind = event.kind
+        if self._fill_view is not None and (kind != "update" or event.changes):
+            # Lần lọc đang chạy dựa trên dữ liệu trước thay đổi này: huỷ để
+            # Tab 1 lọc lại từ đầu (ngay nếu đang hiển thị, hoặc khi được mở)
+            self._cancel_list_fill()
+        if kind == "reset":
+            self.render_cache.clear()
+            self.list_model.drop_missing()
+            self.refresh_all()
+        elif kind == "update":
+            if not event.changes:
+                return
+            changed = event.changes.keys()
+            # Kết quả lọc được lấy lại từ bộ nhớ đệm nếu không bị ảnh hưởng
+            self._invalidate(self.tab_list)
+            if "due_dt" in changed:
+                self._invalidate(self.tab_day, self.tab_week)
+            if "due_dt" in changed or "done" in changed:
+                self._invalidate(self.tab_overdue)
+            for task in event.tasks:
+                self.list_model.update_task(task.id)
+                if "due_dt" not in changed:
+                    self.day_model.update_task(task)
+                    self.week_model.update_task(task)
+                if "due_dt" not in changed and "done" not in changed:
+                    self.overdue_model.update_task(task)
+        else:
+            if kind == "remove":
+                for task_id in event.ids:
+                    self.render_cache.discard(task_id)
+                self.list_model.remove_ids(event.ids)
+            self._invalidate(self.tab_list)
+            if kind != "move" and any(t.due_min is not None for t in event.tasks):
+                self._invalidate(self.tab_day, self.tab_week, self.tab_overdue)
+        self._update_statistics()
+
+        if self.tray_icon and kind != "move" and (
+                kind != "update" or not {"due_dt", "done", "notified"}.isdisjoint(event.changes)):
+            self._schedule_due_check()
+
+    def _invalidate(self, *tabs):
+        """Đánh dấu các tab cần làm mới (tab đang hiển thị được làm mới ngay)."""
+        self._dirty_tabs.update(tabs)
+        self._refresh_current_tab()
+
+    def _refresh_current_tab(self, *_):
+        """Làm mới tab đang hiển thị nếu nó đã bị đánh dấu (và dựng tab nếu chưa có)."""
+        tab = self.tabs.currentWidget()
+        build = self._tab_builders.pop(tab, None)
+        if build is not None:
+            build()
+        if self._loading:
+            return  # Các tab vẫn được đánh dấu, sẽ làm mới khi tải xong
+        if tab in self._dirty_tabs:
+            self._dirty_tabs.discard(tab)
+            self._tab_refreshers[tab]()
 
     # ========================================================================
     # HỆ THỐNG THÔNG BÁO (NOTIFICATION SYSTEM)
@@ -1838,72 +2418,67 @@ class Main(QtWidgets.QMainWindow):
                 3000  # Thông báo hiển thị trong 3 giây
             )
 
+    def _schedule_due_check(self):
+        """
+        Hẹn check_timer chạy đúng lúc công việc gần nhất đến hạn.
+
+        Không còn việc nào chờ thông báo thì dừng timer. Khoảng chờ tối đa
+        1 giờ để vẫn đúng giờ khi đồng hồ hệ thống bị chỉnh hoặc máy ngủ.
+        """
+        due = self.store.deadlines.next_due()
+        if due is None:
+            self.check_timer.stop()
+            return
+        ms = (due - datetime.now()) // timedelta(milliseconds=1)
+        self.check_timer.start(min(max(ms, 0), 3600 * 1000))
+
     def check_due_tasks(self):
         """
         Kiểm tra các công việc đến hạn và gửi thông báo.
 
-        Hàm này được QTimer gọi tự động mỗi 1 phút.
+        Hàm này được check_timer gọi đúng lúc công việc gần nhất đến hạn.
 
         Quy trình:
-        1. Duyệt qua tất cả công việc
-        2. Tìm các việc chưa xong, chưa thông báo, đã đến hạn
-        3. Gửi thông báo system tray
-        4. Thêm vào danh sách thông báo trong app
-        5. Đánh dấu là đã thông báo
+        1. Lấy các việc đã đến hạn từ đầu hàng đợi store.deadlines
+        2. Gửi thông báo system tray
+        3. Thêm vào danh sách thông báo trong app
+        4. Đánh dấu là đã thông báo
+        5. Hẹn giờ cho việc đến hạn tiếp theo
         """
         if not self.tray_icon:
             return  # Không làm gì nếu không có system tray
 
-        now = datetime.now()
-        tasks_to_notify = []
-
-        # Tìm các công việc cần thông báo
-        for task in self.store.items:
-            # Bỏ qua nếu: Đã xong HOẶC đã thông báo rồi
-            if task.get("done") or task.get("notified"):
-                continue
-
-            due_str = task.get("due_dt")
-            if not due_str:
-                continue
-
-            due_dt = parse_dt(due_str)
-            if not due_dt:
-                continue
-
-            # Nếu công việc đã (hoặc đang) đến hạn
-            if due_dt <= now:
-                tasks_to_notify.append(task)
+        tasks_to_notify = self.store.deadlines.pop_due(datetime.now())
 
         # Nếu có công việc cần thông báo
         if tasks_to_notify:
-            # Đánh dấu tất cả là "đã thông báo"
-            for task in tasks_to_notify:
-                task["notified"] = True
+            # Đánh dấu tất cả là "đã thông báo" (một thay đổi cho cả lô)
+            self.store.update_many([t.id for t in tasks_to_notify], notified=True)
 
             # Tạo nội dung thông báo system tray
             if len(tasks_to_notify) == 1:
                 title = "Công việc đến hạn!"
-                message = tasks_to_notify[0].get("text")
+                message = tasks_to_notify[0].text
             else:
                 title = f"{len(tasks_to_notify)} công việc đến hạn!"
-                message = f"Việc đầu tiên: {tasks_to_notify[0].get('text')}"
+                message = f"Việc đầu tiên: {tasks_to_notify[0].text}"
 
             # Hiển thị thông báo system tray
             self.show_notification(title, message)
 
             # Thêm vào danh sách thông báo trong app
             for task in tasks_to_notify:
-                msg = f"Đến hạn: {task.get('text')}"
+                msg = f"Đến hạn: {task.text}"
                 if msg not in self.app_notifications:
                     self.app_notifications.append(msg)
 
-            # Cập nhật số đếm trên icon chuông
+            # Cập nhật số đếm trên icon chuông, số việc quá hạn và tab Quá hạn
             if hasattr(self, "bell_counter"):
                 self.update_bell_counter()
+            self._update_statistics()
+            self._invalidate(self.tab_overdue)
 
-            # Lưu lại thay đổi (đánh dấu notified=True)
-            self.store.save()
+        self._schedule_due_check()
 
     def update_bell_counter(self):
         """
@@ -1919,9 +2494,9 @@ class Main(QtWidgets.QMainWindow):
         else:
             self.bell_counter.setVisible(False)
 
-        # Làm mới style
-        self._refresh_widget_style(self.bell_counter)
-        self._refresh_widget_style(self.bell_button)
+        # Làm mới style (chỉ khi property thực sự thay đổi)
+        self._refresh_widget_style(self.bell_counter, variant="priority-high")
+        self._refresh_widget_style(self.bell_button, secondary=True)
 
     def show_app_notifications(self):
         """
@@ -1965,7 +2540,15 @@ class Main(QtWidgets.QMainWindow):
         nếu công việc vẫn quá hạn.
         """
         self.app_notifications.clear()
-        self.update_bell_counter()        
+        self.update_bell_counter()
+
+    def closeEvent(self, event):
+        """
+        Ghi nốt các thay đổi đang chờ xuống đĩa trước khi đóng cửa sổ.
+        """
+        self.loader.wait()
+        self.saver.shutdown()
+        super().closeEvent(event)
 
 
 
@@ -1977,6 +2560,9 @@ def main():
     """
     Hàm khởi động ứng dụng.
 
+    Nếu có tham số dòng lệnh (vd: python todo.py list --mode todo) thì
+    chạy giao diện dòng lệnh (todo_cli) thay vì mở cửa sổ.
+
     Quy trình:
     1. Tạo QApplication (ứng dụng Qt)
     2. Thiết lập font mặc định
@@ -1984,6 +2570,9 @@ def main():
     4. Hiển thị cửa sổ
     5. Bắt đầu vòng lặp sự kiện (event loop)
     """
+    if len(sys.argv) > 1:
+        sys.exit(todo_cli.main(sys.argv[1:]))
+
     app = QtWidgets.QApplication(sys.argv)
 
     # Thiết lập font mặc định cho toàn bộ ứng dụng
@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GIAO DIỆN DÒNG LỆNH CỦA ỨNG DỤNG TODO LIST
+Thao tác trực tiếp trên Store (todo_core), không cần PyQt5 hay màn hình,
+dùng được trong cron, script và pipeline.
+
+Cách dùng:
+    python todo_cli.py add "Nộp báo cáo" --priority 2 --due "2025-11-15 14:30"
+    python todo_cli.py list --mode todo --sort due_dt
+    python todo_cli.py done 3f2a9c1e
+    python todo_cli.py stats
+    python todo_cli.py export overdue.ics --overdue
+    python todo_cli.py batch < commands.txt
+
+Mỗi lần chạy chỉ tải dữ liệu một lần và lưu tối đa một lần (chỉ khi có
+thay đổi). Chế độ batch đọc nhiều lệnh từ file hoặc stdin, mỗi dòng là
+một lệnh dạng dòng lệnh (vd: add "Mua sữa" -p 2) hoặc một object JSON
+(vd: {"cmd": "done", "ids": ["3f2a9c1e"]}), rồi áp dụng tất cả với một
+lần tải và một lần ghi. Dòng lỗi được báo ra stderr kèm số dòng, các
+dòng còn lại vẫn được thực hiện.
+
+Mã công việc có thể viết tắt bằng phần đầu (như lệnh list in ra), miễn
+là không trùng với việc khác.
+"""
+
+# Import các thư viện cần thiết
+import argparse, inspect, json, shlex, sys
+from bisect import bisect_left
+from datetime import datetime
+
+import todo_core, todo_io
+from todo_core import (
+    D_FMT, DT_FMT, SqliteStore, Store, StoreError, Task, fold_text, iso_key, now_iso, open_store,
+)
+
+# ============================================================================
+# CÁC HẰNG SỐ CẤU HÌNH
+# ============================================================================
+
+# Số ký tự đầu của mã công việc được in ra trong lệnh list
+SHORT_ID_LEN = 8
+
+# Tên các mức ưu tiên (nhận cả dạng không dấu khi nhập)
+PRIORITY_NAMES = {0: "Thấp", 1: "Thường", 2: "Cao"}
+
+
+# ============================================================================
+# CÁC HÀM TIỆN ÍCH
+# ============================================================================
+
+def parse_priority(value):
+    """
+    Đọc mức ưu tiên: 0/1/2 hoặc tên (thấp/thường/cao, có dấu hay không).
+
+    Raises:
+        ValueError: Nếu không phải mức ưu tiên hợp lệ
+    """
+    if isinstance(value, int) and value in PRIORITY_NAMES:
+        return value
+    text = fold_text(str(value).strip())
+    for p, name in PRIORITY_NAMES.items():
+        if text in (str(p), fold_text(name)):
+            return p
+    raise ValueError(f"Mức ưu tiên không hợp lệ: {value!r} (dùng 0/1/2 hoặc thấp/thường/cao)")
+
+
+def parse_due(value):
+    """
+    Đọc hạn chót "YYYY-MM-DD HH:MM" hoặc "YYYY-MM-DD" (hiểu là 23:59).
+
+    Returns:
+        str: Hạn chót theo DT_FMT, hoặc None nếu value rỗng/"none"
+
+    Raises:
+        ValueError: Nếu sai định dạng
+    """
+    value = (value or "").strip()
+    if value.lower() in ("", "none"):
+        return None
+    try:
+        return datetime.strptime(value, DT_FMT).strftime(DT_FMT)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, D_FMT).strftime(D_FMT) + " 23:59"
+    except ValueError:
+        pass
+    raise ValueError(f"Hạn chót không hợp lệ: {value!r} (dùng YYYY-MM-DD hoặc YYYY-MM-DD HH:MM)")
+
+
+def make_store(path=None):
+    """
+    Tạo Store cho file dữ liệu path (đuôi .db dùng SQLite).
+
+    Args:
+        path (str): File dữ liệu; None = theo cấu hình trong todo_core
+
+    Returns:
+        Store: Store chưa được load()
+    """
+    if path is None:
+        return open_store()
+    if path.endswith(".db"):
+        return SqliteStore(path)
+    return Store(path, journal=todo_core.USE_JOURNAL)
+
+
+class IdResolver:
+    """
+    Tìm công việc theo mã đầy đủ hoặc phần đầu của mã.
+
+    Mã đầy đủ tra thẳng trong Store.by_id. Mã viết tắt được tìm bằng
+    bisect trên danh sách mã đã sắp xếp, danh sách này chỉ dựng lại khi
+    số lượng/thứ tự công việc thay đổi (order_revision), nên cả nghìn
+    lệnh trong một batch không phải duyệt lại toàn bộ công việc.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._ids = []
+        self._rev = -1
+
+    def __call__(self, prefix):
+        """
+        Returns:
+            Task: Công việc có mã bắt đầu bằng prefix
+
+        Raises:
+            ValueError: Nếu không có hoặc có nhiều hơn một công việc khớp
+        """
+        prefix = str(prefix).strip().lower()
+        task = self.store.by_id.get(prefix)
+        if task is not None:
+            return task
+        if self._rev != self.store.order_revision:
+            self._ids = sorted(self.store.by_id)
+            self._rev = self.store.order_revision
+        i = bisect_left(self._ids, prefix)
+        found = []
+        for tid in self._ids[i:i + 2]:
+            if prefix and tid.startswith(prefix):
+                found.append(tid)
+        if not found:
+            raise ValueError(f"Không có công việc mã {prefix!r}")
+        if len(found) > 1:
+            raise ValueError(f"Mã {prefix!r} trùng với nhiều công việc, hãy ghi dài hơn")
+        return self.store.by_id[found[0]]
+
+
+def format_task(task):
+    """Một dòng mô tả công việc cho lệnh list."""
+    mark = "x" if task.done else " "
+    prio = PRIORITY_NAMES.get(task.priority, str(task.priority))
+    return f"{task.id[:SHORT_ID_LEN]}  [{mark}] {prio:<6}  {task.due_dt or '-':<16}  {task.text}"
+
+
+def _as_list(ids):
+    """Cho phép truyền một mã (str) hoặc danh sách mã."""
+    return [ids] if isinstance(ids, str) else list(ids)
+
+
+def _resolve_all(ctx, ids):
+    """
+    Tra hết các mã trước khi sửa; mã lặp lại (kể cả viết tắt khác nhau của
+    cùng một việc) chỉ tính một lần.
+    """
+    return list(dict.fromkeys(ctx.resolve(i) for i in _as_list(ids)))
+
+
+# ============================================================================
+# CÁC LỆNH
+# ============================================================================
+# Mỗi lệnh là một hàm cmd_<tên>(ctx, ...) với các tham số từ khoá trùng
+# tên với tuỳ chọn dòng lệnh, nên dùng chung được cho argparse và cho các
+# object JSON trong chế độ batch. Lỗi dữ liệu nhập được báo bằng ValueError.
+# Các lệnh kiểm tra hết mã công việc trước khi sửa, nên một lệnh lỗi không
+# làm thay đổi dữ liệu.
+
+class Context:
+    """
+    Trạng thái dùng chung của một lần chạy CLI.
+
+    Attributes:
+        store (Store): Store đã load()
+        resolve (IdResolver): Tra công việc theo mã (có thể viết tắt)
+        out: Luồng ghi kết quả (mặc định sys.stdout)
+    """
+
+    def __init__(self, store, out=None):
+        self.store = store
+        self.resolve = IdResolver(store)
+        self.out = out or sys.stdout
+
+    def print(self, *args):
+        print(*args, file=self.out)
+
+
+def cmd_add(ctx, text, priority=1, due=None, note=None):
+    """Thêm công việc mới, in ra mã của nó."""
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Nội dung công việc không được để trống")
+    task = Task(text, priority=parse_priority(priority), due_dt=parse_due(due),
+                note=note or None, created_at=now_iso())
+    ctx.store.add(task)
+    ctx.print(task.id)
+
+
+def cmd_edit(ctx, ids, text=None, priority=None, due=None, note=None):
+    """Sửa nội dung/mức ưu tiên/hạn chót/ghi chú (due "none" = bỏ hạn)."""
+    fields = {}
+    if text is not None:
+        if not text.strip():
+            raise ValueError("Nội dung công việc không được để trống")
+        fields["text"] = text.strip()
+    if priority is not None:
+        fields["priority"] = parse_priority(priority)
+    if due is not None:
+        fields["due_dt"] = parse_due(due)
+        fields["notified"] = False  # Hạn mới: cần nhắc lại
+    if note is not None:
+        fields["note"] = note or None
+    if not fields:
+        raise ValueError("Không có trường nào để sửa")
+    for task in _resolve_all(ctx, ids):
+        ctx.store.update(task.id, **fields)
+
+
+def cmd_done(ctx, ids, undo=False):
+    """Đánh dấu hoàn thành (hoặc bỏ đánh dấu với undo)."""
+    for task in _resolve_all(ctx, ids):
+        if undo:
+            ctx.store.update(task.id, done=False, done_at=None, notified=False)
+        elif not task.done:
+            ctx.store.update(task.id, done=True, done_at=now_iso())
+
+
+def cmd_rm(ctx, ids):
+    """Xoá công việc."""
+    for task in _resolve_all(ctx, ids):
+        ctx.store.remove(task.id)
+
+
+def cmd_list(ctx, query="", mode="all", rng="all", sort="default", limit=None, as_json=False):
+    """In danh sách công việc theo bộ lọc (as_json: mỗi dòng một object)."""
+    if mode not in ("all", "todo", "done"):
+        raise ValueError(f"mode không hợp lệ: {mode!r}")
+    if rng not in ("all", "today", "week"):
+        raise ValueError(f"rng không hợp lệ: {rng!r}")
+    if sort not in Store.SORT_FIELDS:
+        raise ValueError(f"sort không hợp lệ: {sort!r}")
+    by_id = ctx.store.by_id
+    count = 0
+    for batch in ctx.store.iter_filtered_ids(query or "", mode, rng, sort):
+        for tid in batch:
+            if limit is not None and count >= limit:
+                return
+            task = by_id[tid]
+            ctx.print(json.dumps(task.to_dict(), ensure_ascii=False) if as_json else format_task(task))
+            count += 1
+
+
+def cmd_stats(ctx, as_json=False):
+    """In các con số thống kê (tổng, đã xong, quá hạn theo mức ưu tiên)."""
+    stats = ctx.store.stats
+    stats.advance(datetime.now())
+    result = {
+        "total": stats.total,
+        "done": stats.done,
+        "todo": stats.todo,
+        "overdue": stats.overdue,
+        "overdue_by_priority": {
+            PRIORITY_NAMES.get(p, str(p)): n
+            for p, n in sorted(stats.overdue_by_priority.items(), reverse=True) if n
+        },
+    }
+    if as_json:
+        ctx.print(json.dumps(result, ensure_ascii=False))
+        return
+    ctx.print(f"Tổng: {result['total']}  Đã xong: {result['done']}  "
+              f"Chưa xong: {result['todo']}  Quá hạn: {result['overdue']}")
+    for name, n in result["overdue_by_priority"].items():
+        ctx.print(f"  Quá hạn ({name}): {n}")
+
+
+def cmd_import(ctx, file, fmt=None):
+    """
+    Nhập công việc từ file CSV, JSONL hoặc JSON ("-" = stdin), xem
+    todo_io.import_tasks. Bản ghi lỗi được báo ra stderr và bị bỏ qua.
+    """
+    result = todo_io.import_tasks(ctx.store, sys.stdin if file in (None, "-") else file, fmt)
+    for reject in result.rejects:
+        print(f"{file}:{reject}", file=sys.stderr)
+    if result.rejected > len(result.rejects):
+        print(f"{file}: … và {result.rejected - len(result.rejects)} bản ghi lỗi khác", file=sys.stderr)
+    skipped = f", bỏ qua {result.rejected} bản ghi lỗi" if result.rejected else ""
+    ctx.print(f"Đã nhập {result.added} công việc{skipped}")
+
+
+def cmd_export(ctx, file="-", fmt=None, query="", mode="all", rng="all", sort="default",
+               overdue=False, since=None):
+    """
+    Xuất công việc ra CSV, JSONL hoặc iCalendar (mặc định JSONL ra stdout),
+    có thể chỉ các việc khớp bộ lọc, các việc quá hạn (overdue), hoặc các
+    việc được thêm/sửa/hoàn thành từ thời điểm since (xem todo_io).
+    """
+    if since is not None:
+        since = iso_key(since.strip() if isinstance(since, str) else since)
+    tasks = todo_io.select_tasks(ctx.store, query or "", mode, rng, sort, overdue=overdue, since=since)
+    todo_io.export_tasks(tasks, ctx.out if file in (None, "-") else file, fmt)
+
+
+class _Borrowed:
+    """Dùng luồng có sẵn (stdin) trong with mà không đóng nó."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        return self.stream
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _open_in(file):
+    return _Borrowed(sys.stdin) if file in (None, "-") else open(file, encoding="utf-8")
+
+
+COMMANDS = {
+    "add": cmd_add,
+    "edit": cmd_edit,
+    "done": cmd_done,
+    "rm": cmd_rm,
+    "list": cmd_list,
+    "stats": cmd_stats,
+    "import": cmd_import,
+    "export": cmd_export,
+}
+
+
+# ============================================================================
+# PHÂN TÍCH DÒNG LỆNH
+# ============================================================================
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser báo lỗi bằng ValueError thay vì thoát chương trình."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    """
+    Dựng bộ phân tích tham số cho mọi lệnh.
+
+    Args:
+        parser_class: Lớp ArgumentParser (batch dùng lớp không thoát khi lỗi)
+
+    Returns:
+        ArgumentParser: Kết quả parse có thuộc tính cmd (tên lệnh)
+    """
+    parser = parser_class(prog="todo", description="Quản lý danh sách công việc từ dòng lệnh.")
+    parser.add_argument("--data", metavar="FILE",
+                        help="File dữ liệu (.json hoặc .db); mặc định theo cấu hình todo_core")
+    sub = parser.add_subparsers(dest="cmd", metavar="LỆNH")
+    sub.required = True
+
+    p = sub.add_parser("add", help="Thêm công việc")
+    p.add_argument("text")
+    p.add_argument("-p", "--priority", default=1, help="0/1/2 hoặc thấp/thường/cao")
+    p.add_argument("--due", help="YYYY-MM-DD [HH:MM]")
+    p.add_argument("--note")
+
+    p = sub.add_parser("edit", help="Sửa công việc")
+    p.add_argument("ids", nargs="+", metavar="ID")
+    p.add_argument("--text")
+    p.add_argument("-p", "--priority")
+    p.add_argument("--due", help='YYYY-MM-DD [HH:MM], "none" = bỏ hạn chót')
+    p.add_argument("--note")
+
+    p = sub.add_parser("done", help="Đánh dấu hoàn thành")
+    p.add_argument("ids", nargs="+", metavar="ID")
+    p.add_argument("--undo", action="store_true", help="Bỏ đánh dấu hoàn thành")
+
+    p = sub.add_parser("rm", help="Xoá công việc")
+    p.add_argument("ids", nargs="+", metavar="ID")
+
+    p = sub.add_parser("list", help="Liệt kê công việc")
+    p.add_argument("-q", "--query", default="", help="Từ khoá tìm kiếm")
+    p.add_argument("--mode", default="all", choices=("all", "todo", "done"))
+    p.add_argument("--range", dest="rng", default="all", choices=("all", "today", "week"))
+    p.add_argument("--sort", default="default", choices=tuple(Store.SORT_FIELDS))
+    p.add_argument("-n", "--limit", type=int)
+    p.add_argument("--json", dest="as_json", action="store_true", help="Mỗi dòng một object JSON")
+
+    p = sub.add_parser("stats", help="Thống kê")
+    p.add_argument("--json", dest="as_json", action="store_true")
+
+    p = sub.add_parser("import", help="Nhập công việc từ CSV/JSONL/JSON")
+    p.add_argument("file", help='"-" = stdin')
+    p.add_argument("--format", dest="fmt", choices=("csv", "jsonl", "json"),
+                   help="Mặc định: đoán theo đuôi file/nội dung")
+
+    p = sub.add_parser("export", help="Xuất công việc ra CSV/JSONL/iCalendar")
+    p.add_argument("file", nargs="?", default="-", help='mặc định "-" = stdout')
+    p.add_argument("--format", dest="fmt", choices=tuple(todo_io.EXPORTERS),
+                   help="Mặc định: theo đuôi file, hoặc jsonl")
+    p.add_argument("-q", "--query", default="", help="Từ khoá tìm kiếm")
+    p.add_argument("--mode", default="all", choices=("all", "todo", "done"))
+    p.add_argument("--range", dest="rng", default="all", choices=("all", "today", "week"))
+    p.add_argument("--sort", default="default", choices=tuple(Store.SORT_FIELDS))
+    p.add_argument("--overdue", action="store_true", help="Chỉ các việc quá hạn")
+    p.add_argument("--since", metavar="ISO",
+                   help="Chỉ các việc thêm/sửa/hoàn thành từ thời điểm này (vd 2025-11-15)")
+
+    p = sub.add_parser("batch", help="Chạy nhiều lệnh (mỗi dòng một lệnh) với một lần lưu")
+    p.add_argument("file", nargs="?", default="-", help='mặc định "-" = stdin')
+    return parser
+
+
+def _kwargs(args):
+    """Tham số cho hàm lệnh từ kết quả argparse."""
+    return {k: v for k, v in vars(args).items() if k not in ("cmd", "data")}
+
+
+# Kiểu hợp lệ của các tham số khi dòng batch viết dạng JSON (còn lại: chuỗi)
+_PARAM_TYPES = {
+    "ids": (str, list),
+    "priority": (str, int),
+    "limit": int,
+    "undo": bool,
+    "as_json": bool,
+    "overdue": bool,
+}
+
+
+def _check_params(handler, obj):
+    """
+    Kiểm tra tham số JSON của một lệnh batch trước khi chạy.
+
+    Args:
+        handler: Hàm lệnh (cmd_x)
+        obj (dict): Tham số đọc từ JSON (đã bỏ "cmd")
+
+    Returns:
+        dict: Tham số đã chuẩn hoá (ví dụ limit "2" → 2)
+
+    Raises:
+        ValueError: Nếu thiếu/thừa tham số hoặc sai kiểu
+    """
+    name = handler.__name__[4:]
+    if "ctx" in obj:
+        raise ValueError(f"Tham số không hợp lệ cho {name}: ctx")
+    try:
+        inspect.signature(handler).bind(None, **obj)
+    except TypeError as e:
+        raise ValueError(f"Tham số không hợp lệ cho {name}: {e}") from None
+    for key, value in obj.items():
+        if value is None:
+            continue
+        kind = _PARAM_TYPES.get(key, str)
+        if kind is int and isinstance(value, str):
+            try:
+                value = obj[key] = int(value)
+            except ValueError:
+                raise ValueError(f"{key} phải là số nguyên: {value!r}") from None
+        # bool là lớp con của int: true/false không được coi là số
+        if not isinstance(value, kind) or (kind is not bool and isinstance(value, bool)):
+            raise ValueError(f"{key} sai kiểu: {value!r}")
+        if key == "ids" and isinstance(value, list) and not all(isinstance(v, str) for v in value):
+            raise ValueError(f"ids phải là chuỗi hoặc danh sách chuỗi: {value!r}")
+    return obj
+
+
+def parse_batch_line(line, parser):
+    """
+    Chuyển một dòng batch thành (hàm lệnh, tham số).
+
+    Args:
+        line (str): Dòng lệnh (add "Mua sữa" -p 2) hoặc object JSON
+        parser: Bộ phân tích từ build_parser(_ArgumentParser)
+
+    Returns:
+        tuple: (hàm, dict tham số), hoặc None nếu dòng trống/chú thích
+
+    Raises:
+        ValueError: Nếu lệnh hoặc tham số không hợp lệ
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        obj = json.loads(line)
+        handler = COMMANDS.get(obj.pop("cmd", None))
+        if handler is None:
+            raise ValueError(f"Thiếu hoặc sai tên lệnh (cmd), có: {', '.join(COMMANDS)}")
+        if "id" in obj and "ids" not in obj:
+            obj["ids"] = obj.pop("id")
+        return handler, _check_params(handler, obj)
+    args = parser.parse_args(shlex.split(line))
+    if args.cmd == "batch" or args.data is not None:
+        raise ValueError("Không dùng batch/--data bên trong batch")
+    return COMMANDS[args.cmd], _kwargs(args)
+
+
+def run_batch(ctx, lines):
+    """
+    Chạy lần lượt các dòng lệnh trên cùng một Store đã tải.
+
+    Returns:
+        int: Số dòng bị lỗi (đã báo ra stderr)
+    """
+    parser = build_parser(_ArgumentParser)
+    errors = 0
+    for lineno, line in enumerate(lines, 1):
+        try:
+            parsed = parse_batch_line(line, parser)
+            if parsed is not None:
+                handler, kwargs = parsed
+                handler(ctx, **kwargs)
+        except (ValueError, TypeError, OSError) as e:
+            errors += 1
+            print(f"dòng {lineno}: {e}", file=sys.stderr)
+    return errors
+
+
+# ============================================================================
+# HÀM CHÍNH
+# ============================================================================
+
+def main(argv=None):
+    """
+    Chạy CLI: tải dữ liệu một lần, thực hiện lệnh (hoặc cả batch), rồi
+    lưu một lần nếu dữ liệu đã thay đổi.
+
+    Args:
+        argv (list): Tham số dòng lệnh (mặc định sys.argv[1:])
+
+    Returns:
+        int: Mã thoát (0 = thành công, 1 = có lỗi)
+    """
+    args = build_parser().parse_args(argv)
+    store = make_store(args.data)
+    try:
+        store.load()
+    except StoreError as e:
+        print(f"lỗi: {e}", file=sys.stderr)
+        return 1
+    revision = store.revision
+    ctx = Context(store)
+
+    errors = 0
+    try:
+        if args.cmd == "batch":
+            with _open_in(args.file) as f:
+                errors = run_batch(ctx, f)
+        else:
+            COMMANDS[args.cmd](ctx, **_kwargs(args))
+    except (ValueError, OSError) as e:
+        print(f"lỗi: {e}", file=sys.stderr)
+        errors += 1
+
+    if store.revision != revision:
+        try:
+            store.save()
+        except StoreError as e:
+            print(f"lỗi: {e}", file=sys.stderr)
+            return 1
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2022 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LÕI DỮ LIỆU CỦA ỨNG DỤNG TODO LIST (KHÔNG CẦN PyQt5)
+Gồm mọi phần không liên quan tới giao diện:
+- Task, Store, SqliteStore: đọc/ghi dữ liệu, nhật ký, nâng cấp phiên bản
+- Các chỉ mục: hạn chót, tìm kiếm, thống kê, hàng đợi thông báo
+- Truy vấn: lọc/sắp xếp danh sách, việc trong ngày/tuần, việc quá hạn
+
+Module chỉ dùng thư viện chuẩn nên nạp rất nhanh và chạy được ở nơi
+không có màn hình (script, cron, máy chủ). Giao diện (todo.py) chỉ là một
+lớp mỏng bên trên. Lỗi đọc/ghi dữ liệu được báo bằng ngoại lệ StoreError.
+"""
+
+# Import các thư viện cần thiết
+import gc, heapq, json, os, re, shutil, sqlite3, unicodedata
+from bisect import bisect_left, insort
+from contextlib import closing, contextmanager
+from datetime import datetime, date, timedelta
+
+# ============================================================================
+# CÁC HẰNG SỐ CẤU HÌNH
+# ============================================================================
+
+# Đường dẫn thư mục chứa file chương trình
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Đường dẫn file JSON lưu trữ dữ liệu công việc
+DATA_FILE = os.path.join(BASE_DIR, "todos.json")
+
+# File dữ liệu định dạng cũ (mỗi việc chỉ có "text", "date", "done").
+# Chỉ được đọc khi todos.json chưa tồn tại.
+LEGACY_FILE = os.path.join(BASE_DIR, "tasks.json")
+
+# Phiên bản định dạng file dữ liệu:
+#   1 - danh sách công việc trần (todos.json cũ, tasks.json)
+#   2 - {"schema": 2, "items": [...]} với mọi công việc đã được chuẩn hóa
+#   3 - như 2, mỗi công việc có thêm mã định danh "id" cố định
+#   4 - như 3, mỗi công việc có thêm "updated_at" (lần thêm/sửa cuối)
+SCHEMA_VERSION = 4
+
+# Đường dẫn file SQLite (dùng khi STORE_ENGINE = "sqlite")
+DB_FILE = os.path.join(BASE_DIR, "todos.db")
+
+# Kiểu lưu trữ: "json" (todos.json) hoặc "sqlite" (todos.db, phù hợp
+# với danh sách rất lớn). Lần đầu chuyển sang "sqlite", dữ liệu trong
+# todos.json sẽ được tự động chuyển sang todos.db.
+STORE_ENGINE = "json"
+
+# Định dạng ngày giờ: 2025-11-15 14:30
+DT_FMT = "%Y-%m-%d %H:%M"
+
+# Định dạng ngày: 2025-11-15
+D_FMT  = "%Y-%m-%d"
+
+# Mốc thời gian để đổi datetime thành số phút (xem to_minutes)
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DAY = EPOCH.toordinal()
+ONE_MINUTE = timedelta(minutes=1)
+
+# Mảng tên thứ trong tuần (tiếng Việt)
+WEEKDAY_VN = ["Th 2","Th 3","Th 4","Th 5","Th 6","Th 7","CN"]
+
+# Chế độ nhật ký (journal): mỗi thay đổi chỉ ghi thêm một dòng vào
+# file "todos.json.journal" thay vì ghi lại toàn bộ todos.json
+USE_JOURNAL = True
+
+# Đuôi file nhật ký nằm cạnh file dữ liệu chính
+JOURNAL_SUFFIX = ".journal"
+
+# Số bản ghi nhật ký tối đa trước khi gộp (compact) vào file chính
+JOURNAL_COMPACT_THRESHOLD = 500
+
+# Số kết quả lọc/sắp xếp được Store giữ lại để dùng lại
+VIEW_CACHE_SIZE = 32
+
+
+# ============================================================================
+# CÁC HÀM TIỆN ÍCH (UTILITY FUNCTIONS)
+# ============================================================================
+
+def now_iso():
+    """
+    Lấy thời gian hiện tại và trả về dạng chuỗi ISO 8601.
+
+    Returns:
+        str: Chuỗi thời gian dạng "2025-11-15T14:30:00"
+
+    Ví dụ: "2025-11-15T14:30:00"
+    """
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def iso_key(value):
+    """
+    Đưa một thời điểm (datetime hoặc chuỗi ISO, vd "2025-11-15" hay
+    "2025-11-15 14:30") về đúng dạng của now_iso() để so sánh như chuỗi.
+
+    Raises:
+        ValueError: Nếu không phải thời điểm ISO hợp lệ
+    """
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Thời điểm không hợp lệ: {value!r} (dùng ISO, vd 2025-11-15T14:30)") from None
+    return value.isoformat(timespec="seconds")
+
+
+def initial_updated_at(created_at, done_at):
+    """
+    Giá trị updated_at cho công việc có từ trước khi có trường này: thời
+    điểm muộn nhất trong created_at và done_at (None nếu không có cả hai).
+    """
+    stamps = [s for s in (created_at, done_at) if isinstance(s, str) and s]
+    return max(stamps) if stamps else None
+
+
+@contextmanager
+def gc_paused():
+    """
+    Tạm tắt bộ thu gom rác vòng (gc) trong khi tạo rất nhiều đối tượng
+    sống lâu một lúc (nạp/nhập hàng chục nghìn công việc, dựng chỉ mục).
+
+    Các đối tượng đó không tạo vòng tham chiếu, nhưng mỗi lần gc chạy giữa
+    chừng lại phải duyệt toàn bộ chúng, tốn gần bằng chính việc tạo ra.
+    Nếu gc đã bị tắt từ trước (nơi khác, hoặc luồng khác đang trong khối
+    này) thì để nguyên khi ra khỏi khối.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def new_task_id():
+    """
+    Tạo mã định danh mới, không trùng lặp cho một công việc.
+
+    Ví dụ: "3f2b9c1e0a7d4e58b6c1d2e3f4a5b6c7"
+    """
+    return os.urandom(16).hex()
+
+
+def start_of_week(d: date) -> date:
+    """
+    Tìm ngày đầu tuần (Thứ Hai) của một ngày bất kỳ.
+
+    Args:
+        d (date): Ngày cần tìm đầu tuần
+
+    Returns:
+        date: Ngày thứ Hai của tuần đó
+
+    Ví dụ: Nếu d = 15/11/2025 (Thứ Sáu) → trả về 11/11/2025 (Thứ Hai)
+    """
+    return d - timedelta(days=d.weekday())
+
+
+def end_of_week(d: date) -> date:
+    """
+    Tìm ngày cuối tuần (Chủ Nhật) của một ngày bất kỳ.
+
+    Args:
+        d (date): Ngày cần tìm cuối tuần
+
+    Returns:
+        date: Ngày Chủ Nhật của tuần đó
+
+    Ví dụ: Nếu d = 15/11/2025 (Thứ Sáu) → trả về 17/11/2025 (Chủ Nhật)
+    """
+    return start_of_week(d) + timedelta(days=6)
+
+
+def parse_dt(s):
+    """
+    Chuyển đổi chuỗi thành đối tượng datetime.
+
+    Args:
+        s (str): Chuỗi ngày giờ dạng "2025-11-15 14:30"
+
+    Returns:
+        datetime hoặc None: Đối tượng datetime nếu hợp lệ, None nếu lỗi
+
+    Ví dụ: "2025-11-15 14:30" → datetime(2025, 11, 15, 14, 30)
+    """
+    if not s:
+        return None
+    try:
+        if (DT_FMT == "%Y-%m-%d %H:%M" and len(s) == 16
+                and s[4] == s[7] == "-" and s[10] == " " and s[13] == ":"):
+            # Đúng dạng chuẩn: fromisoformat nhanh hơn strptime nhiều lần
+            return datetime.fromisoformat(s)
+        return datetime.strptime(s, DT_FMT)
+    except Exception:
+        return None
+
+
+def to_minutes(dt):
+    """
+    Đổi datetime thành số phút kể từ 1970-01-01 (không tính múi giờ).
+
+    Dùng để so sánh hạn chót bằng số nguyên thay vì đối tượng datetime.
+
+    Ví dụ: datetime(1970, 1, 2, 0, 1) → 1441
+    """
+    # Như (dt - EPOCH) // ONE_MINUTE nhưng không tạo timedelta (nhanh gấp đôi)
+    return (dt.toordinal() - EPOCH_DAY) * 1440 + dt.hour * 60 + dt.minute
+
+
+# Dấu thanh/dấu mũ tách ra sau khi chuẩn hóa NFD
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]")
+
+# Một "từ" khi tìm kiếm: chuỗi chữ/số liên tiếp
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_text(s):
+    """
+    Chuẩn hóa chuỗi để tìm kiếm: chữ thường, bỏ dấu tiếng Việt.
+
+    Tách dấu bằng Unicode NFD rồi bỏ các ký tự dấu; riêng "đ" không tách
+    được nên đổi thẳng thành "d".
+
+    Ví dụ: "Học Bài Đi bơi" → "hoc bai di boi"
+    """
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFD", s.lower())).replace("đ", "d")
+
+
+# Đoạn không có khoảng trắng → các từ (đã bỏ dấu) của nó, xem fold_words.
+# Các đoạn lặp lại rất nhiều nên được nhớ; xoá hết khi vượt _FOLD_CACHE_SIZE.
+_fold_cache = {}
+_FOLD_CACHE_SIZE = 65536
+
+
+def _fold_chunk(chunk):
+    """Các từ (đã bỏ dấu) trong một đoạn không có khoảng trắng."""
+    if chunk.isascii() and chunk.isalnum():
+        return (chunk.lower(),)
+    return tuple(_TOKEN_RE.findall(fold_text(chunk)))
+
+
+def fold_words(s):
+    """
+    Tập các từ (đã bỏ dấu) trong chuỗi, giống set(_TOKEN_RE.findall(fold_text(s))).
+
+    Chuỗi không chứa dấu rời (trường hợp thường gặp: chữ dựng sẵn) được
+    tách theo khoảng trắng trước rồi mới bỏ dấu từng đoạn qua bộ nhớ đệm;
+    nếu có dấu rời (không thuộc từ nào) thì bỏ dấu cả chuỗi như fold_text().
+    """
+    if _COMBINING_RE.search(s):
+        return set(_TOKEN_RE.findall(fold_text(s)))
+    # Tra dict trực tiếp: rẻ hơn nhiều so với gọi qua functools.lru_cache
+    cache = _fold_cache
+    words = set()
+    for chunk in s.split():
+        found = cache.get(chunk)
+        if found is None:
+            if len(cache) >= _FOLD_CACHE_SIZE:
+                cache.clear()
+            found = cache[chunk] = _fold_chunk(chunk)
+        words.update(found)
+    return words
+
+
+# Phần đầu và phần cuối file dữ liệu {"schema": N, "items": [...]}
+# (xem Store.prepare_save)
+_DATA_HEAD_RE = re.compile(r'\s*\{\s*"schema"\s*:\s*(\d+)\s*,\s*"items"\s*:\s*\[')
+_DATA_TAIL_RE = re.compile(r"\s*\}\s*\Z")
+_WS_RE = re.compile(r"\s*")
+
+
+def iter_data_items(text):
+    """
+    Giải mã file dữ liệu {"schema": N, "items": [...]} theo từng công việc.
+
+    Mỗi công việc được giải mã riêng nên có thể dừng sớm (Store.peek), và
+    luồng nền đang đọc file lớn không giữ GIL suốt một lần json.loads()
+    cho cả file.
+
+    Args:
+        text (str): Nội dung file
+
+    Returns:
+        tuple: (N, iterator các dict công việc), hoặc None nếu file không
+            bắt đầu bằng {"schema": N, "items": [. Iterator ném ValueError
+            nếu phần sau sai cú pháp (hoặc bị cắt ngang).
+    """
+    m = _DATA_HEAD_RE.match(text)
+    if not m:
+        return None
+    return int(m.group(1)), _iter_items(text, m.end())
+
+
+def _iter_items(text, pos):
+    decode = json.JSONDecoder().raw_decode
+    pos = _WS_RE.match(text, pos).end()
+    if not text.startswith("]", pos):
+        while True:
+            item, pos = decode(text, pos)
+            yield item
+            pos = _WS_RE.match(text, pos).end()
+            if text.startswith(",", pos):
+                pos = _WS_RE.match(text, pos + 1).end()
+            elif text.startswith("]", pos):
+                break
+            else:
+                raise ValueError(f"Thiếu dấu phẩy hoặc ']' ở vị trí {pos}")
+    if not _DATA_TAIL_RE.match(text, pos + 1):
+        raise ValueError(f"Dữ liệu thừa sau danh sách công việc (vị trí {pos + 1})")
+
+
+# ============================================================================
+# LỖI DỮ LIỆU
+# ============================================================================
+
+class StoreError(Exception):
+    """
+    Lỗi khi đọc hoặc ghi dữ liệu của Store.
+
+    Giao diện (hoặc script) tự quyết định cách báo cho người dùng; lõi dữ
+    liệu không hiện hộp thoại nào.
+    """
+
+
+# ============================================================================
+# LỚP TASK - MỘT CÔNG VIỆC
+# ============================================================================
+
+class Task:
+    """
+    Một công việc trong danh sách.
+
+    Dùng __slots__ để mỗi công việc tốn ít bộ nhớ hơn một dict. Hạn chót
+    được parse một lần khi gán due_dt và giữ sẵn ở hai dạng:
+    - due (datetime hoặc None)
+    - due_min (int hoặc None): số phút kể từ 1970-01-01, xem to_minutes()
+
+    Attributes:
+        id (str): Mã định danh cố định (tự tạo nếu không truyền vào)
+        text (str): Nội dung công việc
+        done (bool): Trạng thái hoàn thành
+        priority (int): Mức ưu tiên (0=thấp, 1=thường, 2=cao)
+        due_dt (str): Hạn chót dạng "2025-11-15 14:30" (hoặc None)
+        created_at (str): Thời gian tạo dạng ISO
+        updated_at (str): Thời gian thêm/sửa lần cuối dạng ISO (Store tự gán)
+        done_at (str): Thời gian hoàn thành
+        note (str): Ghi chú
+        notified (bool): Đã thông báo chưa
+        extra (dict): Các trường lạ khác, được giữ nguyên khi lưu
+        rev (int): Số lần được sửa qua update() trong phiên này (không lưu),
+            để phần hiển thị biết dữ liệu tính sẵn của nó đã cũ chưa
+    """
+
+    # Các trường được lưu trong file JSON, theo đúng thứ tự
+    FIELDS = ("id", "text", "done", "priority", "due_dt", "created_at", "updated_at", "done_at",
+              "note", "notified")
+
+    __slots__ = ("id", "text", "done", "priority", "_due_dt", "due", "due_min",
+                 "created_at", "updated_at", "done_at", "note", "notified", "extra", "rev")
+
+    def __init__(self, text="", done=False, priority=1, due_dt=None, created_at=None,
+                 done_at=None, note=None, notified=False, extra=None, id=None, updated_at=None):
+        self.id = id or new_task_id()
+        self.text = text
+        self.done = done
+        self.priority = priority
+        self.due_dt = due_dt
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.done_at = done_at
+        self.note = note
+        self.notified = notified
+        self.extra = extra
+        self.rev = 0
+
+    @property
+    def due_dt(self):
+        """Hạn chót dạng chuỗi "2025-11-15 14:30" (hoặc None)."""
+        return self._due_dt
+
+    @due_dt.setter
+    def due_dt(self, value):
+        self._due_dt = value or None
+        self.due = parse_dt(value)
+        self.due_min = to_minutes(self.due) if self.due else None
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Tạo Task từ dict đã chuẩn hóa (xem Store.migrate).
+
+        Các khóa không nằm trong FIELDS được giữ lại trong extra.
+        """
+        t = cls(d["text"], d["done"], d["priority"], d["due_dt"], d["created_at"],
+                d["done_at"], d["note"], d["notified"], id=d["id"], updated_at=d["updated_at"])
+        if len(d) > len(cls.FIELDS):
+            t.extra = {k: v for k, v in d.items() if k not in cls.FIELDS}
+        return t
+
+    def to_dict(self):
+        """Chuyển về dict đúng định dạng lưu trong todos.json."""
+        d = {
+            "id": self.id,
+            "text": self.text,
+            "done": self.done,
+            "priority": self.priority,
+            "due_dt": self._due_dt,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "done_at": self.done_at,
+            "note": self.note,
+            "notified": self.notified,
+        }
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def get(self, field):
+        """Đọc một trường theo tên (trường lạ được đọc trong extra)."""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return self.extra.get(field) if self.extra else None
+
+    def update(self, fields):
+        """Gán nhiều trường một lúc; trường lạ được đưa vào extra."""
+        for k, v in fields.items():
+            if k in self.FIELDS:
+                setattr(self, k, v)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[k] = v
+        self.rev += 1
+
+    def __repr__(self):
+        return f"Task({self.text!r}, done={self.done}, due_dt={self._due_dt!r}, id={self.id!r})"
+
+
+# ============================================================================
+# LỚP DUEINDEX - CHỈ MỤC HẠN CHÓT
+# ============================================================================
+
+class DueIndex:
+    """
+    Danh sách công việc có hạn chót, luôn được sắp xếp theo hạn chót.
+
+    Cho phép lấy "các việc có hạn trong khoảng [từ, đến)" bằng bisect
+    (O(log n) + số kết quả) thay vì duyệt toàn bộ danh sách. Kết quả trả
+    về đã được sắp xếp theo hạn chót.
+
+    Khóa của mỗi mục là (due_min, task.id): các việc cùng hạn chót luôn
+    theo cùng một thứ tự ở mọi lần chạy. Cần gọi discard() trước khi thay
+    đổi hạn chót của công việc, và add() lại sau đó.
+    """
+
+    def __init__(self, *, only_open=False):
+        """
+        Args:
+            only_open (bool): Chỉ giữ các công việc chưa hoàn thành
+        """
+        self.only_open = only_open
+        self._keys = []    # (due_min, task.id), đã sắp xếp
+        self._tasks = []   # Task tương ứng với từng khóa
+
+    def _accepts(self, task):
+        return task.due_min is not None and not (self.only_open and task.done)
+
+    def build(self, tasks):
+        """Dựng lại toàn bộ chỉ mục từ danh sách công việc."""
+        entries = sorted(((t.due_min, t.id), t) for t in tasks if self._accepts(t))
+        self._keys = [k for k, _ in entries]
+        self._tasks = [t for _, t in entries]
+
+    def extend(self, tasks):
+        """
+        Thêm nhiều công việc một lần: các việc mới được sắp xếp riêng rồi
+        gộp với dãy đã có (sorted() gộp hai đoạn đã sắp trong O(n)), thay vì
+        chèn từng việc vào giữa danh sách. Không cần gộp (chỉ mục đang trống,
+        ví dụ nhập vào danh sách mới) thì chỉ nối vào cuối.
+        """
+        new = sorted(((t.due_min, t.id), t) for t in tasks if self._accepts(t))
+        if not new:
+            return
+        if self._keys and new[0][0] < self._keys[-1]:
+            new = sorted([*zip(self._keys, self._tasks), *new])
+            self._keys, self._tasks = [], []
+        # Chỉ mục trống, hoặc mọi việc mới có hạn sau cùng: nối vào cuối
+        self._keys += [k for k, _ in new]
+        self._tasks += [t for _, t in new]
+
+    def add(self, task):
+        """Thêm công việc vào chỉ mục (bỏ qua nếu không có hạn chót)."""
+        if not self._accepts(task):
+            return
+        key = (task.due_min, task.id)
+        pos = bisect_left(self._keys, key)
+        self._keys.insert(pos, key)
+        self._tasks.insert(pos, task)
+
+    def discard(self, task):
+        """Xoá công việc khỏi chỉ mục (nếu có)."""
+        if task.due_min is None:
+            return
+        key = (task.due_min, task.id)
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            del self._keys[pos]
+            del self._tasks[pos]
+
+    def between(self, start, end):
+        """
+        Lấy các công việc có hạn chót trong khoảng [start, end).
+
+        Args:
+            start (datetime hoặc None): Mốc bắt đầu (None = không giới hạn)
+            end (datetime hoặc None): Mốc kết thúc, không tính (None = không giới hạn)
+
+        Returns:
+            list: Các Task, sắp xếp theo hạn chót tăng dần
+        """
+        # So sánh (x,) với (due_min, mã): mọi khóa có due_min == x đều lớn hơn (x,)
+        lo = 0 if start is None else bisect_left(self._keys, ((start - EPOCH) / ONE_MINUTE,))
+        hi = len(self._keys) if end is None else bisect_left(self._keys, ((end - EPOCH) / ONE_MINUTE,))
+        return self._tasks[lo:hi]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# ============================================================================
+# LỚP DEADLINEQUEUE - HÀNG ĐỢI THÔNG BÁO HẠN CHÓT
+# ============================================================================
+
+class DeadlineQueue:
+    """
+    Hàng đợi ưu tiên (min-heap) các công việc đang chờ thông báo đến hạn.
+
+    Chỉ giữ các việc có hạn chót, chưa xong và (mặc định) chưa thông báo.
+    Việc có hạn sớm nhất luôn nằm ở đầu heap nên biết ngay lúc nào cần
+    thông báo tiếp theo mà không phải duyệt toàn bộ danh sách.
+
+    Xoá theo kiểu "lười": discard() chỉ đánh dấu mục trong heap là hết hiệu
+    lực, mục đó bị bỏ đi khi nổi lên đầu heap. Nhờ vậy thêm/xoá đều O(log n).
+    """
+
+    def __init__(self, *, skip_notified=True):
+        """
+        Args:
+            skip_notified (bool): Bỏ qua các việc đã được thông báo
+        """
+        self.skip_notified = skip_notified
+        self._heap = []     # [due_min, stt, task]; task = None nếu đã bị xoá
+        self._live = {}     # Task → mục tương ứng trong heap
+        self._seq = 0       # Số thứ tự tăng dần, để không phải so sánh Task
+
+    def _accepts(self, task):
+        return (task.due_min is not None and not task.done
+                and not (self.skip_notified and task.notified))
+
+    def build(self, tasks):
+        """Dựng lại toàn bộ hàng đợi."""
+        self._heap = []
+        self._live = {}
+        for t in tasks:
+            if self._accepts(t):
+                entry = [t.due_min, self._seq, t]
+                self._seq += 1
+                self._heap.append(entry)
+                self._live[t] = entry
+        heapq.heapify(self._heap)
+
+    def extend(self, tasks):
+        """Thêm nhiều công việc một lần (vun lại heap một lần)."""
+        for t in tasks:
+            if self._accepts(t):
+                entry = [t.due_min, self._seq, t]
+                self._seq += 1
+                self._heap.append(entry)
+                self._live[t] = entry
+        heapq.heapify(self._heap)
+
+    def add(self, task):
+        """Thêm công việc vào hàng đợi (bỏ qua nếu không cần thông báo)."""
+        if not self._accepts(task):
+            return
+        entry = [task.due_min, self._seq, task]
+        self._seq += 1
+        heapq.heappush(self._heap, entry)
+        self._live[task] = entry
+
+    def discard(self, task):
+        """Bỏ công việc khỏi hàng đợi (nếu có)."""
+        entry = self._live.pop(task, None)
+        if entry is not None:
+            entry[2] = None
+
+    def _prune(self):
+        """Bỏ các mục đã hết hiệu lực ở đầu heap."""
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+
+    def next_due(self):
+        """
+        Returns:
+            datetime hoặc None: Hạn chót sớm nhất đang chờ thông báo
+        """
+        self._prune()
+        return self._heap[0][2].due if self._heap else None
+
+    def pop_due(self, now):
+        """
+        Lấy ra các công việc đã đến hạn (hạn chót <= now).
+
+        Args:
+            now (datetime): Thời điểm hiện tại
+
+        Returns:
+            list: Các Task đã đến hạn, theo thứ tự hạn chót
+        """
+        now_min = to_minutes(now)
+        heap = self._heap
+        due = []
+        while heap and (heap[0][2] is None or heap[0][0] <= now_min):
+            _, _, task = heapq.heappop(heap)
+            if task is not None:
+                del self._live[task]
+                due.append(task)
+        return due
+
+    def __len__(self):
+        return len(self._live)
+
+
+# ============================================================================
+# LỚP TASKSTATS - BỘ ĐẾM THỐNG KÊ
+# ============================================================================
+
+class TaskStats:
+    """
+    Các con số thống kê (tổng, đã xong, đang làm, quá hạn theo mức ưu
+    tiên), được cập nhật dần theo từng thay đổi thay vì đếm lại cả danh
+    sách mỗi lần hiển thị.
+
+    Số việc quá hạn thay đổi theo thời gian: các việc chưa xong có hạn
+    trong tương lai nằm trong một DeadlineQueue, advance(now) chuyển những
+    việc vừa qua hạn sang nhóm quá hạn. Mỗi việc chỉ bị chuyển đúng một
+    lần, nên chi phí chỉ phụ thuộc vào số việc vừa qua hạn.
+
+    Attributes:
+        total (int): Tổng số công việc
+        done (int): Số việc đã hoàn thành
+        overdue_by_priority (dict): Mức ưu tiên → số việc quá hạn
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.done = 0
+        self.overdue_by_priority = {}
+        self._overdue = set()                                  # Các Task đang được tính là quá hạn
+        self._upcoming = DeadlineQueue(skip_notified=False)    # Việc chưa xong, chưa tới hạn
+        self._now_min = None                                   # Mốc của lần advance() gần nhất
+
+    @property
+    def todo(self):
+        """Số việc chưa hoàn thành."""
+        return self.total - self.done
+
+    @property
+    def overdue(self):
+        """Tổng số việc quá hạn (tính tới lần advance() gần nhất)."""
+        return len(self._overdue)
+
+    def build(self, tasks):
+        """Đếm lại từ đầu (sau khi tải dữ liệu)."""
+        self.total = len(tasks)
+        self.done = sum(1 for t in tasks if t.done)
+        self.overdue_by_priority = {}
+        self._overdue = set()
+        self._upcoming.build(tasks)
+        self._now_min = None
+
+    def _mark_overdue(self, task):
+        p = int(task.priority)
+        self._overdue.add(task)
+        self.overdue_by_priority[p] = self.overdue_by_priority.get(p, 0) + 1
+
+    def extend(self, tasks):
+        """Tính thêm nhiều công việc một lần."""
+        upcoming = []
+        for task in tasks:
+            self.total += 1
+            if task.done:
+                self.done += 1
+            elif task.due_min is not None:
+                if self._now_min is not None and task.due_min <= self._now_min:
+                    self._mark_overdue(task)
+                else:
+                    upcoming.append(task)
+        self._upcoming.extend(upcoming)
+
+    def add(self, task):
+        """Tính thêm một công việc."""
+        self.total += 1
+        if task.done:
+            self.done += 1
+        elif task.due_min is not None:
+            if self._now_min is not None and task.due_min <= self._now_min:
+                self._mark_overdue(task)
+            else:
+                self._upcoming.add(task)
+
+    def discard(self, task):
+        """Bỏ một công việc khỏi các con số (gọi trước khi sửa/xoá)."""
+        self.total -= 1
+        if task.done:
+            self.done -= 1
+        if task in self._overdue:
+            self._overdue.discard(task)
+            self.overdue_by_priority[int(task.priority)] -= 1
+        else:
+            self._upcoming.discard(task)
+
+    def advance(self, now):
+        """
+        Cập nhật số việc quá hạn tới thời điểm now.
+
+        Args:
+            now (datetime): Thời điểm hiện tại
+        """
+        self._now_min = to_minutes(now)
+        for task in self._upcoming.pop_due(now):
+            self._mark_overdue(task)
+
+
+# ============================================================================
+# LỚP SEARCHINDEX - CHỈ MỤC TÌM KIẾM
+# ============================================================================
+
+class SearchIndex:
+    """
+    Chỉ mục ngược (từ → các công việc chứa từ đó) trên tiêu đề và ghi chú.
+
+    Mọi từ đều được bỏ dấu bằng fold_text(), nên "hoc bai" tìm được
+    "Học bài" và ngược lại. Mỗi từ trong câu tìm kiếm được so khớp như
+    tiền tố của từ trong công việc ("ho" khớp "học", "hoàn"...); công việc
+    phải khớp tất cả các từ trong câu tìm kiếm.
+
+    Danh sách các từ được giữ ở dạng đã sắp xếp để tìm mọi từ có cùng tiền
+    tố bằng bisect.
+    """
+
+    def __init__(self):
+        self._postings = {}    # từ → tập các Task chứa từ đó
+        self._words = []       # Các từ, đã sắp xếp
+        self._task_words = {}  # Task → tập các từ của Task (để xoá)
+
+    @staticmethod
+    def words_of(task):
+        """Các từ (đã bỏ dấu) trong tiêu đề và ghi chú của công việc."""
+        return fold_words(task.text if not task.note else f"{task.text} {task.note}")
+
+    def build(self, tasks):
+        """Dựng lại toàn bộ chỉ mục."""
+        self._postings = {}
+        self._task_words = {}
+        for t in tasks:
+            words = self.words_of(t)
+            self._task_words[t] = words
+            for w in words:
+                posting = self._postings.get(w)
+                if posting is None:
+                    self._postings[w] = {t}
+                else:
+                    posting.add(t)
+        self._words = sorted(self._postings)
+
+    def extend(self, tasks):
+        """Thêm nhiều công việc một lần (sắp xếp lại danh sách từ một lần)."""
+        postings, task_words, words_of = self._postings, self._task_words, self.words_of
+        new_words = []
+        for t in tasks:
+            words = task_words[t] = words_of(t)
+            for w in words:
+                posting = postings.get(w)
+                if posting is None:
+                    postings[w] = {t}
+                    new_words.append(w)
+                else:
+                    posting.add(t)
+        if new_words:
+            self._words += new_words
+            self._words.sort()
+
+    def add(self, task):
+        words = self.words_of(task)
+        self._task_words[task] = words
+        for w in words:
+            posting = self._postings.get(w)
+            if posting is None:
+                self._postings[w] = {task}
+                insort(self._words, w)
+            else:
+                posting.add(task)
+
+    def discard(self, task):
+        for w in self._task_words.pop(task, ()):
+            posting = self._postings[w]
+            posting.discard(task)
+            if not posting:
+                del self._postings[w]
+                del self._words[bisect_left(self._words, w)]
+
+    def _prefix_matches(self, prefix):
+        """Tập các Task có ít nhất một từ bắt đầu bằng prefix."""
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\uffff")
+        if hi - lo == 1:
+            return self._postings[self._words[lo]]
+        found = set()
+        for w in self._words[lo:hi]:
+            found |= self._postings[w]
+        return found
+
+    def search(self, query):
+        """
+        Tìm các công việc khớp với câu tìm kiếm.
+
+        Câu tìm kiếm không có chữ/số nào ("-", "!!") được so khớp như chuỗi
+        con trong tiêu đề và ghi chú (điểm 0), thay vì bị coi là không lọc.
+
+        Returns:
+            dict hoặc None: Task → điểm (số từ khớp trọn vẹn, càng cao càng
+            sát), hoặc None nếu câu tìm kiếm rỗng (chỉ có khoảng trắng)
+        """
+        words = _TOKEN_RE.findall(fold_text(query))
+        if not words:
+            needle = query.strip()
+            if not needle:
+                return None
+            return {t: 0 for t in self._task_words
+                    if needle in t.text or (t.note and needle in t.note)}
+        # Lọc theo từ ít kết quả nhất trước để tập giao nhỏ nhanh nhất
+        sets = sorted((self._prefix_matches(w) for w in words), key=len)
+        found = set(sets[0])
+        for s in sets[1:]:
+            found &= s
+            if not found:
+                break
+        return {t: sum(w in self._task_words[t] for w in words) for t in found}
+
+
+# ============================================================================
+# LỚP STOREEVENT - THÔNG BÁO THAY ĐỔI DỮ LIỆU
+# ============================================================================
+
+class StoreEvent:
+    """
+    Mô tả một thay đổi dữ liệu, được Store gửi tới các hàm đã subscribe().
+
+    Attributes:
+        kind (str): Loại thay đổi:
+            - "add": thêm (hoặc chèn lại) công việc; nhiều việc cùng lúc
+              với Store.extend()
+            - "update": sửa một số trường (nhiều việc cùng lúc với
+              Store.update_many())
+            - "remove": xoá công việc
+            - "move": đổi thứ tự (nút Lên/Xuống)
+            - "reset": tải lại toàn bộ dữ liệu
+        tasks (tuple): Các Task bị ảnh hưởng (với "remove" là Task vừa bị xoá)
+        changes (dict): Với "update": trường → (giá trị cũ, giá trị mới), chỉ
+            gồm các trường thực sự đổi giá trị (nhiều việc thì lấy cặp giá
+            trị của việc đầu tiên có đổi)
+    """
+
+    __slots__ = ("kind", "tasks", "changes")
+
+    def __init__(self, kind, tasks=(), changes=None):
+        self.kind = kind
+        self.tasks = tuple(tasks)
+        self.changes = changes or {}
+
+    @property
+    def ids(self):
+        """Mã các công việc bị ảnh hưởng."""
+        return tuple(t.id for t in self.tasks)
+
+    def __repr__(self):
+        return f"StoreEvent({self.kind!r}, ids={self.ids!r}, changes={self.changes!r})"
+
+
+# ============================================================================
+# LỚP STORE - QUẢN LÝ DỮ LIỆU (DATA STORAGE)
+# ============================================================================
+
+class Store:
+    """
+    Lớp quản lý việc đọc/ghi dữ liệu công việc vào file JSON.
+
+    Mọi thay đổi dữ liệu đi qua các hàm add/extend/insert/update/remove/
+    swap để Store biết chính xác điều gì đã thay đổi. Công việc được tham chiếu
+    bằng mã định danh (Task.id) nên không phụ thuộc vào vị trí hiện tại.
+
+    Các chỉ mục bên trong Store được cập nhật ngay trong mỗi thao tác (riêng
+    extend() thì ở lần đầu dùng tới chỉ mục sau đó). Bên ngoài (giao diện, lưu nền...) đăng ký nhận StoreEvent bằng subscribe()
+    để chỉ cập nhật đúng phần bị ảnh hưởng. Ở chế độ nhật ký (journal),
+    save() chỉ ghi thêm các thay đổi đó vào file nhật ký; file JSON chính
+    chỉ được ghi lại khi nhật ký vượt quá ngưỡng compact_threshold.
+
+    Attributes:
+        path (str): Đường dẫn đến file JSON lưu trữ
+        items (list): Danh sách các công việc (mỗi công việc là một Task)
+        by_id (dict): Bảng tra id → Task
+        journal (bool): Bật/tắt chế độ nhật ký
+        journal_path (str): Đường dẫn file nhật ký
+        compact_threshold (int): Số bản ghi nhật ký tối đa trước khi gộp
+    """
+
+    def __init__(self, path, *, journal=False, compact_threshold=JOURNAL_COMPACT_THRESHOLD,
+                 legacy_path=None):
+        """
+        Khởi tạo Store với đường dẫn file.
+
+        Args:
+            path (str): Đường dẫn đến file JSON
+            journal (bool): Bật chế độ nhật ký (chỉ ghi thêm thay đổi)
+            compact_threshold (int): Ngưỡng số bản ghi để gộp nhật ký
+            legacy_path (str): File định dạng cũ, đọc khi chưa có file chính
+        """
+        self.path = path
+        self.legacy_path = legacy_path
+        self.items = []
+        self.by_id = {}
+        self.journal = journal
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_threshold = compact_threshold
+        self._pending = []      # Các dòng nhật ký chưa ghi xuống đĩa
+        self._journal_len = 0   # Số bản ghi hiện có trong file nhật ký
+        self._force_compact = False  # Lần ghi trước lỗi: lần sau phải ghi lại toàn bộ
+
+        # Số phiên bản dữ liệu: tăng sau mỗi thay đổi (dùng để biết kết
+        # quả lọc/tìm kiếm đã lưu tạm còn đúng hay không). Ngoài ra ghi lại
+        # phiên bản lần cuối thứ tự/số lượng công việc thay đổi, và lần cuối
+        # từng trường bị sửa, để chỉ bỏ những kết quả thực sự bị ảnh hưởng.
+        self.revision = 0
+        self.order_revision = 0
+        self._field_revisions = {}
+
+        # Kết quả lọc/sắp xếp đã tính: khóa → (phiên bản, kết quả)
+        self._view_cache = {}
+
+        # Các việc được thêm/sửa trong phiên này: id → phiên bản (dùng cho
+        # changed_since theo phiên bản; theo thời điểm thì dùng updated_at)
+        self._changed = {}
+
+        # Chỉ mục hạn chót: mọi công việc, và riêng các việc chưa xong
+        self._due_index = DueIndex()
+        self._open_due_index = DueIndex(only_open=True)
+
+        # Hàng đợi các việc sắp đến hạn cần thông báo
+        self._deadlines = DeadlineQueue()
+
+        # Chỉ mục tìm kiếm theo tiêu đề và ghi chú
+        self._search_index = SearchIndex()
+
+        # Các con số thống kê (tổng, đã xong, quá hạn...)
+        self._stats = TaskStats()
+
+        # Mỗi chỉ mục kèm các trường mà khi thay đổi thì phải cập nhật nó
+        self._indexes = (
+            (frozenset(("due_dt", "done")), self._due_index),
+            (frozenset(("due_dt", "done")), self._open_due_index),
+            (frozenset(("due_dt", "done", "notified")), self._deadlines),
+            (frozenset(("text", "note")), self._search_index),
+            (frozenset(("done", "due_dt", "priority")), self._stats),
+        )
+
+        # Các việc đã thêm bằng extend() nhưng chưa được đưa vào chỉ mục
+        # (xem _flush_indexes)
+        self._unindexed = []
+
+        # Bảng Task → vị trí trong items, dựng lại khi dữ liệu đổi
+        self._positions = {}
+        self._positions_rev = -1
+
+        # Các hàm nhận StoreEvent sau mỗi thay đổi
+        self._subscribers = []
+
+    # ------------------------------------------------------------------
+    # Các chỉ mục
+    # ------------------------------------------------------------------
+    # Đọc qua property để các việc vừa nhập hàng loạt được đưa vào chỉ mục
+    # một lần, ở lần đầu cần tới chỉ mục, thay vì ngay trong extend().
+
+    @property
+    def due_index(self):
+        """Chỉ mục hạn chót của mọi công việc (DueIndex)."""
+        self._flush_indexes()
+        return self._due_index
+
+    @property
+    def open_due_index(self):
+        """Chỉ mục hạn chót của các việc chưa xong (DueIndex)."""
+        self._flush_indexes()
+        return self._open_due_index
+
+    @property
+    def deadlines(self):
+        """Hàng đợi các việc sắp đến hạn cần thông báo (DeadlineQueue)."""
+        self._flush_indexes()
+        return self._deadlines
+
+    @property
+    def search_index(self):
+        """Chỉ mục tìm kiếm theo tiêu đề và ghi chú (SearchIndex)."""
+        self._flush_indexes()
+        return self._search_index
+
+    @property
+    def stats(self):
+        """Các con số thống kê (TaskStats)."""
+        self._flush_indexes()
+        return self._stats
+
+    def _flush_indexes(self):
+        """Đưa các việc extend() còn chờ vào mọi chỉ mục, một lần cho cả lô."""
+        if self._unindexed:
+            tasks, self._unindexed = self._unindexed, []
+            with gc_paused():
+                for _, ix in self._indexes:
+                    ix.extend(tasks)
+
+    def migrate(self, it):
+        """
+        Chuyển đổi và chuẩn hóa dữ liệu công việc.
+
+        Hàm này đảm bảo mọi công việc có đầy đủ các trường cần thiết,
+        và chuyển đổi dữ liệu cũ sang định dạng mới (nếu cần).
+
+        Args:
+            it: Dữ liệu công việc (có thể là dict hoặc string)
+
+        Returns:
+            dict: Công việc đã được chuẩn hóa với đầy đủ các trường:
+                - id (str): Mã định danh (tạo mới nếu chưa có)
+                - text (str): Nội dung công việc
+                - done (bool): Trạng thái hoàn thành
+                - priority (int): Mức ưu tiên (0=thấp, 1=thường, 2=cao)
+                - due_dt (str): Hạn chót dạng "2025-11-15 14:30"
+                - created_at (str): Thời gian tạo dạng ISO
+                - updated_at (str): Thời gian thêm/sửa lần cuối
+                - done_at (str): Thời gian hoàn thành
+                - note (str): Ghi chú
+                - notified (bool): Đã thông báo chưa
+        """
+        # Chuyển thành dict nếu chưa phải
+        it = dict(it) if isinstance(it, dict) else {"text": str(it)}
+
+        # Đảm bảo có đầy đủ các trường
+        if not it.get("id"):
+            it["id"] = new_task_id()
+        it.setdefault("text", "")
+        it.setdefault("done", False)
+        it.setdefault("priority", 1)  # 0=thấp, 1=thường, 2=cao
+
+        # Nâng cấp từ định dạng cũ (due, hoặc date của tasks.json) sang due_dt
+        if "due_dt" not in it:
+            due = it.get("due") or it.get("date")  # Định dạng cũ chỉ có ngày
+            it["due_dt"] = f"{due} 23:59" if due else None
+        it.pop("due", None)  # Xóa trường cũ
+        it.pop("date", None)
+
+        if "created_at" not in it:
+            it["created_at"] = now_iso()
+        it.setdefault("done_at", None)
+        if "updated_at" not in it:
+            it["updated_at"] = initial_updated_at(it["created_at"], it["done_at"])
+        it.setdefault("note", None)
+        it.setdefault("notified", False)  # Đã gửi thông báo chưa
+        return it
+
+    # ------------------------------------------------------------------
+    # Các thao tác thay đổi dữ liệu
+    # ------------------------------------------------------------------
+
+    def add(self, item):
+        """
+        Thêm công việc vào cuối danh sách.
+
+        Args:
+            item (Task hoặc dict): Công việc cần thêm
+
+        Returns:
+            Task: Công việc đã được chuẩn hóa và lưu trong Store
+        """
+        self._commit({"op": "add", "item": self._as_task(item)})
+        return self.items[-1]
+
+    def extend(self, items):
+        """
+        Thêm nhiều công việc vào cuối danh sách trong một thao tác (nhập
+        hàng loạt): các hàm subscribe() chỉ nhận một StoreEvent "add" chứa
+        mọi công việc mới. Chỉ mục chưa được cập nhật ngay mà dựng một lần
+        cho cả lô khi được dùng tới (xem _flush_indexes), nên nhập xong rồi
+        lưu ngay (todo_cli import) không phải trả chi phí đó.
+
+        Args:
+            items (iterable): Các Task hoặc dict (mã không được trùng với
+                việc đã có)
+
+        Returns:
+            list: Các Task vừa được thêm
+        """
+        tasks = [self._as_task(it) for it in items]
+        if tasks:
+            self._commit({"op": "extend", "items": tasks})
+        return tasks
+
+    def insert(self, idx, item):
+        """Chèn công việc vào vị trí idx (dùng khi hoàn tác xoá)."""
+        idx = max(0, min(idx, len(self.items)))
+        self._commit({"op": "insert", "index": idx, "item": self._as_task(item)})
+        return self.items[idx]
+
+    def update(self, task_id, **fields):
+        """
+        Cập nhật một số trường của công việc có mã task_id (O(1)).
+
+        Raises:
+            ValueError: Nếu không có công việc mã task_id
+        """
+        task = self._require(task_id)
+        self._commit({"op": "set", "id": task_id, "fields": fields})
+        return task
+
+    def update_many(self, task_ids, **fields):
+        """
+        Gán cùng các giá trị fields cho nhiều công việc trong một thao tác:
+        một dòng nhật ký và một StoreEvent "update" cho cả lô (ví dụ đánh
+        dấu "đã thông báo" các việc cùng đến hạn). Việc không đổi giá trị
+        nào thì bỏ qua.
+
+        Returns:
+            list: Các Task thực sự bị sửa
+
+        Raises:
+            ValueError: Nếu có mã không tồn tại (khi đó chưa việc nào bị sửa)
+        """
+        tasks = [self._require(i) for i in dict.fromkeys(task_ids)]
+        tasks = [t for t in tasks if any(t.get(f) != v for f, v in fields.items())]
+        if tasks:
+            self._commit({"op": "setmany", "ids": [t.id for t in tasks], "fields": fields})
+        return tasks
+
+    def remove(self, task_id):
+        """
+        Xoá công việc có mã task_id.
+
+        Returns:
+            Task: Công việc vừa bị xoá (để có thể hoàn tác)
+
+        Raises:
+            ValueError: Nếu không có công việc mã task_id (như list.remove)
+        """
+        it = self._require(task_id)
+        self._commit({"op": "del", "index": self.items.index(it)})
+        return it
+
+    def swap(self, a, b):
+        """Đổi chỗ hai công việc (dùng cho nút Lên/Xuống)."""
+        self._commit({"op": "swap", "a": a, "b": b})
+
+    def get(self, task_id):
+        """Lấy công việc theo mã (None nếu không có)."""
+        return self.by_id.get(task_id)
+
+    def index_of(self, task_id):
+        """Vị trí hiện tại của công việc có mã task_id trong items."""
+        return self.items.index(self._require(task_id))
+
+    def _require(self, task_id):
+        """Công việc có mã task_id; ValueError nếu không có."""
+        task = self.by_id.get(task_id)
+        if task is None:
+            raise ValueError(f"Không có công việc mã {task_id!r}")
+        return task
+
+    def _as_task(self, item):
+        """Nhận Task hoặc dict (định dạng bất kỳ), trả về Task."""
+        return item if isinstance(item, Task) else Task.from_dict(self.migrate(item))
+
+    # ------------------------------------------------------------------
+    # Đăng ký nhận thông báo thay đổi
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback):
+        """
+        Đăng ký hàm callback(event) được gọi sau mỗi thay đổi dữ liệu.
+
+        Args:
+            callback (callable): Nhận một StoreEvent
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Huỷ đăng ký (bỏ qua nếu chưa đăng ký)."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _emit(self, event):
+        for callback in list(self._subscribers):
+            callback(event)
+
+    def _commit(self, op):
+        """
+        Áp dụng thay đổi vào bộ nhớ, cập nhật chỉ mục, ghi nhận vào nhật
+        ký (nếu bật) rồi thông báo cho các hàm đã subscribe().
+        """
+        kind = op["op"]
+        stamp = now_iso()
+        if kind != "extend":
+            self._flush_indexes()
+        if kind in ("set", "setmany"):
+            # Có trường thực sự đổi thì gán cả updated_at, ngay trong bản ghi
+            # để nhật ký/SQLite cũng lưu lại. notified chỉ là trạng thái nhắc
+            # việc, không tính là sửa công việc
+            tasks = [self.by_id[i] for i in op["ids"]] if kind == "setmany" else [self.by_id[op["id"]]]
+            fields = op["fields"]
+            if "updated_at" not in fields and any(
+                    t.get(f) != v for t in tasks for f, v in fields.items() if f != "notified"):
+                op = dict(op, fields=dict(fields, updated_at=stamp))
+            # Chỉ cập nhật những chỉ mục phụ thuộc vào các trường bị sửa
+            old = [{f: t.get(f) for f in op["fields"]} for t in tasks]
+            touched = [ix for fields, ix in self._indexes if not fields.isdisjoint(op["fields"])]
+            for task in tasks:
+                for ix in touched:
+                    ix.discard(task)
+            self._apply(op)
+            changes = {}
+            for task, before in zip(tasks, old):
+                for ix in touched:
+                    ix.add(task)
+                for f, v in before.items():
+                    if v != task.get(f):
+                        changes.setdefault(f, (v, task.get(f)))
+            event = StoreEvent("update", tasks, changes)
+        elif kind == "del":
+            task = self.items[op["index"]]
+            self._unindex(task)
+            self._apply(op)
+            event = StoreEvent("remove", (task,))
+        elif kind == "swap":
+            self._apply(op)
+            event = StoreEvent("move", (self.items[op["a"]], self.items[op["b"]]))
+        elif kind == "extend":
+            for t in op["items"]:
+                t.updated_at = stamp
+            self._apply(op)
+            self._unindexed += op["items"]
+            event = StoreEvent("add", op["items"])
+        else:
+            op["item"].updated_at = stamp
+            self._apply(op)
+            self._index(op["item"])
+            event = StoreEvent("add", (op["item"],))
+        self.revision += 1
+        if kind in ("set", "setmany"):
+            for field in op["fields"]:
+                self._field_revisions[field] = self.revision
+        else:
+            self.order_revision = self.revision
+        if kind == "del":
+            self._changed.pop(task.id, None)
+        elif kind != "swap" and (kind not in ("set", "setmany") or event.changes):
+            for t in event.tasks:
+                self._changed[t.id] = self.revision
+        self._record(op)
+        self._emit(event)
+
+    def _index(self, task):
+        for _, ix in self._indexes:
+            ix.add(task)
+
+    def _unindex(self, task):
+        for _, ix in self._indexes:
+            ix.discard(task)
+
+    def _reindex(self):
+        """Dựng lại các chỉ mục sau khi tải dữ liệu."""
+        self.revision += 1
+        self.order_revision = self.revision
+        self.by_id = {t.id: t for t in self.items}
+        self._changed = {}
+        self._unindexed = []
+        with gc_paused():
+            for _, ix in self._indexes:
+                ix.build(self.items)
+        self._emit(StoreEvent("reset"))
+
+    def _record(self, op):
+        """Ghi nhận thay đổi vào danh sách chờ ghi nhật ký."""
+        if self.journal:
+            if "item" in op:
+                op = dict(op, item=op["item"].to_dict())
+            elif "items" in op:
+                if len(op["items"]) > self.compact_threshold:
+                    # Quá nhiều cho một dòng nhật ký: lần lưu tới ghi lại file chính
+                    self._force_compact = True
+                    return
+                op = dict(op, items=[t.to_dict() for t in op["items"]])
+            self._pending.append(json.dumps(op, ensure_ascii=False))
+
+    # ------------------------------------------------------------------
+    # Truy vấn theo hạn chót
+    # ------------------------------------------------------------------
+
+    def due_between(self, start, end):
+        """Các công việc có hạn trong [start, end), sắp xếp theo hạn chót."""
+        return self.due_index.between(start, end)
+
+    def due_on(self, d):
+        """Các công việc có hạn trong ngày d, sắp xếp theo giờ."""
+        start = datetime(d.year, d.month, d.day)
+        return self.due_index.between(start, start + timedelta(days=1))
+
+    def overdue(self, now):
+        """Các công việc chưa xong có hạn trước now, quá hạn lâu nhất lên đầu."""
+        return self.open_due_index.between(None, now)
+
+    # ------------------------------------------------------------------
+    # Lọc/sắp xếp danh sách
+    # ------------------------------------------------------------------
+
+    # Các trường mà từng loại sắp xếp phụ thuộc vào
+    SORT_FIELDS = {
+        "default": (),
+        "due_dt": ("due_dt",),
+        "priority": ("priority",),
+        "created_at": ("created_at",),
+    }
+
+    def filter_fields(self, q="", mode="all", rng="all", key="default"):
+        """
+        Các trường mà kết quả của iter_filtered_ids() với cùng tham số phụ
+        thuộc vào (dùng với revision_of/view_cache_get).
+        """
+        fields = set(self.SORT_FIELDS.get(key, ()))
+        if q:
+            fields.update(("text", "note", "due_dt"))  # due_dt: xếp hạng kết quả tìm kiếm
+        if mode != "all":
+            fields.add("done")
+        if rng != "all":
+            fields.add("due_dt")
+        return fields
+
+    def iter_filtered_ids(self, q="", mode="all", rng="all", key="default", *, chunk=500, today=None):
+        """
+        Sinh dần mã các công việc khớp bộ lọc, theo đúng thứ tự hiển thị.
+
+        Sắp xếp được làm trước (một lần, trên danh sách Task chụp lại lúc
+        bắt đầu), sau đó việc lọc đi theo thứ tự đã sắp, nên mỗi lô sinh ra
+        có thể hiển thị ngay ở cuối danh sách. Vì chỉ giữ Task chứ không giữ
+        vị trí, Store có đổi giữa các lô cũng không làm hỏng lần lọc (kết
+        quả khi đó chỉ cũ đi, người gọi nên huỷ và lọc lại).
+
+        Args:
+            q (str): Từ khoá tìm kiếm ("" = không tìm)
+            mode (str): "all", "todo" (chưa xong) hoặc "done" (đã xong)
+            rng (str): "all", "today" (hạn hôm nay) hoặc "week" (hạn trong tuần)
+            key (str): Kiểu sắp xếp, một khóa của SORT_FIELDS
+            chunk (int): Số ứng viên được xét cho mỗi lô
+            today (date): Ngày dùng cho rng (mặc định: hôm nay)
+
+        Yields:
+            list: Mỗi lô gồm mã của các việc khớp trong chunk ứng viên
+        """
+        today = today or date.today()
+
+        # Có từ khoá: chỉ mục tìm kiếm trả về ngay các việc khớp (kèm điểm),
+        # chỉ cần lọc tiếp trên số ít đó thay vì duyệt toàn bộ công việc
+        scores = self.search_index.search(q)
+        if scores is None:
+            order = list(self.items)
+        else:
+            pos = self.positions()
+            order = sorted(scores, key=pos.__getitem__)
+
+        if key == "default" and scores:
+            # Đang tìm kiếm: việc khớp sát hơn lên trước, rồi tới hạn chót gần hơn
+            order.sort(key=lambda t: (-scores[t], t.due_min is None, t.due_min or 0))
+        if key == "due_dt":
+            # Có hạn chót trước (theo hạn chót), không có hạn chót sau
+            dated = [t for t in order if t.due_min is not None]
+            dated.sort(key=lambda t: t.due_min)
+            order = dated + [t for t in order if t.due_min is None]
+        elif key == "priority":
+            order.sort(key=lambda t: -int(t.priority))
+        elif key == "created_at":
+            order.sort(key=lambda t: t.created_at or "", reverse=True)
+
+        week = (start_of_week(today), end_of_week(today))
+        for start in range(0, len(order), chunk):
+            batch = []
+            for it in order[start:start + chunk]:
+                if mode == "todo" and it.done:
+                    continue
+                if mode == "done" and not it.done:
+                    continue
+                if rng != "all":
+                    day = it.due.date() if it.due else None
+                    if rng == "today" and day != today:
+                        continue
+                    if rng == "week" and not (day and week[0] <= day <= week[1]):
+                        continue
+                batch.append(it.id)
+            yield batch
+
+    def filtered_ids(self, q="", mode="all", rng="all", key="default", *, today=None):
+        """Như iter_filtered_ids() nhưng trả về cả danh sách mã một lần."""
+        return [tid for batch in self.iter_filtered_ids(q, mode, rng, key, today=today) for tid in batch]
+
+    def changed_since(self, revision=None, since=None):
+        """
+        Sinh dần các công việc đã thay đổi sau một mốc, theo thứ tự danh sách
+        (dùng để xuất dữ liệu theo từng đợt). Không sửa Store khi đang duyệt.
+
+        Args:
+            revision (int): Chỉ lấy việc được thêm/sửa sau phiên bản này
+                (giá trị Store.revision đã ghi lại trước đó, trong cùng phiên)
+            since (datetime hoặc str): Chỉ lấy việc được thêm/sửa/hoàn thành
+                từ thời điểm này (ISO, vd "2025-11-15" hoặc "2025-11-15T14:30"),
+                theo trường updated_at nên đúng cả qua nhiều phiên.
+
+        Yields:
+            Task: Các công việc thỏa mọi điều kiện đã cho
+
+        Raises:
+            ValueError: Nếu since không phải thời điểm ISO hợp lệ
+        """
+        if since is not None:
+            since = iso_key(since)
+        changed = self._changed
+        for t in self.items:
+            if revision is not None and changed.get(t.id, revision) <= revision:
+                continue
+            if since is not None:
+                stamp = t.updated_at or ""
+                if len(stamp) != 19 or stamp[10] != "T":
+                    # Không phải dạng now_iso() (vd nhập "2025-01-02 09:30")
+                    try:
+                        stamp = iso_key(stamp)
+                    except ValueError:
+                        pass
+                if stamp < since:
+                    continue
+            yield t
+
+    def positions(self):
+        """Bảng Task → vị trí trong items (chỉ dựng lại khi thứ tự đã đổi)."""
+        if self._positions_rev != self.order_revision:
+            self._positions = {t: i for i, t in enumerate(self.items)}
+            self._positions_rev = self.order_revision
+        return self._positions
+
+    # ------------------------------------------------------------------
+    # Bộ nhớ đệm kết quả lọc/sắp xếp
+    # ------------------------------------------------------------------
+
+    def revision_of(self, fields):
+        """
+        Phiên bản của phần dữ liệu gồm thứ tự công việc và các trường fields.
+
+        Không đổi nếu từ đó tới giờ chỉ có các trường khác bị sửa.
+        """
+        revs = self._field_revisions
+        return max([self.order_revision] + [revs.get(f, 0) for f in fields])
+
+    def view_cache_get(self, key, rev):
+        """Kết quả đã lưu cho key nếu được tính ở đúng phiên bản rev (xem revision_of)."""
+        hit = self._view_cache.pop(key, None)
+        if hit is None:
+            return None
+        # Đưa lên cuối: các khóa lâu không dùng nằm ở đầu và bị bỏ trước
+        self._view_cache[key] = hit
+        return hit[1] if hit[0] == rev else None
+
+    def view_cache_put(self, key, rev, result):
+        """Lưu kết quả của key, tính ở phiên bản rev (dùng khi tính dần từng phần)."""
+        self._view_cache.pop(key, None)
+        self._view_cache[key] = (rev, result)
+        if len(self._view_cache) > VIEW_CACHE_SIZE:
+            del self._view_cache[next(iter(self._view_cache))]
+
+    def view_cache_clear(self):
+        """Bỏ mọi kết quả lọc/sắp xếp đã lưu."""
+        self._view_cache.clear()
+
+    def _apply(self, op):
+        """
+        Áp dụng một bản ghi thay đổi lên self.items.
+
+        Dùng chung cho thao tác trực tiếp và khi đọc lại nhật ký lúc load().
+        """
+        kind = op["op"]
+        if kind == "add":
+            self.items.append(op["item"])
+            self.by_id[op["item"].id] = op["item"]
+        elif kind == "extend":
+            self.items.extend(op["items"])
+            self.by_id.update((t.id, t) for t in op["items"])
+        elif kind == "insert":
+            self.items.insert(op["index"], op["item"])
+            self.by_id[op["item"].id] = op["item"]
+        elif kind == "set":
+            # Nhật ký cũ (trước khi có id) ghi theo vị trí
+            task = self.by_id[op["id"]] if "id" in op else self.items[op["index"]]
+            task.update(op["fields"])
+        elif kind == "setmany":
+            for task_id in op["ids"]:
+                self.by_id[task_id].update(op["fields"])
+        elif kind == "del":
+            del self.by_id[self.items.pop(op["index"]).id]
+        elif kind == "swap":
+            a, b = op["a"], op["b"]
+            self.items[a], self.items[b] = self.items[b], self.items[a]
+        else:
+            raise ValueError(f"Bản ghi nhật ký không hợp lệ: {kind}")
+
+    # ------------------------------------------------------------------
+    # Đọc/ghi file
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """
+        Tải dữ liệu từ file JSON vào bộ nhớ.
+
+        Ở chế độ nhật ký, sau khi đọc file chính sẽ áp dụng lần lượt các
+        bản ghi trong file nhật ký. Dòng cuối bị ghi dở (ví dụ do mất điện)
+        sẽ được bỏ qua.
+
+        Nếu file không tồn tại, danh sách sẽ rỗng.
+
+        Raises:
+            StoreError: Nếu file bị lỗi. Store vẫn dùng được, với danh
+                sách rỗng
+        """
+        error = None
+        self.items = []
+        self._pending = []
+        self._journal_len = 0
+        self._force_compact = False
+
+        try:
+            path = self.path
+            if not os.path.exists(path) and self.legacy_path and os.path.exists(self.legacy_path):
+                path = self.legacy_path
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                data = iter_data_items(text)
+                if data:
+                    raw = {"schema": data[0], "items": list(data[1])}
+                else:
+                    raw = json.loads(text)
+                self.items = self._upgrade(raw)
+            self.by_id = {t.id: t for t in self.items}
+            if self.journal:
+                self._replay_journal()
+        except Exception as e:
+            self.items = []
+            error = StoreError(f"Không thể đọc tệp {os.path.basename(self.path)}:\n{e}")
+            error.__cause__ = e
+        self._reindex()
+        if error:
+            raise error
+
+    def peek(self, count):
+        """
+        Đọc nhanh tối đa count công việc đầu tiên của file chính, để hiển
+        thị trong lúc load() còn đang chạy.
+
+        Chỉ phần đầu file được đọc và giải mã. Kết quả chỉ để xem trước:
+        nhật ký chưa được áp dụng, và file cần nâng cấp phiên bản (hoặc
+        không đọc được) cho về danh sách rỗng.
+
+        Args:
+            count (int): Số công việc tối đa
+
+        Returns:
+            list: Các Task đầu tiên (không thuộc self.items)
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                head = f.read(count * 2048)
+        except OSError:
+            return []
+        data = iter_data_items(head)
+        if not data or data[0] != SCHEMA_VERSION:
+            return []
+        tasks = []
+        try:
+            for item in data[1]:
+                tasks.append(Task.from_dict(item))
+                if len(tasks) >= count:
+                    break
+        except (ValueError, KeyError, TypeError):
+            pass  # Công việc bị cắt ngang ở cuối đoạn đã đọc
+        return tasks
+
+    def _upgrade(self, raw):
+        """
+        Đưa dữ liệu đọc từ file về định dạng SCHEMA_VERSION.
+
+        Nếu file đã đúng phiên bản hiện tại thì dùng luôn danh sách công
+        việc, không chuẩn hóa lại từng mục. Ngược lại, lần lượt chạy các
+        bước nâng cấp trong MIGRATIONS và đánh dấu để lần lưu tới ghi lại
+        file theo định dạng mới.
+
+        Args:
+            raw: Dữ liệu JSON thô (danh sách trần hoặc {"schema", "items"})
+
+        Returns:
+            list: Danh sách công việc đã chuẩn hóa
+        """
+        if isinstance(raw, dict):
+            version = raw.get("schema", 1)
+            items = raw.get("items", [])
+        else:
+            version = 1
+            items = raw if isinstance(raw, list) else []
+
+        if version == SCHEMA_VERSION:
+            return [Task.from_dict(x) for x in items]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Tệp dữ liệu có phiên bản mới hơn ({version}) so với ứng dụng")
+
+        while version < SCHEMA_VERSION:
+            items = self.MIGRATIONS[version](self, items)
+            version += 1
+        self._force_compact = True
+        return [Task.from_dict(x) for x in items]
+
+    def _upgrade_v1(self, items):
+        """Phiên bản 1 → 2: chuẩn hóa từng công việc bằng migrate()."""
+        return [self.migrate(x) for x in items]
+
+    def _upgrade_v2(self, items):
+        """Phiên bản 2 → 3: gán mã định danh cho các công việc chưa có."""
+        return [x if x.get("id") else dict(x, id=new_task_id()) for x in items]
+
+    def _upgrade_v3(self, items):
+        """Phiên bản 3 → 4: thêm updated_at (lấy từ created_at/done_at)."""
+        return [x if "updated_at" in x else
+                dict(x, updated_at=initial_updated_at(x.get("created_at"), x.get("done_at")))
+                for x in items]
+
+    # Bước nâng cấp từ phiên bản N lên N + 1
+    MIGRATIONS = {
+        1: _upgrade_v1,
+        2: _upgrade_v2,
+        3: _upgrade_v3,
+    }
+
+    def _replay_journal(self):
+        """
+        Đọc file nhật ký và áp dụng từng bản ghi lên self.items.
+
+        Gặp dòng hỏng (thường là dòng cuối ghi dở) thì dừng tại đó và đánh
+        dấu lần lưu tới phải ghi lại file chính: nếu chỉ ghi thêm vào sau
+        dòng hỏng, các phiên sau cũng sẽ dừng ở đó và mất mọi thay đổi mới.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    op = None
+                if not isinstance(op, dict):
+                    self._force_compact = True
+                    break
+                if op.get("op") in ("add", "insert"):
+                    op["item"] = self._as_task(op["item"])
+                elif op.get("op") == "extend":
+                    op["items"] = [self._as_task(it) for it in op["items"]]
+                self._apply(op)
+                self._journal_len += 1
+
+    def save(self):
+        """
+        Lưu dữ liệu từ bộ nhớ xuống đĩa.
+
+        - Chế độ nhật ký: ghi thêm các thay đổi mới vào file nhật ký; khi
+          nhật ký vượt ngưỡng thì gộp lại (ghi lại file chính, xoá nhật ký).
+        - Chế độ thường: ghi lại toàn bộ file JSON.
+
+        Trước khi ghi lại file chính, sẽ tạo bản sao lưu (.bak) của file hiện tại.
+
+        Raises:
+            StoreError: Nếu ghi lỗi (lần lưu sau sẽ ghi lại toàn bộ dữ liệu)
+        """
+        try:
+            self.prepare_save()()
+        except Exception as e:
+            raise StoreError(f"Không thể lưu tệp {os.path.basename(self.path)}:\n{e}") from e
+
+    def prepare_save(self):
+        """
+        Chuẩn bị một lần ghi mà không đụng tới đĩa.
+
+        Phần chụp lại dữ liệu cần ghi chạy ngay trên luồng gọi (rất nhanh);
+        hàm trả về chỉ làm việc với bản chụp đó nên có thể chạy ở luồng khác
+        trong khi giao diện tiếp tục thay đổi self.items.
+
+        Returns:
+            callable: Hàm không tham số thực hiện việc ghi (có thể ném lỗi)
+        """
+        if (self.journal and not self._force_compact and os.path.exists(self.path)
+                and self._journal_len + len(self._pending) <= self.compact_threshold):
+            lines, self._pending = self._pending, []
+            self._journal_len += len(lines)
+            return lambda: self._guarded(self._append_journal, lines)
+
+        items = [it.to_dict() for it in self.items]
+        self._pending = []
+        self._journal_len = 0
+        self._force_compact = False
+        return lambda: self._guarded(self._write_snapshot, items)
+
+    def _guarded(self, write, data):
+        """Thực hiện ghi; nếu lỗi thì lần ghi sau sẽ ghi lại toàn bộ dữ liệu."""
+        try:
+            write(data)
+        except Exception:
+            self._force_compact = True
+            raise
+
+    def _append_journal(self, lines):
+        """Ghi thêm các bản ghi vào cuối file nhật ký."""
+        if not lines:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def compact(self):
+        """Ghi lại toàn bộ dữ liệu vào file chính ngay lập tức và xoá nhật ký."""
+        self._force_compact = True
+        self.prepare_save()()
+
+    def _write_snapshot(self, items):
+        """
+        Ghi toàn bộ danh sách công việc vào file chính và xoá file nhật ký.
+
+        File mới được ghi ra file tạm rồi đổi tên, nên file chính không
+        bao giờ ở trạng thái ghi dở.
+        """
+        # Tạo bản backup trước khi ghi đè
+        if os.path.exists(self.path):
+            shutil.copyfile(self.path, self.path + ".bak")
+
+        # Ghi dữ liệu vào file JSON với indent đẹp
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"schema": SCHEMA_VERSION, "items": items}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+        # Các thay đổi đã nằm trong file chính, nhật ký không còn cần thiết
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+# ============================================================================
+# LỚP SQLITESTORE - LƯU TRỮ BẰNG SQLITE
+# ============================================================================
+
+class SqliteStore(Store):
+    """
+    Store lưu công việc thành từng dòng trong bảng SQLite.
+
+    Giữ nguyên giao diện load/save/items như Store. Khác biệt là mỗi thay
+    đổi chỉ sinh ra một câu lệnh INSERT/UPDATE/DELETE trên đúng dòng bị
+    ảnh hưởng, và save() chạy các câu lệnh đó trong một transaction.
+    Bảng có chỉ mục trên due_dt, done, priority, created_at và mã công
+    việc (cột tid, dùng để cập nhật đúng dòng theo Task.id).
+
+    Thứ tự hiển thị được lưu ở cột pos (số thực) để có thể chèn lại vào
+    giữa hai công việc mà không phải đánh số lại cả bảng.
+    """
+
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        rid        INTEGER PRIMARY KEY,
+        pos        REAL    NOT NULL,
+        text       TEXT    NOT NULL,
+        done       INTEGER NOT NULL,
+        priority   INTEGER NOT NULL,
+        due_dt     TEXT,
+        created_at TEXT,
+        done_at    TEXT,
+        note       TEXT,
+        notified   INTEGER NOT NULL,
+        extra      TEXT,
+        tid        TEXT,
+        updated_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_pos ON tasks(pos);
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_dt ON tasks(due_dt);
+    CREATE INDEX IF NOT EXISTS idx_tasks_done ON tasks(done);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+    CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Đường dẫn file cơ sở dữ liệu SQLite
+        """
+        super().__init__(path, journal=False)
+        self._rids = []      # rowid của từng công việc, song song với self.items
+        self._pos = []       # Giá trị cột pos, song song với self.items
+        self._next_rid = 1
+
+    INSERT_SQL = "INSERT INTO tasks VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)"
+
+    UPDATE_SQL = ("UPDATE tasks SET text = ?, done = ?, priority = ?, due_dt = ?, created_at = ?,"
+                  " done_at = ?, note = ?, notified = ?, extra = ?, updated_at = ? WHERE tid = ?")
+
+    def _connect(self):
+        """Mở kết nối mới tới cơ sở dữ liệu (mỗi luồng dùng kết nối riêng)."""
+        con = sqlite3.connect(self.path)
+        con.executescript(self.SCHEMA)
+        # Cơ sở dữ liệu tạo trước khi có mã định danh/updated_at: thêm cột
+        columns = {row[1] for row in con.execute("PRAGMA table_info(tasks)")}
+        if "tid" not in columns:
+            con.execute("ALTER TABLE tasks ADD COLUMN tid TEXT")
+        if "updated_at" not in columns:
+            con.execute("ALTER TABLE tasks ADD COLUMN updated_at TEXT")
+        con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_tid ON tasks(tid)")
+        return con
+
+    def _row(self, it, rid, pos):
+        """Chuyển một Task thành bộ giá trị cho câu lệnh INSERT."""
+        return (rid, pos, it.text, int(bool(it.done)), int(it.priority),
+                it.due_dt, it.created_at, it.done_at, it.note, int(bool(it.notified)),
+                json.dumps(it.extra, ensure_ascii=False) if it.extra else None, it.id,
+                it.updated_at)
+
+    SELECT_SQL = ("SELECT rid, pos, text, done, priority, due_dt, created_at,"
+                  " done_at, note, notified, extra, tid, updated_at FROM tasks ORDER BY pos")
+
+    @staticmethod
+    def _task(row):
+        """Chuyển một dòng của SELECT_SQL thành Task."""
+        (_, _, text, done, priority, due_dt, created_at, done_at, note, notified, extra, tid,
+         updated_at) = row
+        return Task(text, bool(done), priority, due_dt, created_at, done_at, note,
+                    bool(notified), json.loads(extra) if extra else None, tid,
+                    updated_at or initial_updated_at(created_at, done_at))
+
+    def load(self):
+        """
+        Tải toàn bộ công việc từ cơ sở dữ liệu theo thứ tự cột pos.
+
+        Raises:
+            StoreError: Nếu không đọc được (xem Store.load)
+        """
+        error = None
+        self.items, self._rids, self._pos = [], [], []
+        self._pending = []
+        self._force_compact = False
+        try:
+            with closing(self._connect()) as con:
+                rows = con.execute(self.SELECT_SQL).fetchall()
+            for row in rows:
+                task = self._task(row)
+                self.items.append(task)
+                self._rids.append(row[0])
+                self._pos.append(row[1])
+                if row[11] is None or (row[12] is None and task.updated_at is not None):
+                    # Dòng cũ chưa có mã/updated_at: lần lưu tới ghi lại toàn bộ bảng
+                    self._force_compact = True
+            self._next_rid = max(self._rids, default=0) + 1
+        except Exception as e:
+            self.items, self._rids, self._pos = [], [], []
+            error = StoreError(f"Không thể đọc tệp {os.path.basename(self.path)}:\n{e}")
+            error.__cause__ = e
+        self._reindex()
+        if error:
+            raise error
+
+    def peek(self, count):
+        """Đọc nhanh count công việc đầu tiên theo cột pos (xem Store.peek)."""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with closing(sqlite3.connect(self.path)) as con:
+                rows = con.execute(f"{self.SELECT_SQL} LIMIT ?", (count,)).fetchall()
+            return [self._task(row) for row in rows]
+        except (sqlite3.Error, ValueError):
+            return []
+
+    def _apply(self, op):
+        """Áp dụng thay đổi vào bộ nhớ và sinh câu lệnh SQL cho đúng dòng bị ảnh hưởng."""
+        kind = op["op"]
+        if kind == "extend":
+            for item in op["items"]:
+                self._apply({"op": "add", "item": item})
+        elif kind in ("add", "insert"):
+            idx = len(self.items) if kind == "add" else op["index"]
+            rid = self._next_rid
+            self._next_rid += 1
+            # Chọn pos nằm giữa hai công việc lân cận
+            if not self._pos:
+                pos = 1.0
+            elif idx >= len(self._pos):
+                pos = self._pos[-1] + 1.0
+            elif idx == 0:
+                pos = self._pos[0] - 1.0
+            else:
+                pos = (self._pos[idx - 1] + self._pos[idx]) / 2
+            self._rids.insert(idx, rid)
+            self._pos.insert(idx, pos)
+            super()._apply(op)
+            self._pending.append((self.INSERT_SQL, self._row(op["item"], rid, pos)))
+        elif kind == "set":
+            super()._apply(op)
+            row = self._row(self.by_id[op["id"]], None, None)
+            self._pending.append((self.UPDATE_SQL, row[2:11] + row[12:] + row[11:12]))
+        elif kind == "setmany":
+            for task_id in op["ids"]:
+                self._apply({"op": "set", "id": task_id, "fields": op["fields"]})
+        elif kind == "del":
+            idx = op["index"]
+            rid = self._rids.pop(idx)
+            self._pos.pop(idx)
+            super()._apply(op)
+            self._pending.append(("DELETE FROM tasks WHERE rid = ?", (rid,)))
+        elif kind == "swap":
+            a, b = op["a"], op["b"]
+            super()._apply(op)
+            self._rids[a], self._rids[b] = self._rids[b], self._rids[a]
+            # pos gắn với vị trí, nên chỉ cần đổi pos của hai dòng
+            self._pending.append(("UPDATE tasks SET pos = ? WHERE rid = ?", (self._pos[a], self._rids[a])))
+            self._pending.append(("UPDATE tasks SET pos = ? WHERE rid = ?", (self._pos[b], self._rids[b])))
+        else:
+            raise ValueError(f"Thao tác không hợp lệ: {kind}")
+
+    def prepare_save(self):
+        """
+        Chuẩn bị một lần ghi: các câu lệnh SQL đang chờ sẽ chạy trong một
+        transaction. Nếu lần ghi trước lỗi, ghi lại toàn bộ bảng.
+        """
+        if self._force_compact:
+            self._force_compact = False
+            self._pending = []
+            rows = [self._row(it, rid, pos) for it, rid, pos in zip(self.items, self._rids, self._pos)]
+            ops = [("DELETE FROM tasks", ())]
+            ops += [(self.INSERT_SQL, r) for r in rows]
+        else:
+            ops, self._pending = self._pending, []
+        return lambda: self._guarded(self._execute, ops)
+
+    def _execute(self, ops):
+        """Chạy danh sách câu lệnh SQL trong một transaction."""
+        if not ops:
+            return
+        with closing(self._connect()) as con, con:
+            for sql, params in ops:
+                con.execute(sql, params)
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """
+    Chuyển toàn bộ dữ liệu từ file JSON (kèm nhật ký) sang SQLite.
+
+    Mỗi công việc được chuẩn hóa bằng Store.migrate và ghi thẳng vào cơ sở
+    dữ liệu (một executemany trong một transaction duy nhất), giữ nguyên
+    mọi trường kể cả updated_at. Dữ liệu được ghi ra file tạm rồi mới đổi
+    tên, nên nếu bị ngắt giữa chừng thì lần sau sẽ chuyển lại.
+
+    Returns:
+        int: Số công việc đã chuyển
+
+    Raises:
+        StoreError: Nếu file JSON bị lỗi (không có gì được chuyển)
+    """
+    src = Store(json_path, journal=USE_JOURNAL, legacy_path=LEGACY_FILE)
+    src.load()
+    tmp = db_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    # Không đi qua SqliteStore.add(): _commit() sẽ gán lại updated_at của
+    # từng việc thành lúc chuyển, và sinh một sự kiện/câu lệnh cho mỗi việc
+    dst = SqliteStore(tmp)
+    rows = (dst._row(it, rid, float(rid)) for rid, it in enumerate(src.items, 1))
+    with closing(dst._connect()) as con, con:
+        con.executemany(dst.INSERT_SQL, rows)
+    os.replace(tmp, db_path)
+    return len(src.items)
+
+
+def open_store():
+    """
+    Tạo Store theo cấu hình STORE_ENGINE.
+
+    Với "sqlite": nếu todos.db chưa có mà todos.json đã có, dữ liệu sẽ
+    được chuyển sang một lần.
+
+    Returns:
+        Store: Store chưa được load()
+    """
+    if STORE_ENGINE == "sqlite":
+        if not os.path.exists(DB_FILE) and (os.path.exists(DATA_FILE) or os.path.exists(LEGACY_FILE)):
+            migrate_json_to_sqlite(DATA_FILE, DB_FILE)
+        return SqliteStore(DB_FILE)
+    return Store(DATA_FILE, journal=USE_JOURNAL, legacy_path=LEGACY_FILE)